@@ -0,0 +1,269 @@
+import array
+import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from catalog import MUSCLES, muscle_mask
+import logic
+from logic import DAYS, WORKOUT_TYPES, INTENSITIES
+from snapshot import EPOCH, SNAPSHOT_FILE, load_columns, update_snapshot
+
+# Weeks start on Sunday like DAYS, days since EPOCH plus this are counted in whole weeks.
+WEEK_SHIFT = (EPOCH.weekday() + 1) % 7
+
+
+def _as_numpy(column):
+    """
+    Views an array or memoryview column as a NumPy array without copying it.
+    """
+    return np.asarray(column)
+
+
+def group_sum(keys: list, columns: dict, values=None) -> dict:
+    """
+    Sums values grouped by one or more dictionary encoded columns.
+
+    Args:
+        keys: (column name, number of codes) pairs to group by.
+        columns: column name to values.
+        values: per-row values to sum, counts rows if None.
+
+    Returns:
+        groups: tuple of codes to total, for non-empty groups only.
+    """
+    size = 1
+    for _name, cardinality in keys:
+        size *= cardinality
+
+    if np is not None:
+        key = np.zeros(len(columns[keys[0][0]]), dtype=np.int64)
+        for name, cardinality in keys:
+            key = key * cardinality + _as_numpy(columns[name])
+        totals = np.bincount(key, weights=values, minlength=size)
+        present = np.flatnonzero(totals)
+        totals = totals[present].tolist()
+        present = present.tolist()
+    else:
+        key = columns[keys[0][0]]
+        for name, cardinality in keys[1:]:
+            key = [k * cardinality + code for k, code in zip(key, columns[name])]
+        totals = [0] * size
+        if values is None:
+            for k in key:
+                totals[k] += 1
+        else:
+            for k, value in zip(key, values):
+                totals[k] += value
+        present = [k for k, total in enumerate(totals) if total]
+        totals = [totals[k] for k in present]
+
+    groups = {}
+    for k, total in zip(present, totals):
+        codes = []
+        for _name, cardinality in reversed(keys):
+            k, code = divmod(k, cardinality)
+            codes.append(code)
+        groups[tuple(reversed(codes))] = int(total)
+    return groups
+
+
+def _product(*columns: array.array):
+    """
+    Multiplies columns element-wise.
+    """
+    if np is not None:
+        result = np.ones(len(columns[0]), dtype=np.int64)
+        for column in columns:
+            result *= _as_numpy(column)
+        return result
+    result = columns[0]
+    for column in columns[1:]:
+        result = [a * b for a, b in zip(result, column)]
+    return result
+
+
+def minutes_by_day_type(columns: dict) -> dict:
+    """
+    Totals the workout minutes for each day and workout type.
+
+    Args:
+        columns: column name to values.
+
+    Returns:
+        minutes: (day, workout type) to minutes.
+    """
+    values = _as_numpy(columns["duration"]) if np is not None else columns["duration"]
+    groups = group_sum(
+        [("day", len(DAYS)), ("type", len(WORKOUT_TYPES))], columns, values
+    )
+    return {
+        (DAYS[day], WORKOUT_TYPES[workout_type]): minutes
+        for (day, workout_type), minutes in groups.items()
+    }
+
+
+def volume_by_exercise(columns: dict) -> dict:
+    """
+    Totals the lifted volume (weight x sets x reps) for each exercise.
+
+    Args:
+        columns: column name to values.
+
+    Returns:
+        volume: exercise to lbs moved.
+    """
+    values = _product(columns["weight"], columns["sets"], columns["reps"])
+    groups = group_sum([("exercise", len(logic.EXERCISES) + 1)], columns, values)
+    return {logic.EXERCISES[code - 1]: volume for (code,), volume in groups.items() if code}
+
+
+def sessions_by_intensity(columns: dict) -> dict:
+    """
+    Counts the cardio sessions at each intensity.
+
+    Args:
+        columns: column name to values.
+
+    Returns:
+        sessions: intensity to number of sessions.
+    """
+    groups = group_sum([("intensity", len(INTENSITIES) + 1)], columns)
+    return {INTENSITIES[code - 1]: count for (code,), count in groups.items() if code}
+
+
+def week_of(date: datetime.date) -> int:
+    """
+    Numbers the week a date falls in, see WEEK_SHIFT.
+    """
+    return ((date - EPOCH).days + WEEK_SHIFT) // 7
+
+
+def week_start(week: int) -> datetime.date:
+    """
+    Gives the Sunday a week number starts on.
+    """
+    return EPOCH + datetime.timedelta(days=week * 7 - WEEK_SHIFT)
+
+
+def muscle_rows(
+    columns: dict,
+    muscles: list,
+    start: datetime.date = None,
+    end: datetime.date = None,
+) -> list:
+    """
+    Finds the workouts that worked any of the muscles, with one AND over the muscles column.
+
+    Args:
+        columns: column name to values.
+        muscles: muscle names, see catalog.MUSCLES.
+        start: the first date to include, any date if None.
+        end: the date to stop before, no limit if None.
+
+    Returns:
+        indexes: the matching rows.
+    """
+    mask = muscle_mask(muscles)
+    first = (start - EPOCH).days if start else None
+    last = (end - EPOCH).days if end else None
+    if np is not None:
+        selected = (_as_numpy(columns["muscles"]) & mask) != 0
+        dates = _as_numpy(columns["date"])
+        if first is not None:
+            selected &= dates >= first
+        if last is not None:
+            selected &= dates < last
+        return np.flatnonzero(selected).tolist()
+    return [
+        index
+        for index, (muscles, date) in enumerate(zip(columns["muscles"], columns["date"]))
+        if muscles & mask and (first is None or date >= first) and (last is None or date < last)
+    ]
+
+
+def sets_by_week_muscle(columns: dict) -> dict:
+    """
+    Totals the sets trained per week and muscle. A set counts for every muscle
+    its exercise works, workouts without a date are left out.
+
+    Args:
+        columns: column name to values.
+
+    Returns:
+        sets: (week start as an ISO date, muscle) to sets.
+    """
+    if np is not None:
+        dates = _as_numpy(columns["date"]).astype(np.int64)
+        weeks = (dates + WEEK_SHIFT) // 7
+        sets = _as_numpy(columns["sets"]) * (dates != 0)
+        masks = _as_numpy(columns["muscles"])
+        hits = lambda bit: (masks >> bit) & 1
+        size = int(weeks.max()) + 1 if len(weeks) else 0
+    else:
+        weeks = [(date + WEEK_SHIFT) // 7 for date in columns["date"]]
+        sets = [count if date else 0 for count, date in zip(columns["sets"], columns["date"])]
+        hits = lambda bit: [(mask >> bit) & 1 for mask in columns["muscles"]]
+        size = max(weeks, default=-1) + 1
+
+    totals = {}
+    for bit, muscle in enumerate(MUSCLES):
+        groups = group_sum([("week", size)], {"week": weeks}, _product(sets, hits(bit)))
+        for (week,), total in groups.items():
+            totals[(week_start(week).isoformat(), muscle)] = total
+    return totals
+
+
+def muscle_balance(sets: dict, weeks: int = 4, today: datetime.date = None) -> tuple:
+    """
+    Lays out the weekly sets per muscle of the latest weeks side by side.
+
+    Args:
+        sets: the result of sets_by_week_muscle.
+        weeks: how many weeks, ending with the current one.
+        today: the day in the current week, today if None.
+
+    Returns:
+        starts: the start date of each week, oldest first.
+        table: muscle to its sets in each of those weeks.
+    """
+    current = week_of(today or datetime.date.today())
+    starts = [week_start(current - back).isoformat() for back in reversed(range(weeks))]
+    return starts, {muscle: [sets.get((start, muscle), 0) for start in starts] for muscle in MUSCLES}
+
+
+AGGREGATES = {
+    "minutes_by_day_type": minutes_by_day_type,
+    "volume_by_exercise": volume_by_exercise,
+    "sessions_by_intensity": sessions_by_intensity,
+    "sets_by_week_muscle": sets_by_week_muscle,
+}
+
+
+def summarize(columns: dict) -> dict:
+    """
+    Runs every aggregate over the columns.
+
+    Args:
+        columns: column name to values.
+
+    Returns:
+        summary: aggregate name to its result.
+    """
+    return {name: aggregate(columns) for name, aggregate in AGGREGATES.items()}
+
+
+def workout_summary(path: str = SNAPSHOT_FILE) -> dict:
+    """
+    Summarizes all workouts, refreshing the snapshot first.
+
+    Args:
+        path: the snapshot file.
+
+    Returns:
+        summary: aggregate name to its result.
+    """
+    update_snapshot(path)
+    return summarize(load_columns(path=path))
@@ -0,0 +1,200 @@
+import contextlib
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import typing
+
+from logic import (
+    DAYS,
+    describe_workout,
+    manifest_lock,
+    read_manifest,
+    read_rows,
+    rewrite_partition,
+    write_manifest,
+)
+
+ARCHIVE_DIR = "data/archive"
+ARCHIVE_INDEX = "data/archive/index.json"
+
+
+def row_week(row: list) -> str:
+    """
+    Gives the ISO week a workout row was planned in.
+
+    Args:
+        row: workout row in the CSV column order.
+
+    Returns:
+        week: the ISO week like "2024-W07", or None for rows without a date.
+    """
+    if len(row) < 11 or not row[10]:
+        return None
+    year, week, _weekday = datetime.date.fromisoformat(row[10]).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def read_index() -> dict:
+    """
+    Reads the archive index.
+
+    Returns:
+        index: segment file to its blocks, each block holding one ISO week.
+    """
+    if not os.path.exists(ARCHIVE_INDEX):
+        return {"segments": {}}
+    with open(ARCHIVE_INDEX, "r") as file:
+        return json.load(file)
+
+
+def _write_index(index: dict) -> None:
+    """
+    Replaces the archive index atomically.
+    """
+    temp_path = ARCHIVE_INDEX + ".tmp"
+    with open(temp_path, "w") as file:
+        json.dump(index, file)
+    os.replace(temp_path, ARCHIVE_INDEX)
+
+
+def _write_segment(weeks: dict) -> dict:
+    """
+    Writes a new archive segment, one gzip member per week.
+
+    Args:
+        weeks: ISO week to its rows.
+
+    Returns:
+        blocks: ISO week to the offset, length and row count of its member.
+    """
+    index = read_index()
+    name = f"segment-{len(index['segments']) + 1:04d}.csv.gz"
+    blocks = {}
+    with open(os.path.join(ARCHIVE_DIR, name), "wb") as file:
+        for week in sorted(weeks):
+            text = io.StringIO(newline="")
+            csv.writer(text).writerows(weeks[week])
+            data = gzip.compress(text.getvalue().encode())
+            blocks[week] = {
+                "offset": file.tell(),
+                "length": len(data),
+                "rows": len(weeks[week]),
+            }
+            file.write(data)
+    index["segments"][name] = blocks
+    _write_index(index)
+    return blocks
+
+
+def archive_workouts(cutoff: datetime.date, token=None, lock=None) -> int:
+    """
+    Moves workouts planned before the cutoff out of the day partitions into
+    compressed archive segments, one partition at a time.
+
+    Args:
+        cutoff: workouts dated before this day are archived.
+        token: checked between partitions. Partitions already archived stay
+        archived when its check() raises.
+        lock: called for a context manager to hold while one partition is
+        archived, so writers wait for a partition rather than the whole run.
+
+    Returns:
+        count: number of workouts archived.
+    """
+    cutoff = cutoff.isoformat()
+    count = 0
+    for day in DAYS:
+        if token is not None:
+            token.check()
+        with lock() if lock is not None else contextlib.nullcontext(), manifest_lock():
+            count += _archive_partition(day, cutoff)
+    return count
+
+
+def _archive_partition(day: str, cutoff: str) -> int:
+    """
+    Moves one day's workouts planned before the cutoff into a new segment.
+    """
+    manifest = read_manifest()
+    if day not in manifest["partitions"]:
+        return 0
+    weeks = {}
+    kept = []
+    for row in read_rows(day):
+        if len(row) > 10 and row[10] and row[10] < cutoff:
+            weeks.setdefault(row_week(row), []).append(row)
+        else:
+            kept.append(row)
+    if not weeks:
+        return 0
+
+    # The segment is written before the partition shrinks, so a crash in
+    # between can duplicate rows but never lose them.
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    _write_segment(weeks)
+    rewrite_partition(day, kept, manifest)
+    write_manifest(manifest)
+    return sum(len(rows) for rows in weeks.values())
+
+
+def archived_weeks() -> list:
+    """
+    Lists the ISO weeks that have archived workouts.
+
+    Returns:
+        weeks: ISO weeks, oldest first.
+    """
+    weeks = set()
+    for blocks in read_index()["segments"].values():
+        weeks.update(blocks)
+    return sorted(weeks)
+
+
+def read_archived_rows(week: str = None, segment: str = None) -> typing.Iterator[list]:
+    """
+    Reads archived workout rows, decompressing only the blocks that are needed.
+
+    Args:
+        week: only read this ISO week, all weeks if None.
+        segment: only read this segment file, all segments if None.
+
+    Returns:
+        rows: workout rows in the CSV column order.
+    """
+    for name, blocks in read_index()["segments"].items():
+        if segment is not None and name != segment:
+            continue
+        if week is None:
+            wanted = list(blocks.values())
+        elif week in blocks:
+            wanted = [blocks[week]]
+        else:
+            continue
+        with open(os.path.join(ARCHIVE_DIR, name), "rb") as file:
+            for block in wanted:
+                file.seek(block["offset"])
+                text = gzip.decompress(file.read(block["length"])).decode()
+                for row in csv.reader(io.StringIO(text, newline="")):
+                    if row:
+                        yield row
+
+
+def read_archived_workouts(week: str) -> dict:
+    """
+    Reads the workout entries of one archived ISO week.
+
+    Args:
+        week: the ISO week like "2024-W07".
+
+    Returns:
+        workouts: a list of workout details per day.
+    """
+    workouts = {}
+    for row in read_archived_rows(week):
+        details = describe_workout(row)
+        if details is not None:
+            workouts.setdefault(row[0], []).append(details)
+    return workouts
@@ -0,0 +1,154 @@
+import asyncio
+import concurrent.futures
+import typing
+
+from logic import check_row, workout_row
+from store import WorkoutStore
+
+
+class AsyncWorkoutStore:
+    """
+    asyncio front end for WorkoutStore.
+    File work runs on a small thread pool so the event loop never blocks on it,
+    and saves that arrive while a commit is running are written together in the next one.
+    """
+    def __init__(self, store: WorkoutStore = None, max_workers: int = 2) -> None:
+        self.store = store or WorkoutStore()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="workout-store"
+        )
+        self._pending = []
+        self._committer = None
+
+    async def __aenter__(self) -> "AsyncWorkoutStore":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _run(self, function, *args):
+        """
+        Runs a blocking store call on the thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def _commit_pending(self) -> None:
+        """
+        Writes queued rows in batches until the queue is empty.
+        """
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    saved = await self._run(self.store.save_rows, [row for row, _ in batch])
+                except Exception as e:
+                    for _row, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for (_row, future), row in zip(batch, saved):
+                        if not future.done():
+                            future.set_result(row)
+        finally:
+            self._committer = None
+
+    async def _drain(self) -> None:
+        """
+        Waits until every queued save is on disk.
+        """
+        while self._committer is not None:
+            await asyncio.shield(self._committer)
+
+    async def save_rows(self, rows: list) -> list:
+        """
+        Queues workout rows for the next group commit.
+
+        Args:
+            rows: workout rows in the CSV column order.
+
+        Returns:
+            rows: the saved rows, once they are on disk.
+
+        Raises:
+            ValueError: If a row is invalid, see logic.check_row. Nothing is
+            queued then, and the saves of other callers go ahead.
+        """
+        # Checked here, an invalid row in a batch would fail every caller in it.
+        rows = [check_row(row) for row in rows]
+        loop = asyncio.get_running_loop()
+        futures = []
+        for row in rows:
+            future = loop.create_future()
+            self._pending.append((row, future))
+            futures.append(future)
+        if self._committer is None and self._pending:
+            self._committer = asyncio.ensure_future(self._commit_pending())
+        return list(await asyncio.gather(*futures))
+
+    async def save(self, day: str, workout_type: str, **fields: str) -> tuple:
+        """
+        Validates and saves a workout entry.
+
+        Args:
+            day: Day of the workout
+            workout_type: Type of workout (Cardio, Weight Training, Mobility).
+            **fields: the workout's fields, see logic.workout_row.
+
+        Returns:
+            row: the saved row.
+
+        Raises:
+            ValueError: If a numeric field is invalid.
+        """
+        (row,) = await self.save_rows([workout_row(day, workout_type, **fields)])
+        return row
+
+    async def iter(self, day: str = None, batch: int = 500) -> typing.AsyncIterator[tuple]:
+        """
+        Iterates over the workout rows.
+
+        Args:
+            day: only give this day's rows.
+            batch: rows to give between yields to the event loop.
+
+        Returns:
+            rows: workout rows, in day order.
+        """
+        await self._drain()
+        rows = await self._run(self.store.rows, day)
+        for start in range(0, len(rows), batch):
+            for row in rows[start : start + batch]:
+                yield row
+            await asyncio.sleep(0)
+
+    async def workouts(self, day: str = None) -> dict:
+        """
+        Gives the workout entries, see WorkoutStore.workouts.
+        """
+        await self._drain()
+        return await self._run(self.store.workouts, day)
+
+    async def remove(self, entries: list) -> None:
+        """
+        Removes workout entries after every earlier save has been committed.
+
+        Args:
+            entries: List of (day, workout details) to be removed
+        """
+        await self._drain()
+        await self._run(self.store.remove_workouts, entries)
+
+    async def clear(self) -> None:
+        """
+        Deletes all workouts after every earlier save has been committed.
+        """
+        await self._drain()
+        await self._run(self.store.clear_workouts)
+
+    async def close(self) -> None:
+        """
+        Commits queued saves and stops the thread pool.
+        """
+        await self._drain()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,107 @@
+"""
+Times mapreduce.history_summary with 1 to N worker processes over a generated
+multi-year history, and checks every run against a single pass over all rows.
+
+    python benchmarks/analytics_scaling.py --years 5 --rows-per-week 2000 --workers 8
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import summarize
+from archive import archive_workouts, read_archived_rows
+from logic import (
+    WORKOUT_TYPES,
+    INTENSITIES,
+    EXERCISES,
+    STRETCHES,
+    append_rows,
+    day_name,
+    read_rows,
+    workout_row,
+)
+from mapreduce import history_sources, history_summary
+from snapshot import rows_to_columns
+
+
+def random_row(rng: random.Random, date: datetime.date) -> list:
+    workout_type = rng.choice(WORKOUT_TYPES)
+    if workout_type == "Cardio":
+        fields = {
+            "cardio_intensity": rng.choice(INTENSITIES),
+            "cardio_duration": str(rng.randint(10, 90)),
+        }
+    elif workout_type == "Weight Training":
+        fields = {
+            "weight_exercise": rng.choice(EXERCISES),
+            "weight": str(rng.randint(20, 300)),
+            "weight_reps": str(rng.randint(1, 15)),
+            "weight_sets": str(rng.randint(1, 6)),
+        }
+    else:
+        fields = {
+            "mobility_stretch": rng.choice(STRETCHES),
+            "mobility_duration": str(rng.randint(5, 30)),
+        }
+    return workout_row(day_name(date), workout_type, date=date, **fields)
+
+
+def generate(years: int, rows_per_week: int) -> None:
+    """
+    Writes the history week by week, archiving each finished quarter into its own segment.
+    """
+    rng = random.Random(0)
+    today = datetime.date.today()
+    week = today - datetime.timedelta(weeks=52 * years)
+    quarter_start = week
+    while week < today:
+        append_rows([
+            random_row(rng, week + datetime.timedelta(days=rng.randrange(7)))
+            for _ in range(rows_per_week)
+        ])
+        week += datetime.timedelta(weeks=1)
+        if (week - quarter_start).days >= 91 and week < today - datetime.timedelta(weeks=4):
+            archive_workouts(week)
+            quarter_start = week
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--rows-per-week", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    os.makedirs("data")
+    start = time.perf_counter()
+    generate(args.years, args.rows_per_week)
+    print(f"generated {len(history_sources())} files in {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    rows = list(read_rows()) + list(read_archived_rows())
+    expected = summarize(rows_to_columns(rows))
+    print(f"single pass: {len(rows)} rows in {time.perf_counter() - start:.2f} s")
+
+    counts = {args.workers}
+    counts.update(2 ** power for power in range(args.workers.bit_length()) if 2 ** power < args.workers)
+    baseline = None
+    for workers in sorted(counts):
+        start = time.perf_counter()
+        summary = history_summary(workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        status = "ok" if summary == expected else "MISMATCH"
+        print(f"workers {workers:3d}: {elapsed:6.2f} s  speedup {baseline / elapsed:4.2f}x  {status}")
+        if summary != expected:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Times loading a generated exercise catalog, cold and from its binary cache,
+and the prefix lookups behind the autocomplete, one per keystroke. A linear
+scan over every name and alias checks the lookups and shows what the index
+saves.
+
+The shipped catalog has about two hundred entries, so the catalog here is
+made up at whatever size is asked for.
+
+    python benchmarks/catalog_lookup.py --entries 5000
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import CATALOG_TYPES, COMPLETIONS, MUSCLES, _index_keys, load_catalog
+
+WORDS = [
+    "barbell", "dumbbell", "cable", "machine", "kettlebell", "band", "incline", "decline",
+    "seated", "standing", "single-arm", "single-leg", "close-grip", "wide-grip", "paused",
+    "bench", "press", "row", "curl", "raise", "squat", "deadlift", "lunge", "fly", "pulldown",
+    "extension", "thrust", "bridge", "carry", "stretch", "hold", "rotation", "swing", "clean",
+]
+
+
+def generate(path: str, entries: int) -> None:
+    """
+    Writes a catalog of made up entries with unique names and aliases.
+    """
+    rng = random.Random(0)
+    names = set()
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "workout_type", "aliases", "equipment", "muscles"])
+        while len(names) < entries:
+            name = " ".join(word.capitalize() for word in rng.sample(WORDS, rng.randint(2, 4)))
+            if name.lower() in names:
+                continue
+            names.add(name.lower())
+            alias = f"x{len(names)}"
+            writer.writerow([
+                name,
+                rng.choice(CATALOG_TYPES),
+                alias,
+                rng.choice(WORDS[:6]),
+                ";".join(rng.sample(MUSCLES, rng.randint(1, 4))),
+            ])
+
+
+def scan(catalog, text: str, workout_type: str) -> set:
+    """
+    Finds the entries complete() should, by checking every name and alias.
+    """
+    prefix = " ".join(text.lower().split())
+    _keys, _numbers, names = catalog.index[workout_type]
+    return {number for name, number in names.items() if any(key.startswith(prefix) for key in _index_keys(name))}
+
+
+def summary(timings: list) -> str:
+    timings = sorted(timings)
+    return (
+        f"median {statistics.median(timings) * 1e6:8.1f} us, "
+        f"p99 {timings[int(len(timings) * 0.99)] * 1e6:8.1f} us, "
+        f"max {timings[-1] * 1e6:8.1f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--scans", type=int, default=500, help="lookups to repeat as a linear scan")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "catalog.csv")
+    cache_file = os.path.join(directory, "catalog.cache")
+    generate(path, args.entries)
+
+    start = time.perf_counter()
+    load_catalog(path, cache_file)
+    print(f"cold load:   {(time.perf_counter() - start) * 1000:7.2f} ms for {args.entries} entries")
+    start = time.perf_counter()
+    catalog = load_catalog(path, cache_file)
+    print(f"cached load: {(time.perf_counter() - start) * 1000:7.2f} ms")
+
+    # Every prefix of real names, as they are typed one keystroke at a time.
+    rng = random.Random(1)
+    prefixes = []
+    while len(prefixes) < args.lookups:
+        entry = rng.choice(catalog.entries)
+        prefixes += [(entry.name[:length], entry.workout_type) for length in range(1, len(entry.name) + 1)]
+    prefixes = prefixes[: args.lookups]
+    timings = []
+    found = []
+    for prefix, workout_type in prefixes:
+        start = time.perf_counter()
+        found.append(catalog.complete(prefix, workout_type))
+        timings.append(time.perf_counter() - start)
+    print(f"lookup:      {summary(timings)}")
+
+    timings = []
+    mismatches = 0
+    numbers = {id(entry): number for number, entry in enumerate(catalog.entries)}
+    for (prefix, workout_type), entries in zip(prefixes[: args.scans], found):
+        start = time.perf_counter()
+        expected = scan(catalog, prefix, workout_type)
+        timings.append(time.perf_counter() - start)
+        got = {numbers[id(entry)] for entry in entries}
+        if len(entries) < COMPLETIONS:
+            mismatches += got != expected
+        else:
+            # complete() stops at COMPLETIONS entries, which may be any of the matches.
+            mismatches += not got <= expected
+    print(f"linear scan: {summary(timings)}, {mismatches} of {len(timings)} lookups differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Load generator for server.py: keep-alive GET clients against a local server,
+reporting requests per second and latency percentiles.
+
+    python server.py &
+    python benchmarks/http_load.py --clients 8 --seconds 10 --etag
+"""
+import argparse
+import http.client
+import threading
+import time
+
+
+def client(args, latencies: list, stop: threading.Event) -> None:
+    connection = http.client.HTTPConnection(args.host, args.port)
+    etag = None
+    while not stop.is_set():
+        headers = {"If-None-Match": etag} if args.etag and etag else {}
+        start = time.perf_counter()
+        connection.request("GET", args.path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        etag = response.getheader("ETag") or etag
+    connection.close()
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="/workouts?limit=100")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--etag", action="store_true", help="send If-None-Match like a caching client")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    per_client = [[] for _ in range(args.clients)]
+    threads = [
+        threading.Thread(target=client, args=(args, latencies, stop)) for latencies in per_client
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(latency for latencies in per_client for latency in latencies)
+    if not latencies:
+        print("No requests completed")
+        return
+    print(f"requests: {len(latencies)}")
+    print(f"requests/s: {len(latencies) / args.seconds:.0f}")
+    print(f"p50: {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"p99: {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
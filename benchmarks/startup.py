@@ -0,0 +1,152 @@
+"""
+Measures cold start of the GUI: import time under -X importtime and the time
+from launching python to the main window's first painted frame, run offscreen.
+Exits 1 if either is slower than the stored baseline by more than the tolerance.
+
+    python benchmarks/startup.py                      # compare with the baseline
+    python benchmarks/startup.py --update-baseline    # record this machine's numbers
+
+The baseline is only meaningful on the machine that recorded it, so record
+one on the target device before relying on the check.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+
+
+def child() -> None:
+    """
+    Runs main.main() until the first frame of a window has been painted,
+    then prints the wall clock time.
+    """
+    sys.path.insert(0, ROOT)
+    sys.argv = ["main.py"]
+    import main
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    class FirstPaint(QObject):
+        def eventFilter(self, watched, event) -> bool:
+            if event.type() == QEvent.Type.Paint and watched.isWidgetType() and watched.isWindow():
+                QApplication.instance().removeEventFilter(self)
+                # Queued behind the paint, so it runs once the frame is done.
+                QTimer.singleShot(0, painted)
+            return False
+
+    def painted() -> None:
+        print(f"painted {time.time()}", flush=True)
+        QApplication.instance().quit()
+
+    exec_ = QApplication.exec
+    first_paint = FirstPaint()
+
+    def exec_until_painted() -> int:
+        QApplication.instance().installEventFilter(first_paint)
+        return exec_()
+
+    # exec is static in PyQt6, main calls it through the instance.
+    QApplication.exec = staticmethod(exec_until_painted)
+    try:
+        main.main()
+    except SystemExit:
+        pass
+
+
+def run_child(options: list = ()) -> tuple:
+    """
+    Starts the child in an empty data directory.
+
+    Returns:
+        first_paint: seconds from launch to the first painted frame.
+        stderr: what the child wrote to stderr.
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "data"))
+        start = time.time()
+        result = subprocess.run(
+            [sys.executable, *options, os.path.abspath(__file__), "--child"],
+            cwd=directory,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+    for line in result.stdout.splitlines():
+        if line.startswith("painted "):
+            return float(line.split()[1]) - start, result.stderr
+    raise RuntimeError(f"The window was never painted:\n{result.stderr}")
+
+
+def import_times(stderr: str) -> dict:
+    """
+    Parses -X importtime output.
+
+    Returns:
+        times: module name to its own import time in ms.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_us) / 1000
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, 0.2 is 20%%")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return 0
+
+    # Warm the OS file cache so the first run is not an outlier.
+    run_child()
+    first_paint = statistics.median(run_child()[0] for _ in range(args.runs)) * 1000
+    imports = statistics.median(
+        sum(import_times(run_child(["-X", "importtime"])[1]).values()) for _ in range(args.runs)
+    )
+    slowest = sorted(import_times(run_child(["-X", "importtime"])[1]).items(), key=lambda item: -item[1])
+    print(f"first paint: {first_paint:.0f} ms")
+    print(f"imports:     {imports:.0f} ms")
+    print("slowest imports:")
+    for name, ms in slowest[:10]:
+        print(f"    {ms:6.1f} ms  {name}")
+
+    measured = {"first_paint_ms": round(first_paint), "import_ms": round(imports)}
+    if args.update_baseline:
+        with open(BASELINE_FILE, "w") as file:
+            json.dump(measured, file, indent=2)
+            file.write("\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+    if not os.path.exists(BASELINE_FILE):
+        print("No baseline yet, run with --update-baseline")
+        return 0
+
+    with open(BASELINE_FILE, "r") as file:
+        baseline = json.load(file)
+    failed = False
+    for name, value in measured.items():
+        limit = baseline[name] * (1 + args.tolerance)
+        status = "ok" if value <= limit else "REGRESSED"
+        failed = failed or value > limit
+        print(f"{name}: {value} (baseline {baseline[name]}, limit {limit:.0f}) {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
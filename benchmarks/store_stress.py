@@ -0,0 +1,102 @@
+"""
+Hammers a WorkoutStore with mixed reader, writer and reload threads and
+checks that nothing was lost or torn.
+
+    python benchmarks/store_stress.py --writers 4 --readers 8 --saves 200
+"""
+import argparse
+import collections
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import DAYS, read_rows, workout_row
+from snapshot import update_snapshot
+from store import WorkoutStore
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--saves", type=int, default=200, help="saves per writer")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    os.makedirs("data")
+    store = WorkoutStore()
+    done = threading.Event()
+    errors = []
+    removed = collections.Counter()
+    removed_lock = threading.Lock()
+
+    def writer(number: int) -> None:
+        rng = random.Random(number)
+        for i in range(args.saves):
+            # The duration makes every saved row unique to its writer.
+            duration = str(number * args.saves + i + 1)
+            day = rng.choice(DAYS)
+            row = workout_row(day, "Cardio", cardio_intensity="Low", cardio_duration=duration)
+            store.save_rows([row])
+            if rng.random() < 0.1:
+                with removed_lock:
+                    removed[(day, duration)] += 1
+                store.remove_workouts([(day, f"Cardio: Intensity Low, Duration: {duration} mins")])
+
+    def reader() -> None:
+        last_generation = 0
+        while not done.is_set():
+            generation = store.generation
+            snapshot = store.snapshot()
+            frozen = {day: len(rows) for day, rows in snapshot.items()}
+            for day, rows in snapshot.items():
+                if any(row[0] != day for row in rows):
+                    errors.append(f"row filed under the wrong day in {day}")
+            if generation < last_generation:
+                errors.append("generation went backwards")
+            last_generation = generation
+            store.workouts()
+            if {day: len(rows) for day, rows in snapshot.items()} != frozen:
+                errors.append("a snapshot changed after it was taken")
+
+    def background() -> None:
+        while not done.is_set():
+            store.reload_changed()
+            update_snapshot()
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+    others = [threading.Thread(target=reader) for _ in range(args.readers)]
+    others.append(threading.Thread(target=background))
+    start = time.perf_counter()
+    for thread in threads + others:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    for thread in others:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    on_disk = collections.Counter(map(tuple, read_rows()))
+    in_memory = collections.Counter(store.rows())
+    if on_disk != in_memory:
+        errors.append("store and data files disagree")
+    expected = args.writers * args.saves - sum(removed.values())
+    if sum(on_disk.values()) != expected:
+        errors.append(f"expected {expected} rows, found {sum(on_disk.values())}")
+    if update_snapshot() != expected:
+        errors.append("snapshot row count is off")
+
+    print(f"{args.writers * args.saves} saves in {elapsed:.2f}s, generation {store.generation}")
+    for error in sorted(set(errors)):
+        print("FAIL:", error)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
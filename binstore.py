@@ -0,0 +1,245 @@
+import contextlib
+import datetime
+import mmap
+import os
+import struct
+
+import logic
+from logic import DAYS, WORKOUT_TYPES, INTENSITIES, MAX_NUMBER
+
+# flags, day, type, intensity, stretch, (pad), exercise, duration, weight, sets,
+# reps, date as days since EPOCH with 0 meaning unknown.
+RECORD = struct.Struct("<BBBBBxHHHHHH")
+LIVE = 0
+DELETED = 1
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def _codes(vocabulary: list) -> dict:
+    """
+    Numbers the values of a vocabulary from 1, 0 being left for empty.
+    """
+    return {value: code for code, value in enumerate(vocabulary, 1)}
+
+
+# The catalog has thousands of names, so codes are looked up rather than searched for.
+INTENSITY_CODES = _codes(INTENSITIES)
+# EXERCISE_CODES and STRETCH_CODES number the catalog's names, the logic
+# vocabulary each is made from when first used, see __getattr__.
+CATALOG_CODES = {"EXERCISE_CODES": "EXERCISES", "STRETCH_CODES": "STRETCHES"}
+
+
+def __getattr__(name: str) -> dict:
+    """
+    Gives EXERCISE_CODES and STRETCH_CODES, reading the catalog the first time
+    either is asked for instead of whenever this module is imported.
+    """
+    if name not in CATALOG_CODES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    codes = globals()[name] = _codes(getattr(logic, CATALOG_CODES[name]))
+    return codes
+
+
+def _code(codes: dict, value: str) -> int:
+    """
+    Maps an optional vocabulary value to its code, 0 meaning empty.
+
+    Args:
+        codes: the vocabulary's codes, see _codes.
+        value: the value to encode.
+
+    Returns:
+        code: 1-based index of the value, or 0 if it is empty.
+    """
+    if not value:
+        return 0
+    try:
+        return codes[value]
+    except KeyError:
+        raise ValueError(f"Unknown value: {value}")
+
+
+def _value(vocabulary: list, code: int) -> str:
+    """
+    Maps a code produced by _code back to its value.
+    """
+    return vocabulary[code - 1] if code else ""
+
+
+def _number(value: str) -> int:
+    """
+    Converts an optional numeric CSV field to an int, 0 meaning empty.
+    """
+    return int(value) if value else 0
+
+
+def _days(date: str) -> int:
+    """
+    Converts an optional ISO date field to days since EPOCH, 0 meaning empty.
+    """
+    return (datetime.date.fromisoformat(date) - EPOCH).days if date else 0
+
+
+def _date(days: int) -> str:
+    """
+    Maps days produced by _days back to an ISO date field.
+    """
+    return (EPOCH + datetime.timedelta(days=days)).isoformat() if days else ""
+
+
+def row_codes(row: list) -> tuple:
+    """
+    Dictionary encodes a CSV workout row into its record fields.
+
+    Args:
+        row: workout row in the CSV column order.
+
+    Returns:
+        codes: day, type, intensity, stretch, exercise, duration, weight, sets and reps.
+
+    Raises:
+        ValueError: If a field cannot be represented in the record.
+    """
+    (
+        day,
+        workout_type,
+        cardio_intensity,
+        cardio_duration,
+        weight_exercise,
+        weight,
+        weight_reps,
+        weight_sets,
+        mobility_stretch,
+        mobility_duration,
+    ) = row[:10]
+    numbers = (
+        _number(cardio_duration or mobility_duration),
+        _number(weight),
+        _number(weight_sets),
+        _number(weight_reps),
+    )
+    # logic.workout_row keeps new rows within this, only hand edited files get here.
+    if max(numbers) > MAX_NUMBER:
+        raise ValueError("Workout values are too large to store.")
+    # __getattr__ is not consulted for names used inside the module.
+    try:
+        stretch_codes, exercise_codes = STRETCH_CODES, EXERCISE_CODES
+    except NameError:
+        stretch_codes, exercise_codes = __getattr__("STRETCH_CODES"), __getattr__("EXERCISE_CODES")
+    return (
+        DAYS.index(day),
+        WORKOUT_TYPES.index(workout_type),
+        _code(INTENSITY_CODES, cardio_intensity),
+        _code(stretch_codes, mobility_stretch),
+        _code(exercise_codes, weight_exercise),
+    ) + numbers
+
+
+def encode_row(row: list) -> bytes:
+    """
+    Packs a CSV workout row into a fixed-width binary record.
+
+    Args:
+        row: workout row in the CSV column order.
+
+    Returns:
+        record: the packed record.
+    """
+    return RECORD.pack(LIVE, *row_codes(row), _days(row[10] if len(row) > 10 else ""))
+
+
+def decode_record(record: tuple) -> list:
+    """
+    Turns an unpacked binary record back into a CSV workout row.
+
+    Args:
+        record: tuple produced by RECORD.unpack.
+
+    Returns:
+        row: workout row in the CSV column order.
+    """
+    (
+        _flags,
+        day,
+        workout_type,
+        intensity,
+        stretch,
+        exercise,
+        duration,
+        weight,
+        sets,
+        reps,
+        date,
+    ) = record
+    workout_type = WORKOUT_TYPES[workout_type]
+    number = lambda value: str(value) if value else ""
+    return [
+        DAYS[day],
+        workout_type,
+        _value(INTENSITIES, intensity),
+        number(duration) if workout_type == "Cardio" else "",
+        _value(logic.EXERCISES, exercise),
+        number(weight),
+        number(reps),
+        number(sets),
+        _value(logic.STRETCHES, stretch),
+        number(duration) if workout_type == "Mobility" else "",
+        _date(date),
+    ]
+
+
+@contextlib.contextmanager
+def _mapped(path: str):
+    """
+    Memory maps a file of records read only, yielding an empty buffer for an empty file.
+
+    Args:
+        path: the binary record file.
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def record_at(path: str, index: int) -> list:
+    """
+    Reads a single record by its position without scanning the file.
+
+    Args:
+        path: file of records packed by encode_row.
+        index: position of the record.
+
+    Returns:
+        row: workout row, or None if the record was deleted.
+
+    Raises:
+        IndexError: If there is no record at index.
+    """
+    with _mapped(path) as buffer:
+        if not 0 <= index < len(buffer) // RECORD.size:
+            raise IndexError(f"No record {index} in {path}")
+        record = RECORD.unpack_from(buffer, index * RECORD.size)
+    if record[0] & DELETED:
+        return None
+    return decode_record(record)
+
+
+def read_records(path: str) -> list:
+    """
+    Reads all live records.
+
+    Args:
+        path: file of records packed by encode_row.
+
+    Returns:
+        rows: list of (index, row) pairs.
+    """
+    with _mapped(path) as buffer:
+        return [
+            (index, decode_record(record))
+            for index, record in enumerate(RECORD.iter_unpack(buffer))
+            if not record[0] & DELETED
+        ]
@@ -0,0 +1,291 @@
+"""
+The exercise and stretch catalog: names, aliases, equipment and the muscles
+each entry works, read from exercise_catalog.csv.
+
+Only append new entries to the file. Stored workouts refer to exercises and
+stretches by their position in it, see binstore.row_codes.
+"""
+import bisect
+import csv
+import marshal
+import os
+import typing
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exercise_catalog.csv")
+# Kept with the compiled modules rather than under the working directory, so
+# every program shares one cache whichever directory it was started from.
+CACHE_FILE = os.path.join(os.path.dirname(CATALOG_FILE), "__pycache__", "exercise_catalog.cache")
+# Bumped whenever the cached layout changes.
+CACHE_VERSION = 1
+
+CATALOG_TYPES = ["Weight Training", "Mobility"]
+MUSCLES = [
+    "chest",
+    "upper back",
+    "lats",
+    "lower back",
+    "shoulders",
+    "biceps",
+    "triceps",
+    "forearms",
+    "abs",
+    "obliques",
+    "glutes",
+    "quadriceps",
+    "hamstrings",
+    "calves",
+    "hip flexors",
+    "adductors",
+]
+# Each muscle is one bit of a muscle mask. There can be at most 16,
+# the snapshot keeps the masks in a 16-bit column.
+MUSCLE_BITS = {muscle: 1 << bit for bit, muscle in enumerate(MUSCLES)}
+
+# Suggestions offered for one prefix.
+COMPLETIONS = 50
+
+
+class Exercise(typing.NamedTuple):
+    name: str
+    workout_type: str
+    aliases: tuple
+    equipment: str
+    muscles: tuple
+
+
+def _split(value: str) -> tuple:
+    return tuple(part.strip() for part in value.split(";") if part.strip())
+
+
+def read_catalog(path: str = CATALOG_FILE) -> list:
+    """
+    Reads and checks the catalog file.
+
+    Args:
+        path: the catalog CSV file.
+
+    Returns:
+        entries: the catalog entries in file order.
+
+    Raises:
+        ValueError: naming the first invalid line.
+    """
+    entries = []
+    seen = set()
+    with open(path, "r", newline="") as file:
+        for number, row in enumerate(csv.DictReader(file), 2):
+            entry = Exercise(
+                row["name"].strip(),
+                row["workout_type"].strip(),
+                _split(row["aliases"]),
+                row["equipment"].strip(),
+                _split(row["muscles"]),
+            )
+            if entry.workout_type not in CATALOG_TYPES:
+                raise ValueError(f"{path}:{number}: Unknown workout type {entry.workout_type!r}")
+            for muscle in entry.muscles:
+                if muscle not in MUSCLES:
+                    raise ValueError(f"{path}:{number}: Unknown muscle {muscle!r}")
+            for name in (entry.name,) + entry.aliases:
+                key = (entry.workout_type, name.lower())
+                if key in seen:
+                    raise ValueError(f"{path}:{number}: {name!r} is already in the catalog")
+                seen.add(key)
+            entries.append(entry)
+    return entries
+
+
+def muscle_mask(muscles: typing.Iterable[str]) -> int:
+    """
+    Encodes muscles as a bitmask, see MUSCLE_BITS.
+    """
+    mask = 0
+    for muscle in muscles:
+        mask |= MUSCLE_BITS[muscle]
+    return mask
+
+
+def mask_muscles(mask: int) -> list:
+    """
+    Decodes a bitmask made by muscle_mask.
+    """
+    return [muscle for muscle in MUSCLES if mask & MUSCLE_BITS[muscle]]
+
+
+def _index_keys(name: str) -> list:
+    """
+    Gives the keys a name is found under: the name from each of its words on,
+    so "bench" and "press" both find "Barbell Bench Press".
+    """
+    words = name.lower().split()
+    return [" ".join(words[start:]) for start in range(len(words))]
+
+
+def build_index(entries: list) -> dict:
+    """
+    Sorts the index keys of every name and alias, per workout type.
+
+    Returns:
+        index: workout type to (sorted keys, entry number of each key,
+            lowercase name or alias to entry number).
+    """
+    index = {}
+    for workout_type in CATALOG_TYPES:
+        names = {
+            name.lower(): number
+            for number, entry in enumerate(entries)
+            if entry.workout_type == workout_type
+            for name in (entry.name,) + entry.aliases
+        }
+        pairs = sorted({(key, number) for name, number in names.items() for key in _index_keys(name)})
+        index[workout_type] = ([key for key, _ in pairs], [number for _, number in pairs], names)
+    return index
+
+
+class Catalog:
+    """
+    The catalog entries with a sorted prefix index over their names and aliases.
+    Looking up a prefix is a binary search, however large the catalog.
+
+    Nothing is read until the catalog is first used, so importing a module
+    that refers to it costs nothing.
+    """
+    def __init__(self, path: str = CATALOG_FILE, cache_file: str = CACHE_FILE) -> None:
+        self.path = path
+        self.cache_file = cache_file
+        self._entries = None
+        self._index = None
+
+    @property
+    def entries(self) -> list:
+        if self._entries is None:
+            self.load()
+        return self._entries
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self.load()
+        return self._index
+
+    def load(self) -> None:
+        """
+        Reads the catalog, from its cache if that is up to date.
+        """
+        self._entries, self._index = read_cached(self.path, self.cache_file)
+
+    def names(self, workout_type: str) -> list:
+        """
+        Gives the names of one workout type in catalog order.
+        """
+        return [entry.name for entry in self.entries if entry.workout_type == workout_type]
+
+    def aliases(self, workout_type: str) -> dict:
+        """
+        Gives every alias of one workout type with the name it stands for.
+        """
+        return {
+            alias: entry.name
+            for entry in self.entries
+            if entry.workout_type == workout_type
+            for alias in entry.aliases
+        }
+
+    def muscle_masks(self, workout_type: str) -> list:
+        """
+        Gives the muscle mask of each entry of one workout type, in catalog order.
+        """
+        return [
+            muscle_mask(entry.muscles) for entry in self.entries if entry.workout_type == workout_type
+        ]
+
+    def find(self, text: str, workout_type: str) -> typing.Optional[Exercise]:
+        """
+        Looks up an entry by its name or an alias, ignoring case.
+
+        Returns:
+            entry: the catalog entry, None if there is none.
+        """
+        number = self.index[workout_type][2].get(" ".join(text.lower().split()))
+        return None if number is None else self.entries[number]
+
+    def complete(self, text: str, workout_type: str, limit: int = COMPLETIONS) -> list:
+        """
+        Finds the entries with a name or alias containing a word that starts with the text.
+
+        Args:
+            text: what has been typed so far.
+            workout_type: the workout type of the entries.
+            limit: the most entries to return.
+
+        Returns:
+            entries: the matching entries, in the order of their matching keys.
+        """
+        keys, numbers, _names = self.index[workout_type]
+        prefix = " ".join(text.lower().split())
+        found = []
+        position = bisect.bisect_left(keys, prefix)
+        while position < len(keys) and len(found) < limit and keys[position].startswith(prefix):
+            if numbers[position] not in found:
+                found.append(numbers[position])
+            position += 1
+        return [self.entries[number] for number in found]
+
+
+def read_cached(path: str = CATALOG_FILE, cache_file: str = CACHE_FILE) -> tuple:
+    """
+    Reads the catalog from its binary cache, rebuilding the cache when the
+    catalog file has changed.
+
+    Args:
+        path: the catalog CSV file.
+        cache_file: where the parsed entries and index are kept.
+
+    Returns:
+        entries: the catalog entries in file order.
+        index: the prefix index, see build_index.
+    """
+    status = os.stat(path)
+    stamp = [CACHE_VERSION, status.st_mtime_ns, status.st_size]
+    try:
+        with open(cache_file, "rb") as file:
+            # loads on the whole file is several times faster than load.
+            cached_stamp, entries, index = marshal.loads(file.read())
+        if cached_stamp == stamp:
+            return [Exercise._make(entry) for entry in entries], index
+    except (OSError, EOFError, ValueError, TypeError):
+        # Missing, from another Python version or damaged, it is simply rebuilt.
+        pass
+
+    entries = read_catalog(path)
+    index = build_index(entries)
+    temp_path = cache_file + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+        with open(temp_path, "wb") as file:
+            marshal.dump([stamp, [tuple(entry) for entry in entries], index], file)
+        os.replace(temp_path, cache_file)
+    except OSError:
+        # A read-only install just goes without the cache.
+        pass
+    return entries, index
+
+
+def load_catalog(path: str = CATALOG_FILE, cache_file: str = CACHE_FILE) -> Catalog:
+    """
+    Loads a catalog straight away, see read_cached.
+
+    Args:
+        path: the catalog CSV file.
+        cache_file: where the parsed entries and index are kept.
+
+    Returns:
+        catalog: the loaded catalog.
+    """
+    catalog = Catalog(path, cache_file)
+    catalog.load()
+    return catalog
+
+
+# Read on first use.
+CATALOG = Catalog()
@@ -0,0 +1,392 @@
+"""
+Command line access to the workouts, without the GUI.
+
+    python main.py cli add Monday Cardio --intensity Low --duration 30
+    python main.py cli quick "mon deadlift 225x5x3" "tue cardio high 30"
+    python main.py cli list --day Monday
+    python main.py cli remove Monday "Cardio: Intensity Low, Duration: 30 mins"
+    python main.py cli clear --yes
+    python main.py cli import workouts.csv
+    python main.py cli export workouts.json
+    python main.py cli stats
+    python main.py cli balance --weeks 4
+    python main.py cli list --muscle hamstrings --week
+    python main.py cli archive --weeks 26
+    python main.py cli history 2024-W07
+
+Works on the data files through the logic layer only and never imports Qt,
+so it starts quickly enough for cron jobs and scripts.
+"""
+import argparse
+import csv
+import datetime
+import json
+import sys
+
+from logic import (
+    DAYS,
+    WORKOUT_TYPES,
+    INTENSITIES,
+    check_row,
+    workout_row,
+    append_rows,
+    read_rows,
+    describe_workout,
+    remove_workouts,
+    clear_workouts,
+)
+from catalog import CATALOG, MUSCLES
+
+
+def catalog_name(workout_type: str):
+    """
+    Makes an argparse type that accepts a catalog name or alias of one workout type.
+    The catalog is too large to list as choices.
+    """
+    def name(text: str) -> str:
+        entry = CATALOG.find(text, workout_type)
+        if entry is None:
+            raise argparse.ArgumentTypeError(f"{text!r} is not in the exercise catalog")
+        return entry.name
+
+    return name
+
+
+def fields_from_args(args) -> dict:
+    """
+    Picks the workout fields that belong to the workout type from the options.
+
+    Returns:
+        fields: keyword arguments for logic.workout_row.
+    """
+    if args.workout_type == "Cardio":
+        fields = {"cardio_intensity": args.intensity, "cardio_duration": args.duration}
+    elif args.workout_type == "Weight Training":
+        fields = {
+            # Defaulted here, so commands other than add never read the catalog.
+            "weight_exercise": args.exercise or CATALOG.names("Weight Training")[0],
+            "weight": args.weight,
+            "weight_sets": args.sets,
+            "weight_reps": args.reps,
+        }
+    else:
+        fields = {
+            "mobility_stretch": args.stretch or CATALOG.names("Mobility")[0],
+            "mobility_duration": args.duration,
+        }
+    if args.date:
+        fields["date"] = datetime.date.fromisoformat(args.date)
+    return fields
+
+
+def read_import(path: str) -> list:
+    """
+    Reads workouts to import from a CSV file in the data file layout, or from
+    a JSON list of workouts as the HTTP API takes them.
+
+    Raises:
+        ValueError: naming the first invalid line or entry.
+    """
+    rows = []
+    if path.endswith(".json"):
+        from server import row_from_json
+
+        with open(path, "r") as file:
+            for number, workout in enumerate(json.load(file), 1):
+                try:
+                    rows.append(row_from_json(workout))
+                except ValueError as e:
+                    raise ValueError(f"{path}: entry {number}: {e}")
+        return rows
+    with open(path, "r", newline="") as file:
+        for number, row in enumerate(csv.reader(file), 1):
+            if not row:
+                continue
+            try:
+                rows.append(check_row(row))
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}")
+    return rows
+
+
+def add_command(args) -> int:
+    row = workout_row(args.day, args.workout_type, **fields_from_args(args))
+    append_rows([row])
+    print(describe_workout(row))
+    return 0
+
+
+def quick_command(args) -> int:
+    from quickadd import parse_text
+
+    text = "\n".join(args.lines) if args.lines else sys.stdin.read()
+    rows, errors = parse_text(text)
+    append_rows(rows)
+    for row in rows:
+        print(f"{row[0]}: {describe_workout(row)}")
+    for number, line, message in errors:
+        print(f"Line {number}: {line}: {message}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def muscle_workouts(muscles: list, this_week: bool) -> list:
+    """
+    Reads the workouts that worked any of the muscles from the snapshot's muscles column.
+
+    Args:
+        muscles: muscle names, see catalog.MUSCLES.
+        this_week: only the workouts dated in the current week.
+
+    Returns:
+        rows: workout rows in the CSV column order.
+    """
+    from analytics import muscle_rows, week_of, week_start
+    from snapshot import column_rows, load_columns, update_snapshot
+
+    update_snapshot()
+    columns = load_columns()
+    start = week_start(week_of(datetime.date.today())) if this_week else None
+    return column_rows(columns, muscle_rows(columns, muscles, start))
+
+
+def list_command(args) -> int:
+    if args.muscle:
+        rows = muscle_workouts(args.muscle, args.week)
+        rows = [row for row in rows if args.day is None or row[0] == args.day]
+    else:
+        rows = read_rows(args.day)
+    rows = [row for row in rows if args.type is None or row[1] == args.type]
+    if args.json:
+        from server import row_to_json
+
+        json.dump([row_to_json(row) for row in rows], sys.stdout, indent=2)
+        print()
+        return 0
+    by_day = {}
+    for row in rows:
+        details = describe_workout(row)
+        if details is not None:
+            by_day.setdefault(row[0], []).append(details)
+    print_workouts(by_day)
+    return 0
+
+
+def print_workouts(by_day: dict) -> None:
+    """
+    Prints workout details under their days, in day order.
+    """
+    if not by_day:
+        print("No workouts found")
+    for day in DAYS:
+        if day in by_day:
+            print(day)
+            for details in by_day[day]:
+                print(f"    {details}")
+
+
+def archive_command(args) -> int:
+    from archive import archive_workouts
+
+    count = archive_workouts(datetime.date.today() - datetime.timedelta(weeks=args.weeks))
+    print(f"Archived {count} workouts")
+    return 0
+
+
+def history_command(args) -> int:
+    from archive import archived_weeks, read_archived_workouts
+
+    if args.week is None:
+        weeks = archived_weeks()
+        if not weeks:
+            print("No archived workouts")
+        for week in weeks:
+            print(week)
+        return 0
+    print_workouts(read_archived_workouts(args.week))
+    return 0
+
+
+def remove_command(args) -> int:
+    remove_workouts([(args.day, details) for details in args.details])
+    return 0
+
+
+def clear_command(args) -> int:
+    if not args.yes:
+        print("This deletes every workout, pass --yes to confirm.", file=sys.stderr)
+        return 1
+    clear_workouts()
+    return 0
+
+
+def import_command(args) -> int:
+    rows = read_import(args.file)
+    append_rows(rows)
+    print(f"Imported {len(rows)} workouts")
+    return 0
+
+
+def export_command(args) -> int:
+    rows = list(read_rows())
+    output = sys.stdout if args.file == "-" else open(args.file, "w", newline="")
+    try:
+        if args.format == "json" or (args.format is None and args.file.endswith(".json")):
+            from server import row_to_json
+
+            json.dump([row_to_json(row) for row in rows], output, indent=2)
+            output.write("\n")
+        else:
+            csv.writer(output).writerows(rows)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+def stats_command(args) -> int:
+    if args.history:
+        from mapreduce import history_summary
+
+        summary = history_summary(args.workers)
+    else:
+        from analytics import workout_summary
+
+        summary = workout_summary()
+    if args.json:
+        # JSON objects cannot have tuple keys, so groups become a list of entries.
+        json.dump(
+            {
+                name: [
+                    {"group": list(group) if isinstance(group, tuple) else group, "total": total}
+                    for group, total in groups.items()
+                ]
+                for name, groups in summary.items()
+            },
+            sys.stdout,
+            indent=2,
+        )
+        print()
+        return 0
+    for name, groups in summary.items():
+        print(name)
+        for group, total in sorted(groups.items()):
+            label = ", ".join(group) if isinstance(group, tuple) else group
+            print(f"    {label}: {total}")
+    return 0
+
+
+def balance_command(args) -> int:
+    from analytics import muscle_balance, sets_by_week_muscle
+
+    if args.history:
+        from mapreduce import history_summary
+
+        sets = history_summary(args.workers)["sets_by_week_muscle"]
+    else:
+        from snapshot import load_columns, update_snapshot
+
+        update_snapshot()
+        sets = sets_by_week_muscle(load_columns())
+    starts, table = muscle_balance(sets, args.weeks)
+    if args.json:
+        json.dump({"weeks": starts, "sets": table}, sys.stdout, indent=2)
+        print()
+        return 0
+    width = max(len(muscle) for muscle in MUSCLES)
+    print("Sets per muscle, by the week starting")
+    print(" " * width + "".join(f"{start:>12}" for start in starts))
+    for muscle, counts in table.items():
+        print(f"{muscle:<{width}}" + "".join(f"{count:>12}" for count in counts))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="main.py cli", description="Manage workouts without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="save a workout")
+    add.add_argument("day", choices=DAYS)
+    add.add_argument("workout_type", choices=WORKOUT_TYPES)
+    add.add_argument("--intensity", choices=INTENSITIES, default=INTENSITIES[0])
+    add.add_argument("--duration", help="minutes, for Cardio and Mobility")
+    add.add_argument("--exercise", type=catalog_name("Weight Training"), help="the catalog's first by default")
+    add.add_argument("--weight")
+    add.add_argument("--sets")
+    add.add_argument("--reps")
+    add.add_argument("--stretch", type=catalog_name("Mobility"), help="the catalog's first by default")
+    add.add_argument("--date", help="ISO date the workout is planned for, today by default")
+    add.set_defaults(run=add_command)
+
+    quick = commands.add_parser("quick", help='save workouts typed like "mon deadlift 225x5x3"')
+    quick.add_argument("lines", nargs="*", help="one workout each, read from standard input if none")
+    quick.set_defaults(run=quick_command)
+
+    show = commands.add_parser("list", help="show the workouts")
+    show.add_argument("--day", choices=DAYS)
+    show.add_argument("--type", choices=WORKOUT_TYPES)
+    show.add_argument("--muscle", action="append", choices=MUSCLES, help="only workouts that work it")
+    show.add_argument("--week", action="store_true", help="with --muscle, only this week's workouts")
+    show.add_argument("--json", action="store_true")
+    show.set_defaults(run=list_command)
+
+    archive = commands.add_parser("archive", help="move old workouts out of the weekly view")
+    archive.add_argument("--weeks", type=int, default=26, help="archive workouts older than this many weeks")
+    archive.set_defaults(run=archive_command)
+
+    history = commands.add_parser("history", help="show archived workouts")
+    history.add_argument("week", nargs="?", help='ISO week like "2024-W07", the archived weeks if left out')
+    history.set_defaults(run=history_command)
+
+    remove = commands.add_parser("remove", help="remove workouts by their details as listed")
+    remove.add_argument("day", choices=DAYS)
+    remove.add_argument("details", nargs="+")
+    remove.set_defaults(run=remove_command)
+
+    clear = commands.add_parser("clear", help="delete every workout")
+    clear.add_argument("--yes", action="store_true")
+    clear.set_defaults(run=clear_command)
+
+    load = commands.add_parser("import", help="add workouts from a .csv or .json file")
+    load.add_argument("file")
+    load.set_defaults(run=import_command)
+
+    export = commands.add_parser("export", help="write the workouts to a .csv or .json file")
+    export.add_argument("file", help="- for standard output")
+    export.add_argument("--format", choices=["csv", "json"])
+    export.set_defaults(run=export_command)
+
+    stats = commands.add_parser("stats", help="summarize the workouts")
+    stats.add_argument("--history", action="store_true", help="include archived workouts")
+    stats.add_argument("--workers", type=int, help="processes for --history")
+    stats.add_argument("--json", action="store_true")
+    stats.set_defaults(run=stats_command)
+
+    balance = commands.add_parser("balance", help="weekly sets per muscle")
+    balance.add_argument("--weeks", type=int, default=4)
+    balance.add_argument("--history", action="store_true", help="include archived workouts")
+    balance.add_argument("--workers", type=int, help="processes for --history")
+    balance.add_argument("--json", action="store_true")
+    balance.set_defaults(run=balance_command)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """
+    Runs one command.
+
+    Args:
+        argv: the arguments after "cli", sys.argv[1:] if None.
+
+    Returns:
+        status: the process exit status.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
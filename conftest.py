@@ -0,0 +1,30 @@
+import datetime
+
+import pytest
+
+from logic import workout_row
+
+DATE = datetime.date(2024, 2, 14)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    # Every data path, the daemon's socket too, is relative to the working directory.
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+
+
+def weight_row(day: str, weight: str, exercise: str = "Romanian Deadlift") -> list:
+    return workout_row(
+        day,
+        "Weight Training",
+        weight_exercise=exercise,
+        weight=weight,
+        weight_sets="3",
+        weight_reps="5",
+        date=DATE,
+    )
+
+
+def cardio_row(day: str, duration: str = "30", date: datetime.date = DATE) -> list:
+    return workout_row(day, "Cardio", cardio_intensity="Low", cardio_duration=duration, date=date)
@@ -0,0 +1,391 @@
+"""
+Long-running owner of the workout store, reached over a Unix domain socket.
+
+    python daemon.py
+
+Each frame is a header (payload length, request id, opcode or status) followed
+by the payload. Clients may send several requests before reading any replies;
+replies come back in request order, tagged with the request id.
+"""
+import argparse
+import os
+import socket
+import struct
+import threading
+
+from logic import check_row, describe_workout, workout_row
+from store import WorkoutStore, diff_rows
+
+SOCKET_FILE = "data/fitness.sock"
+FRAME = struct.Struct("!IIB")
+COUNT = struct.Struct("!I")
+FIELD = struct.Struct("!H")
+
+ROWS = 1
+SAVE = 2
+REMOVE = 3
+CLEAR = 4
+GENERATION = 5
+
+OK = 0
+ERROR = 1
+
+
+def encode_rows(rows: list) -> bytes:
+    """
+    Packs rows of strings as a count, then per row a field count and
+    length-prefixed UTF-8 fields.
+
+    Args:
+        rows: rows of strings.
+
+    Returns:
+        payload: the packed rows.
+    """
+    parts = [COUNT.pack(len(rows))]
+    for row in rows:
+        parts.append(bytes([len(row)]))
+        for field in row:
+            data = field.encode()
+            parts.append(FIELD.pack(len(data)))
+            parts.append(data)
+    return b"".join(parts)
+
+
+def decode_rows(payload: bytes) -> list:
+    """
+    Unpacks rows packed by encode_rows.
+
+    Args:
+        payload: the packed rows.
+
+    Returns:
+        rows: tuples of strings.
+    """
+    with memoryview(payload) as view:
+        (count,) = COUNT.unpack_from(view)
+        offset = COUNT.size
+        rows = []
+        for _ in range(count):
+            fields = view[offset]
+            offset += 1
+            row = []
+            for _ in range(fields):
+                (length,) = FIELD.unpack_from(view, offset)
+                offset += FIELD.size
+                row.append(str(view[offset : offset + length], "utf-8"))
+                offset += length
+            rows.append(tuple(row))
+        return rows
+
+
+def handle(store: WorkoutStore, opcode: int, payload: bytes) -> bytes:
+    """
+    Runs one request against the store.
+
+    Args:
+        store: the store owned by the daemon.
+        opcode: what to do.
+        payload: the request arguments.
+
+    Returns:
+        payload: the reply.
+    """
+    if opcode == ROWS:
+        return encode_rows(store.rows(payload.decode() or None))
+    if opcode == SAVE:
+        # Clients are not trusted to send rows workout_row would have built.
+        store.save_rows([check_row(row) for row in decode_rows(payload)])
+    elif opcode == REMOVE:
+        store.remove_workouts(decode_rows(payload))
+    elif opcode == CLEAR:
+        store.clear_workouts()
+    elif opcode != GENERATION:
+        raise ValueError(f"Unknown opcode {opcode}")
+    return COUNT.pack(store.generation)
+
+
+async def serve_client(store: WorkoutStore, reader, writer) -> None:
+    """
+    Answers the requests of one client connection in order.
+    """
+    # Only the serving side needs asyncio. The GUI imports this module for the
+    # client alone, and asyncio is one of the slowest modules to import.
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                header = await reader.readexactly(FRAME.size)
+            except asyncio.IncompleteReadError:
+                break
+            length, request_id, opcode = FRAME.unpack(header)
+            payload = await reader.readexactly(length)
+            try:
+                if opcode in (ROWS, GENERATION):
+                    # Served from memory, a thread hop would cost more than the work.
+                    reply = handle(store, opcode, payload)
+                else:
+                    reply = await loop.run_in_executor(None, handle, store, opcode, payload)
+                status = OK
+            except Exception as e:
+                reply = str(e).encode()
+                status = ERROR
+            writer.write(FRAME.pack(len(reply), request_id, status) + reply)
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(path: str = SOCKET_FILE, store: WorkoutStore = None) -> None:
+    """
+    Runs the daemon until it is cancelled.
+
+    Args:
+        path: the Unix socket to listen on.
+        store: the store to serve, a new one if None.
+    """
+    import asyncio
+
+    store = store or WorkoutStore()
+    store.snapshot()
+    if os.path.exists(path):
+        os.remove(path)
+    connections = set()
+
+    async def serve_connection(reader, writer) -> None:
+        connections.add(writer)
+        try:
+            await serve_client(store, reader, writer)
+        finally:
+            connections.discard(writer)
+
+    server = await asyncio.start_unix_server(serve_connection, path)
+
+    async def watch_files() -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(1)
+            await loop.run_in_executor(None, store.reload_changed)
+
+    watcher = asyncio.ensure_future(watch_files())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+        # Connected clients hear that the daemon stopped instead of waiting for replies.
+        for writer in connections:
+            writer.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class DaemonError(OSError):
+    """
+    Raised when the daemon reports that a request failed.
+    """
+
+
+class DaemonDisconnected(DaemonError):
+    """
+    Raised when the connection to the daemon is lost, usually because it stopped.
+    """
+
+
+class DaemonClient:
+    """
+    Talks to a running daemon. Offers the same calls as WorkoutStore so the
+    GUI and scripts can use either.
+    """
+    def __init__(self, path: str = SOCKET_FILE) -> None:
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rb")
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._rows = None
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def pipeline(self, requests: list) -> list:
+        """
+        Sends several requests at once and then collects their replies.
+
+        Args:
+            requests: (opcode, payload) pairs.
+
+        Returns:
+            replies: reply payloads, in request order.
+
+        Raises:
+            DaemonError: If any request failed.
+            DaemonDisconnected: If the connection was lost.
+        """
+        with self._lock:
+            ids = []
+            frames = []
+            for opcode, payload in requests:
+                self._next_id += 1
+                ids.append(self._next_id)
+                frames.append(FRAME.pack(len(payload), self._next_id, opcode) + payload)
+            try:
+                self._socket.sendall(b"".join(frames))
+            except OSError as e:
+                raise DaemonDisconnected(f"Lost the connection to the daemon: {e}") from e
+
+            replies = []
+            errors = []
+            for request_id in ids:
+                length, reply_id, status = FRAME.unpack(self._read(FRAME.size))
+                reply = self._read(length)
+                if reply_id != request_id:
+                    raise DaemonError("Reply out of order")
+                if status == ERROR:
+                    errors.append(reply.decode())
+                replies.append(reply)
+        if errors:
+            raise DaemonError("; ".join(errors))
+        return replies
+
+    def _read(self, size: int) -> bytes:
+        """
+        Reads exactly size bytes of a reply.
+        """
+        try:
+            data = self._file.read(size)
+        except OSError as e:
+            raise DaemonDisconnected(f"Lost the connection to the daemon: {e}") from e
+        if len(data) < size:
+            raise DaemonDisconnected("The daemon closed the connection")
+        return data
+
+    def call(self, opcode: int, payload: bytes = b"") -> bytes:
+        """
+        Sends one request and waits for its reply.
+        """
+        return self.pipeline([(opcode, payload)])[0]
+
+    @property
+    def generation(self) -> int:
+        return COUNT.unpack(self.call(GENERATION))[0]
+
+    def rows(self, day: str = None) -> list:
+        """
+        Gives the workout rows, see WorkoutStore.rows.
+        Fetching all of them also sets the state reload_changed diffs against.
+        """
+        rows = decode_rows(self.call(ROWS, (day or "").encode()))
+        if day is None:
+            self._rows = self._by_day(rows)
+        return rows
+
+    def workouts(self, day: str = None) -> dict:
+        """
+        Gives the workout entries, see WorkoutStore.workouts.
+        """
+        rows = self.rows(day)
+        workouts = {}
+        for row in rows:
+            details = describe_workout(row)
+            if details is not None:
+                workouts.setdefault(row[0], []).append(details)
+        return workouts
+
+    def save_rows(self, rows: list) -> list:
+        """
+        Appends workout rows in one write, see WorkoutStore.save_rows.
+        """
+        rows = [tuple(row) for row in rows]
+        self.call(SAVE, encode_rows(rows))
+        if self._rows is not None:
+            for row in rows:
+                self._rows[row[0]] = self._rows.get(row[0], ()) + (row,)
+        return rows
+
+    def save_workout(self, day: str, workout_type: str, **fields: str) -> tuple:
+        """
+        Validates and saves a workout entry, see WorkoutStore.save_workout.
+        """
+        return self.save_rows([workout_row(day, workout_type, **fields)])[0]
+
+    def remove_workouts(self, entries: list, token=None, progress=None) -> None:
+        """
+        Removes workout entries, see WorkoutStore.remove_workouts.
+        The daemon does the work in one go, so the token is only checked before
+        sending and progress is not reported.
+        """
+        if not entries:
+            return
+        if token is not None:
+            token.check()
+        self.call(REMOVE, encode_rows(entries))
+        if self._rows is not None:
+            self.rows()
+
+    def clear_workouts(self, token=None, progress=None) -> None:
+        """
+        Deletes all workouts, see WorkoutStore.clear_workouts.
+        """
+        if token is not None:
+            token.check()
+        self.call(CLEAR)
+        self._rows = {}
+
+    def reload_changed(self) -> tuple:
+        """
+        Fetches the rows again and diffs them against the last fetch.
+        See WorkoutStore.reload_changed.
+        """
+        old_rows = self._rows
+        if old_rows is None:
+            return [], [], False
+        self.rows()
+        new_rows = self._rows
+        removed, added = diff_rows(old_rows, new_rows)
+        return removed, added, not new_rows and bool(removed)
+
+    @staticmethod
+    def _by_day(rows: list) -> dict:
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row[0], []).append(row)
+        return {day: tuple(day_rows) for day, day_rows in by_day.items()}
+
+
+def connect(path: str = SOCKET_FILE) -> DaemonClient:
+    """
+    Connects to the daemon if one is running.
+
+    Args:
+        path: the daemon's Unix socket.
+
+    Returns:
+        client: the connected client, or None if no daemon is listening.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    try:
+        return DaemonClient(path)
+    except OSError:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keep the workouts in memory for other programs.")
+    parser.add_argument("--socket", default=SOCKET_FILE)
+    args = parser.parse_args()
+    print(f"Serving workouts on {args.socket}")
+    import asyncio
+
+    try:
+        asyncio.run(serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
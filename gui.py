@@ -4,55 +4,154 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QFormLayout,
-    QLabel,
     QComboBox,
     QLineEdit,
     QMessageBox,
     QTreeWidget,
     QTreeWidgetItem,
+    QApplication,
+    QProgressDialog,
+    QStackedWidget,
+    QCheckBox,
+    QLabel,
+    QTableView,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+    QStyle,
+    QCompleter,
+)
+from PyQt6.QtCore import (
+    Qt,
+    QEvent,
+    QTimer,
+    QAbstractListModel,
+    QAbstractTableModel,
+    QModelIndex,
+    QRectF,
+    QSize,
+    pyqtSignal,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QKeySequence, QPainter, QPalette, QShortcut, QStaticText
 from logic import (
-    toggle_visibility,
-    save_workout,
-    read_workouts,
-    clear_workouts,
-    remove_workouts,
+    DAYS,
+    WORKOUT_TYPES,
+    INTENSITIES,
+    ROW_FIELDS,
+    describe_workout,
+    validate_date,
+    validate_fields,
+    workout_row,
 )
+from jobs import PENDING, RUNNING, PAUSED
+from repository import Operation, WorkoutRepository
+import csv
+import datetime
+import io
+import time
 import typing
 
+# Qt.ItemDataRole values for the default arguments of the item models. The
+# first use of any Qt enum builds all of them, which would add about 20 ms
+# to importing this module.
+DISPLAY_ROLE = 0
+EDIT_ROLE = 2
+
 
 class MainWindow(QWidget):
     """
     Main window for my Fitness App.
     Lets you navigate to the Plan Workout Window or the View Workout Window.
     """
-    def __init__(self) -> None:
+    def __init__(self, store=None) -> None:
         super().__init__()
 
         self.setWindowTitle("Fitness App")
         self.resize(600, 400)
 
+        self.repository = WorkoutRepository(store)
+        self.repository.schedule_maintenance()
+        self.windows = {}
+        # Input anywhere in the app postpones the idle-time maintenance.
+        QApplication.instance().installEventFilter(self)
+
         plan_button = QPushButton("Plan your workout")
         plan_button.clicked.connect(lambda: self.open_window(PlanWorkoutWindow))
 
         view_button = QPushButton("View planned workouts")
         view_button.clicked.connect(lambda: self.open_window(ViewWorkoutWindow))
 
+        bulk_button = QPushButton("Bulk entry")
+        bulk_button.clicked.connect(lambda: self.open_window(BulkEntryWindow))
+
+        maintenance_button = QPushButton("Maintenance")
+        maintenance_button.clicked.connect(lambda: self.open_window(MaintenanceWindow))
+
         main_layout = QHBoxLayout()
         main_layout.addWidget(plan_button)
         main_layout.addWidget(view_button)
+        main_layout.addWidget(bulk_button)
+        main_layout.addWidget(maintenance_button)
 
         self.setLayout(main_layout)
+        self.painted = False
+
+    def paintEvent(self, event) -> None:
+        """
+        Starts watching the data files and building the other windows once
+        this one is on screen.
+        """
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            # Watching reads the manifest, and may migrate a legacy file, so it
+            # waits for the first frame. Queued first, it is running before the
+            # prewarmed windows load any rows.
+            QTimer.singleShot(0, self.repository.watch)
+            QTimer.singleShot(0, self.prewarm_windows)
+
+    def prewarm_windows(self) -> None:
+        """
+        Builds the plan and view windows ahead of the first click, one per
+        event loop pass so the main window keeps painting in between.
+        """
+        for i, window in enumerate([PlanWorkoutWindow, ViewWorkoutWindow]):
+            QTimer.singleShot(i, lambda window=window: self.pooled_window(window))
+
+    def pooled_window(self, window) -> QWidget:
+        """
+        Gives the one instance of a window, building it the first time.
+        Args:
+            window : The window class.
+        """
+        if window not in self.windows:
+            self.windows[window] = window(self.repository)
+        return self.windows[window]
+
+    def eventFilter(self, watched, event) -> bool:
+        """
+        Tells the maintenance scheduler about user input.
+        """
+        if event.type() in (
+            QEvent.Type.KeyPress,
+            QEvent.Type.MouseButtonPress,
+            QEvent.Type.MouseMove,
+            QEvent.Type.Wheel,
+        ):
+            self.repository.scheduler.touch()
+        return False
 
     def open_window(self, window) -> None:
         """
-        Opens the window that is passed
+        Opens the window that is passed, reusing it if it was opened or prewarmed before.
         Args:
             window : The window being opened.
         """
-        self.window = window()
+        self.window = self.pooled_window(window)
+        if not self.window.isVisible():
+            self.window.reset()
         self.window.show()
+        self.window.raise_()
+        self.window.activateWindow()
 
 
 class PlanWorkoutWindow(QWidget):
@@ -60,9 +159,11 @@ class PlanWorkoutWindow(QWidget):
     The window for planning your workout
     Lets users input workout details and save them.
     """
-    def __init__(self) -> None:
+    def __init__(self, repository: WorkoutRepository) -> None:
         super().__init__()
 
+        self.repository = repository
+
         self.setWindowTitle("Plan Workout")
         self.resize(600, 400)
 
@@ -72,101 +173,50 @@ class PlanWorkoutWindow(QWidget):
 
         self.workout_form = QFormLayout()
 
+        # Typed workouts like "mon deadlift 225x5x3" skip the form entirely.
+        self.quick_add_edit = QuickAddEdit()
+        self.quick_add_edit.setPlaceholderText("mon deadlift 225x5x3")
+        # Imported here so the main window paints without the quick-add parser.
+        from quickadd import LINE_FORMS
+
+        self.quick_add_edit.setToolTip(f"One workout per line: {LINE_FORMS}")
+        self.quick_add_edit.submitted.connect(self.quick_add)
+        self.workout_form.addRow("Quick add:", self.quick_add_edit)
+
         self.day_combo = QComboBox()
-        self.day_combo.addItems(
-            [
-                "Sunday",
-                "Monday",
-                "Tuesday",
-                "Wednesday",
-                "Thursday",
-                "Friday",
-                "Saturday",
-            ]
-        )
+        self.day_combo.addItems(DAYS)
         self.workout_form.addRow("Day:", self.day_combo)
 
         self.workout_type_combo = QComboBox()
-        self.workout_type_combo.addItems(["Cardio", "Weight Training", "Mobility"])
+        self.workout_type_combo.addItems(WORKOUT_TYPES)
         self.workout_type_combo.currentTextChanged.connect(self.workout_type_changed)
         self.workout_form.addRow("Workout Type:", self.workout_type_combo)
 
-        self.cardio_intensity_label = QLabel("Intensity:")
-        self.cardio_intensity = QComboBox()
-        self.cardio_intensity.addItems(["Low", "Moderate", "High"])
-        self.cardio_duration_label = QLabel("Duration (Mins):")
-        self.cardio_duration = QLineEdit()
-
-        self.weight_exercise_label = QLabel("Exercise:")
-        self.weight_exercise = QComboBox()
-        self.weight_exercise.addItems(
-            [
-                "Barbell Bench Press",
-                "Deadlift",
-                "Squat (Barbell or Dumbbell)",
-                "Overhead Press (Barbell or Dumbbell)",
-                "Bent-Over Barbell Row",
-                "Dumbbell Chest Fly",
-                "Dumbbell Lateral Raise",
-                "Barbell Curl",
-                "Tricep Pushdown",
-                "Romanian Deadlift",
-            ]
-        )
-        self.weight_weight_label = QLabel("Weight (lbs):")
-        self.weight_weight = QLineEdit()
-        self.weight_sets_label = QLabel("Sets:")
-        self.weight_sets = QLineEdit()
-        self.weight_reps_label = QLabel("Reps:")
-        self.weight_reps = QLineEdit()
+        # Each workout type gets its own page, built the first time the type is picked.
+        self.page_builders = {
+            "Cardio": self.build_cardio_page,
+            "Weight Training": self.build_weight_page,
+            "Mobility": self.build_mobility_page,
+        }
+        self.pages = {}
+        self.page_stack = QStackedWidget()
+        self.workout_form.addRow(self.page_stack)
+        self.show_page(self.workout_type_combo.currentText())
 
-        self.mobility_stretch_label = QLabel("Stretch:")
-        self.mobility_stretch = QComboBox()
-        self.mobility_stretch.addItems(
-            ["Hamstring Stretch", "Hip Flexor Stretch", "Shoulder Mobility"]
+        # Rapid entry saves in the background and confirms inline instead of asking.
+        self.rapid_entry = QCheckBox("Rapid entry")
+        self.rapid_entry.setToolTip("Enter saves and starts the next workout, without a confirmation box")
+        self.status_label = QLabel()
+        self.repository.queued_failed.connect(
+            lambda error: self.show_status(f"Could not save: {error}", error=True)
         )
-        self.mobility_duration_label = QLabel("Duration (Mins):")
-        self.mobility_duration = QLineEdit()
-
-        self.workout_form.addRow(self.cardio_intensity_label, self.cardio_intensity)
-        self.workout_form.addRow(self.cardio_duration_label, self.cardio_duration)
-        self.workout_form.addRow(self.weight_exercise_label, self.weight_exercise)
-        self.workout_form.addRow(self.weight_weight_label, self.weight_weight)
-        self.workout_form.addRow(self.weight_reps_label, self.weight_reps)
-        self.workout_form.addRow(self.weight_sets_label, self.weight_sets)
-        self.workout_form.addRow(self.mobility_stretch_label, self.mobility_stretch)
-        self.workout_form.addRow(self.mobility_duration_label, self.mobility_duration)
-
-        self.widgets = {
-            "Cardio": [
-                self.cardio_intensity_label,
-                self.cardio_intensity,
-                self.cardio_duration_label,
-                self.cardio_duration,
-            ],
-            "Weight Training": [
-                self.weight_exercise_label,
-                self.weight_exercise,
-                self.weight_reps,
-                self.weight_reps_label,
-                self.weight_sets_label,
-                self.weight_sets,
-                self.weight_weight_label,
-                self.weight_weight,
-            ],
-            "Mobility": [
-                self.mobility_stretch,
-                self.mobility_stretch_label,
-                self.mobility_duration,
-                self.mobility_duration_label,
-            ],
-        }
-        toggle_visibility(self.widgets, "Cardio")
 
         self.add_workout_button = QPushButton("Add Workout")
         self.add_workout_button.clicked.connect(self.save_workout)
         self.vertical_layout.addLayout(self.workout_form)
+        self.vertical_layout.addWidget(self.rapid_entry)
         self.vertical_layout.addWidget(self.add_workout_button)
+        self.vertical_layout.addWidget(self.status_label)
 
         self.main_layout.addStretch()
         self.main_layout.addLayout(self.vertical_layout)
@@ -176,51 +226,120 @@ class PlanWorkoutWindow(QWidget):
 
     def workout_type_changed(self, workout_type: str) -> None:
         """
-        Updates the visibility of the form entries
+        Shows the form entries of the selected workout type
+        Args:
+            workout_type: The selected workout type
+        """
+        self.show_page(workout_type)
+
+    def show_page(self, workout_type: str) -> None:
+        """
+        Switches to the page of a workout type, building it the first time.
         Args:
             workout_type: The selected workout type
         """
-        toggle_visibility(self.widgets, workout_type)
+        if workout_type not in self.pages:
+            self.pages[workout_type] = self.page_builders[workout_type]()
+            self.page_stack.addWidget(self.pages[workout_type])
+        self.page_stack.setCurrentIndex(self.page_stack.indexOf(self.pages[workout_type]))
+
+    def form_page(self) -> tuple:
+        """
+        Creates an empty page whose labels line up with the rest of the form.
+        """
+        page = QWidget()
+        form = QFormLayout(page)
+        form.setContentsMargins(0, 0, 0, 0)
+        return page, form
+
+    def build_cardio_page(self) -> QWidget:
+        """
+        Builds the Cardio form entries.
+        """
+        page, form = self.form_page()
+        self.cardio_intensity = QComboBox()
+        self.cardio_intensity.addItems(INTENSITIES)
+        self.cardio_duration = QLineEdit()
+        form.addRow("Intensity:", self.cardio_intensity)
+        form.addRow("Duration (Mins):", self.cardio_duration)
+        return page
+
+    def build_weight_page(self) -> QWidget:
+        """
+        Builds the Weight Training form entries.
+        """
+        page, form = self.form_page()
+        self.weight_exercise = CatalogEdit("Weight Training")
+        self.weight_weight = QLineEdit()
+        self.weight_sets = QLineEdit()
+        self.weight_reps = QLineEdit()
+        form.addRow("Exercise:", self.weight_exercise)
+        form.addRow("Weight (lbs):", self.weight_weight)
+        form.addRow("Reps:", self.weight_reps)
+        form.addRow("Sets:", self.weight_sets)
+        return page
+
+    def build_mobility_page(self) -> QWidget:
+        """
+        Builds the Mobility form entries.
+        """
+        page, form = self.form_page()
+        self.mobility_stretch = CatalogEdit("Mobility")
+        self.mobility_duration = QLineEdit()
+        form.addRow("Stretch:", self.mobility_stretch)
+        form.addRow("Duration (Mins):", self.mobility_duration)
+        return page
+
+    def workout_fields(self) -> tuple:
+        """
+        Reads the form.
+
+        Returns:
+            day: the selected day.
+            workout_type: the selected workout type.
+            fields: the entries of that workout type, see logic.workout_row.
+        """
+        day = self.day_combo.currentText()
+        workout_type = self.workout_type_combo.currentText()
+
+        if workout_type == "Cardio":
+            fields = {
+                "cardio_intensity": self.cardio_intensity.currentText(),
+                "cardio_duration": self.cardio_duration.text(),
+            }
+        elif workout_type == "Weight Training":
+            fields = {
+                "weight_exercise": self.weight_exercise.catalog_name(),
+                "weight": self.weight_weight.text(),
+                "weight_reps": self.weight_reps.text(),
+                "weight_sets": self.weight_sets.text(),
+            }
+        else:
+            fields = {
+                "mobility_stretch": self.mobility_stretch.catalog_name(),
+                "mobility_duration": self.mobility_duration.text(),
+            }
+        return day, workout_type, fields
+
+    def keyPressEvent(self, event) -> None:
+        """
+        Saves on Enter, from whichever field has focus.
+        """
+        if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            self.save_workout()
+        else:
+            super().keyPressEvent(event)
 
     def save_workout(self) -> None:
         """
         Validates and saves the workout data, showing success or error messages.
         """
+        if self.rapid_entry.isChecked():
+            self.queue_workout()
+            return
         try:
-            day = self.day_combo.currentText()
-            workout_type = self.workout_type_combo.currentText()
-
-            if workout_type == "Cardio":
-                cardio_intensity = self.cardio_intensity.currentText()
-                cardio_duration = self.cardio_duration.text()
-                save_workout(
-                    day,
-                    workout_type,
-                    cardio_intensity=cardio_intensity,
-                    cardio_duration=cardio_duration,
-                )
-            elif workout_type == "Weight Training":
-                weight_exercise = self.weight_exercise.currentText()
-                weight = self.weight_weight.text()
-                weight_sets = self.weight_sets.text()
-                weight_reps = self.weight_reps.text()
-                save_workout(
-                    day,
-                    workout_type,
-                    weight_exercise=weight_exercise,
-                    weight=weight,
-                    weight_reps=weight_reps,
-                    weight_sets=weight_sets,
-                )
-            elif workout_type == "Mobility":
-                mobility_stretch = self.mobility_stretch.currentText()
-                mobility_duration = self.mobility_duration.text()
-                save_workout(
-                    day,
-                    workout_type,
-                    mobility_stretch=mobility_stretch,
-                    mobility_duration=mobility_duration,
-                )
+            day, workout_type, fields = self.workout_fields()
+            self.repository.save_workout(day, workout_type, **fields)
 
             msg_box = QMessageBox(self)
             msg_box.setWindowTitle("Success")
@@ -243,18 +362,335 @@ class PlanWorkoutWindow(QWidget):
         except ValueError as e:
             QMessageBox.warning(self, "Invalid Data", str(e))
 
+    def queue_workout(self) -> None:
+        """
+        Hands the workout to the background writer and gets the form ready for the next one.
+        Errors are shown inline, the form is kept so they can be corrected.
+        """
+        try:
+            day, workout_type, fields = self.workout_fields()
+            row = self.repository.queue_workout(day, workout_type, **fields)
+        except ValueError as e:
+            self.show_status(f"Invalid Data: {e}", error=True)
+            return
+        self.show_status(f"Saved {day}: {describe_workout(row)}")
+        self.clear_inputs()
+        self.day_combo.setFocus()
+
+    def quick_add(self, text: str) -> None:
+        """
+        Saves the typed or pasted workouts, one per line, in one write.
+        Invalid lines are listed under the form and the rest are still saved.
+        Args:
+            text: The workout lines.
+        """
+        from quickadd import parse_text
+
+        rows, errors = parse_text(text)
+        if rows:
+            try:
+                self.repository.save_rows(rows)
+            except OSError as e:
+                self.show_status(f"Could not save: {e}", error=True)
+                return
+        messages = []
+        if len(rows) == 1:
+            messages.append(f"Saved {rows[0][0]}: {describe_workout(rows[0])}")
+        elif rows:
+            messages.append(f"Saved {len(rows)} workouts")
+        messages += [f"Line {number}: {message}" for number, _line, message in errors[:QUICK_ADD_ERRORS]]
+        if len(errors) > QUICK_ADD_ERRORS:
+            messages.append(f"... and {len(errors) - QUICK_ADD_ERRORS} more")
+        self.show_status("\n".join(messages), error=bool(errors))
+        # A single bad line stays in the box to be corrected.
+        self.quick_add_edit.setText(errors[0][1] if len(errors) == 1 else "")
+
+    def show_status(self, text: str, error: bool = False) -> None:
+        """
+        Shows a message under the form.
+        Args:
+            text: The message.
+            error: Whether it reports a problem.
+        """
+        self.status_label.setStyleSheet("color: red;" if error else "")
+        self.status_label.setText(text)
+
+    def reset(self) -> None:
+        """
+        Puts the form back the way a new window starts.
+        """
+        self.day_combo.setCurrentIndex(0)
+        self.workout_type_combo.setCurrentIndex(0)
+        self.clear_inputs()
+        self.show_status("")
+
     def clear_inputs(self) -> None:
         """
         Resets all input fields to the default state.
+        Pages that were never built are still in it.
+        """
+        for page in self.pages.values():
+            for combo in page.findChildren(QComboBox):
+                combo.setCurrentIndex(0)
+            for line_edit in page.findChildren(QLineEdit):
+                line_edit.clear()
+
+
+class CatalogCompletionModel(QAbstractListModel):
+    """
+    The catalog entries matching what has been typed, looked up on each keystroke
+    instead of filtering a model of the whole catalog.
+    """
+    def __init__(self, workout_type: str, parent=None) -> None:
+        super().__init__(parent)
+        self.workout_type = workout_type
+        self.entries = []
+
+    def set_prefix(self, text: str) -> None:
+        """
+        Replaces the suggestions with the entries matching the text.
+        """
+        from catalog import CATALOG
+
+        self.beginResetModel()
+        self.entries = CATALOG.complete(text, self.workout_type) if text.strip() else []
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index: QModelIndex, role=DISPLAY_ROLE):
+        entry = self.entries[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return entry.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{entry.equipment.capitalize()}, works {', '.join(entry.muscles)}"
+        return None
+
+
+class CatalogEdit(QLineEdit):
+    """
+    Entry for an exercise or stretch that suggests catalog names and aliases as you type.
+    Args:
+        workout_type: The workout type whose entries are suggested.
+    """
+    def __init__(self, workout_type: str, parent=None) -> None:
+        super().__init__(parent)
+        self.workout_type = workout_type
+        self.kind = "an exercise" if workout_type == "Weight Training" else "a stretch"
+        self.setPlaceholderText(f"Type {self.kind} name or alias")
+        self.completion_model = CatalogCompletionModel(workout_type, self)
+        completer = QCompleter(self.completion_model, self)
+        # The model already holds only the matches, alias matches included.
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setCompleter(completer)
+        self.textEdited.connect(self.suggest)
+
+    def suggest(self, text: str) -> None:
+        """
+        Shows the entries matching the typed text.
         """
-        self.cardio_intensity.setCurrentIndex(0)
-        self.cardio_duration.clear()
-        self.weight_exercise.setCurrentIndex(0)
-        self.weight_weight.clear()
-        self.weight_sets.clear()
-        self.weight_reps.clear()
-        self.mobility_stretch.setCurrentIndex(0)
-        self.mobility_duration.clear()
+        self.completion_model.set_prefix(text)
+        if self.completion_model.entries:
+            self.completer().complete()
+        else:
+            self.completer().popup().hide()
+
+    def catalog_name(self) -> str:
+        """
+        Gives the catalog name of the typed name or alias.
+
+        Raises:
+            ValueError: If it is not in the catalog.
+        """
+        from catalog import CATALOG
+
+        if not self.text().strip():
+            raise ValueError(f"Choose {self.kind}.")
+        entry = CATALOG.find(self.text(), self.workout_type)
+        if entry is None:
+            raise ValueError(f"{self.text().strip()!r} is not {self.kind} in the catalog.")
+        return entry.name
+
+
+QUICK_ADD_ERRORS = 5
+
+
+class QuickAddEdit(QLineEdit):
+    """
+    One line entry for typed workouts.
+    Enter submits the line, pasting several lines submits them all at once
+    instead of joining them into one line.
+    """
+    submitted = pyqtSignal(str)
+
+    def keyPressEvent(self, event) -> None:
+        if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            # Accepted here so the plan form does not also save on this Enter.
+            if self.text().strip():
+                self.submitted.emit(self.text())
+            event.accept()
+            return
+        if event.matches(QKeySequence.StandardKey.Paste):
+            text = QApplication.clipboard().text()
+            if "\n" in text.strip():
+                self.submitted.emit(text)
+                return
+        super().keyPressEvent(event)
+
+
+# The workout row behind a workout item of the view window, Qt.ItemDataRole.UserRole.
+ROW_ROLE = 256
+# Badge label and color of each workout type.
+BADGES = {
+    "Cardio": ("Cardio", (204, 85, 0)),
+    "Weight Training": ("Weights", (52, 101, 164)),
+    "Mobility": ("Mobility", (78, 154, 6)),
+}
+
+
+class WorkoutDelegate(QStyledItemDelegate):
+    """
+    Paints workout rows straight from their fields: a badge for the type, the
+    exercise, stretch or intensity, then the numbers in aligned columns.
+    Nothing is formatted until a row is painted, and each distinct text is
+    laid out once into a QStaticText that every row showing it reuses.
+    """
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.fonts = {}
+        # Made here rather than in BADGES, a QColor built on import pulls in every Qt enum.
+        self.badge_colors = {name: QColor(*rgb) for name, (_label, rgb) in BADGES.items()}
+        # Asking the widget for its style on every paint costs more than the painting.
+        self.style = parent.style() if parent is not None else QApplication.style()
+
+    def font_cache(self, option) -> dict:
+        """
+        Gives the column widths, laid out texts and row layouts for the option's font.
+        """
+        key = option.font.key()
+        if key not in self.fonts:
+            from catalog import CATALOG
+
+            metrics = option.fontMetrics
+            names = CATALOG.names("Weight Training") + CATALOG.names("Mobility") + INTENSITIES
+            longest = max(metrics.horizontalAdvance(name) for name in names)
+            self.fonts[key] = {
+                "padding": metrics.averageCharWidth(),
+                "badge": max(metrics.horizontalAdvance(label) for label, _color in BADGES.values())
+                + 2 * metrics.averageCharWidth(),
+                "name": min(longest, metrics.averageCharWidth() * 32),
+                "weight": metrics.horizontalAdvance("9999 lbs"),
+                "amount": max(metrics.horizontalAdvance("99 × 99"), metrics.horizontalAdvance("999 min")),
+                "texts": {},
+                "rows": {},
+            }
+        return self.fonts[key]
+
+    def static_text(self, option, cache: dict, template: str, values: tuple, width: int = None) -> tuple:
+        """
+        Lays out a text the first time it is needed, giving the text with its width and height.
+        Args:
+            option: The style option with the font.
+            cache: The font's cache, see font_cache.
+            template: The format of the text.
+            values: The values filled into the template.
+            width: Elide the text to fit this width.
+        """
+        key = (template, values, width)
+        text = cache["texts"].get(key)
+        if text is None:
+            string = template.format(*values)
+            if width is not None:
+                string = option.fontMetrics.elidedText(string, Qt.TextElideMode.ElideRight, width)
+            static = QStaticText(string)
+            static.setTextFormat(Qt.TextFormat.PlainText)
+            static.prepare(font=option.font)
+            size = static.size()
+            text = cache["texts"][key] = (static, size.width(), size.height())
+        return text
+
+    def row_layout(self, option, cache: dict, row: tuple, height: int) -> tuple:
+        """
+        Places the texts of a workout row, relative to the top left of its text area.
+        Args:
+            option: The style option with the font.
+            cache: The font's cache, see font_cache.
+            row: The workout row.
+            height: The height of the row.
+        Returns:
+            label: The badge text and its offsets.
+            texts: The name and number texts and their offsets.
+        """
+        name = cache["name"]
+        if row[1] == "Cardio":
+            parts = [("{} intensity", (row[2],), name), None, ("{} min", (row[3],))]
+        elif row[1] == "Weight Training":
+            parts = [("{}", (row[4],), name), ("{} lbs", (row[5],)), ("{} × {}", (row[7], row[6]))]
+        else:
+            parts = [("{}", (row[8],), name), None, ("{} min", (row[9],))]
+
+        static, width, text_height = self.static_text(option, cache, "{}", (BADGES[row[1]][0],))
+        label = (static, round((cache["badge"] - width) / 2), round((height - text_height) / 2))
+        texts = []
+        left = cache["badge"] + cache["padding"]
+        # The name is left aligned, the numbers right aligned in their columns.
+        for part, column in zip(parts, [name, cache["weight"], cache["amount"]]):
+            if part is not None:
+                static, width, text_height = self.static_text(option, cache, *part)
+                x = left if column == name else left + column - width
+                texts.append((static, round(x), round((height - text_height) / 2)))
+            left += column + 2 * cache["padding"]
+        return label, texts
+
+    def paint(self, painter: QPainter, option, index: QModelIndex) -> None:
+        row = index.data(ROW_ROLE)
+        if row is None:
+            super().paint(painter, option, index)
+            return
+        option = QStyleOptionViewItem(option)
+        self.initStyleOption(option, index)
+        # The style draws the background, selection and check box, there is no text for it to draw.
+        self.style.drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+        rect = self.style.subElementRect(QStyle.SubElement.SE_ItemViewItemText, option, option.widget)
+
+        cache = self.font_cache(option)
+        # Rows differing only in day or date look the same.
+        key = (row[1:10], rect.height())
+        layout = cache["rows"].get(key)
+        if layout is None:
+            layout = cache["rows"][key] = self.row_layout(option, cache, row, rect.height())
+        (label, label_x, label_y), texts = layout
+        x, y = rect.left(), rect.top()
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.badge_colors[row[1]])
+        painter.drawRoundedRect(QRectF(x, y + 1, cache["badge"], rect.height() - 2), 4, 4)
+        painter.setPen(QColor(Qt.GlobalColor.white))
+        painter.drawStaticText(x + label_x, y + label_y, label)
+        selected = option.state & QStyle.StateFlag.State_Selected
+        painter.setPen(
+            option.palette.color(QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text)
+        )
+        for static, text_x, text_y in texts:
+            painter.drawStaticText(x + text_x, y + text_y, static)
+        painter.restore()
+
+    def sizeHint(self, option, index: QModelIndex) -> QSize:
+        if index.data(ROW_ROLE) is None:
+            return super().sizeHint(option, index)
+        cache = self.font_cache(option)
+        width = (
+            self.style.pixelMetric(QStyle.PixelMetric.PM_IndicatorWidth)
+            + cache["badge"]
+            + cache["name"]
+            + cache["weight"]
+            + cache["amount"]
+            + 8 * cache["padding"]
+        )
+        return QSize(width, option.fontMetrics.height() + 6)
 
 
 class ViewWorkoutWindow(QWidget):
@@ -262,15 +698,23 @@ class ViewWorkoutWindow(QWidget):
     Window for viewing and managing planned workouts.
     Allows users to view, remove selected workouts, or clear all workouts.
     """
-    def __init__(self):
+    def __init__(self, repository: WorkoutRepository):
         super().__init__()
 
+        self.repository = repository
+        self.repository.workouts_added.connect(self.add_workouts)
+        self.repository.workouts_removed.connect(self.remove_workout_items)
+        self.repository.workouts_cleared.connect(self.clear_tree)
+
         self.setWindowTitle("View Workouts")
         self.resize(600, 400)
 
         self.main_layout = QHBoxLayout()
         self.tree_widget = QTreeWidget()
         self.tree_widget.setHeaderLabels(["Day"])
+        self.tree_widget.setItemDelegate(WorkoutDelegate(self.tree_widget))
+        # Saves asking every item for its height, which matters with many workouts.
+        self.tree_widget.setUniformRowHeights(True)
 
         self.remove_checked_button = QPushButton("Finish Selected Workouts")
         self.remove_checked_button.clicked.connect(self.remove_checked_items)
@@ -289,29 +733,104 @@ class ViewWorkoutWindow(QWidget):
         self.tree_widget.resizeColumnToContents(0)
         self.tree_widget.resizeColumnToContents(1)
 
+    def reset(self) -> None:
+        """
+        Unchecks and expands everything, the way a new window starts.
+        The tree itself is kept up to date by the repository's signals.
+        """
+        for i in range(self.tree_widget.topLevelItemCount()):
+            day_item = self.tree_widget.topLevelItem(i)
+            day_item.setExpanded(True)
+            for j in range(day_item.childCount()):
+                workout_item = day_item.child(j)
+                if workout_item.checkState(0) != Qt.CheckState.Unchecked:
+                    workout_item.setCheckState(0, Qt.CheckState.Unchecked)
+
     def fill_workouts(self) -> None:
         """
         Fills the tree widget with the list of workouts grouped by day
         """
-        try:
-            workouts = read_workouts()
+        workouts = {}
+        for row in self.repository.rows():
+            if row[1] in BADGES:
+                workouts.setdefault(row[0], []).append(self.workout_item(row))
+        for day, items in workouts.items():
+            self.day_item(day).addChildren(items)
 
-            for day, details in workouts.items():
-                day_item = QTreeWidgetItem([day])
-                self.tree_widget.addTopLevelItem(day_item)
-
-                for workout in details:
-                    workout_item = QTreeWidgetItem([workout])
-                    workout_item.setFlags(
-                        workout_item.flags() | Qt.ItemFlag.ItemIsUserCheckable
-                    )
-                    workout_item.setCheckState(0, Qt.CheckState.Unchecked)
-                    day_item.addChild(workout_item)
-
-        except FileNotFoundError:
+        if not workouts:
             no_workouts_item = QTreeWidgetItem(["No workouts found"])
             self.tree_widget.addTopLevelItem(no_workouts_item)
 
+    def workout_item(self, row: tuple) -> QTreeWidgetItem:
+        """
+        Builds a checkable tree item for a workout, painted by WorkoutDelegate.
+        Args:
+            row: The workout row.
+        """
+        workout_item = QTreeWidgetItem()
+        workout_item.setData(0, ROW_ROLE, tuple(row))
+        workout_item.setFlags(workout_item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+        workout_item.setCheckState(0, Qt.CheckState.Unchecked)
+        return workout_item
+
+    def day_item(self, day: str) -> QTreeWidgetItem:
+        """
+        Finds the tree item of a day, adding it in day order if it is missing.
+        Args:
+            day: The day of the workouts.
+        """
+        index = 0
+        for i in range(self.tree_widget.topLevelItemCount()):
+            item = self.tree_widget.topLevelItem(i)
+            if item.text(0) == day:
+                return item
+            if item.text(0) in DAYS and DAYS.index(item.text(0)) < DAYS.index(day):
+                index = i + 1
+            elif item.text(0) not in DAYS:
+                # The "No workouts found" placeholder.
+                self.tree_widget.takeTopLevelItem(i)
+                break
+
+        day_item = QTreeWidgetItem([day])
+        self.tree_widget.insertTopLevelItem(index, day_item)
+        day_item.setExpanded(True)
+        return day_item
+
+    def add_workouts(self, rows: list) -> None:
+        """
+        Adds newly saved workouts to the tree.
+        Args:
+            rows: The saved workout rows.
+        """
+        for row in rows:
+            if row[1] in BADGES:
+                self.day_item(row[0]).addChild(self.workout_item(row))
+
+    def remove_workout_items(self, entries: list) -> None:
+        """
+        Removes finished workouts from the tree.
+        Args:
+            entries: List of (day, workout details) that were removed.
+        """
+        entries = set(entries)
+        days = {day for day, _details in entries}
+        for i in reversed(range(self.tree_widget.topLevelItemCount())):
+            day_item = self.tree_widget.topLevelItem(i)
+            if day_item.text(0) not in days:
+                continue
+            for j in reversed(range(day_item.childCount())):
+                row = day_item.child(j).data(0, ROW_ROLE)
+                if (day_item.text(0), describe_workout(row)) in entries:
+                    day_item.removeChild(day_item.child(j))
+            if day_item.text(0) in DAYS and day_item.childCount() == 0:
+                self.tree_widget.takeTopLevelItem(i)
+
+    def clear_tree(self) -> None:
+        """
+        Empties the tree once all workouts are cleared.
+        """
+        self.tree_widget.clear()
+
     def confirm_clear_workouts(self) -> None:
         """
         Shows a confirmation box before clearing all the workouts
@@ -327,10 +846,48 @@ class ViewWorkoutWindow(QWidget):
 
     def clear_workouts(self):
         """
-        Clears all workouts from the CSV and the tree widget, then refreshes the tree.
+        Clears all workouts, the tree is emptied when the repository reports it.
         """
-        clear_workouts()
-        self.tree_widget.clear()
+        self.show_progress("Clearing workouts...", self.repository.start_clear_workouts())
+
+    def show_progress(self, label: str, operation: Operation) -> None:
+        """
+        Shows a cancellable progress dialog for a long operation.
+        Quick operations finish before the dialog would appear.
+        Args:
+            label: What the operation is doing.
+            operation: The started operation.
+        """
+        dialog = QProgressDialog(label, "Cancel", 0, 1000, self)
+        dialog.setWindowTitle("Please wait")
+        dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+        dialog.setMinimumDuration(300)
+        dialog.setAutoReset(False)
+        dialog.canceled.connect(operation.cancel)
+        started = time.monotonic()
+
+        def report(rows: int, done: int, total: int) -> None:
+            if dialog.wasCanceled() or not total:
+                return
+            text = f"{label}\n{rows} rows, {done / 1e6:.1f} of {total / 1e6:.1f} MB"
+            if done:
+                remaining = (time.monotonic() - started) * (total - done) / done
+                text += f", about {remaining:.0f} s left"
+            dialog.setLabelText(text)
+            dialog.setValue(min(999, done * 1000 // total))
+
+        def done() -> None:
+            dialog.close()
+            dialog.deleteLater()
+
+        def failed(error: str) -> None:
+            done()
+            QMessageBox.warning(self, "Error", error)
+
+        operation.progress.connect(report)
+        operation.finished.connect(done)
+        operation.cancelled.connect(done)
+        operation.failed.connect(failed)
 
     def remove_checked_items(self):
         """
@@ -343,11 +900,433 @@ class ViewWorkoutWindow(QWidget):
             for j in range(day_item.childCount()):
                 workout_item = day_item.child(j)
                 if workout_item.checkState(0) == Qt.CheckState.Checked:
-                    entry_str = workout_item.text(0)
+                    entry_str = describe_workout(workout_item.data(0, ROW_ROLE))
                     day_str = day_item.text(0)
                     entries.append((day_str,entry_str))
-        remove_workouts(entries)
+        if entries:
+            self.show_progress(
+                "Finishing workouts...", self.repository.start_remove_workouts(entries)
+            )
 
+
+class MaintenanceWindow(QWidget):
+    """
+    Window showing the background maintenance jobs.
+    Allows users to cancel a waiting or running job.
+    """
+    def __init__(self, repository: WorkoutRepository):
+        super().__init__()
+
+        self.scheduler = repository.scheduler
+        self.jobs = []
+
+        self.setWindowTitle("Maintenance")
+        self.resize(600, 400)
+
+        self.tree_widget = QTreeWidget()
+        self.tree_widget.setHeaderLabels(["Job", "State", "Time"])
+        self.tree_widget.setRootIsDecorated(False)
+
+        self.cancel_button = QPushButton("Cancel Selected Job")
+        self.cancel_button.clicked.connect(self.cancel_selected)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.tree_widget)
+        layout.addWidget(self.cancel_button)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh()
+        self.tree_widget.resizeColumnToContents(0)
+
+    def reset(self) -> None:
+        """
+        Shows the jobs as they are now.
+        """
+        self.refresh()
+
+    def showEvent(self, event) -> None:
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        # The window is kept for reuse, there is nothing to refresh while it is hidden.
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self) -> None:
+        """
+        Shows the current state of the jobs, keeping the selection.
+        """
+        selected = self.selected_job()
+        status = self.scheduler.status()
+        self.jobs = [job["job"] for job in status]
         self.tree_widget.clear()
-        self.fill_workouts()
-        self.tree_widget.expandAll()
+        for job in status:
+            state = job["state"]
+            if job["error"]:
+                state = f"{state}: {job['error']}"
+            seconds = "" if job["seconds"] is None else f"{job['seconds']:.1f} s"
+            item = QTreeWidgetItem([job["name"], state, seconds])
+            self.tree_widget.addTopLevelItem(item)
+            if job["job"] is selected:
+                self.tree_widget.setCurrentItem(item)
+        self.cancel_button.setEnabled(
+            any(job["state"] in (PENDING, RUNNING, PAUSED) for job in status)
+        )
+
+    def selected_job(self):
+        """
+        Gives the job of the selected row, or None.
+        """
+        item = self.tree_widget.currentItem()
+        if item is None or not item.isSelected():
+            return None
+        return self.jobs[self.tree_widget.indexOfTopLevelItem(item)]
+
+    def cancel_selected(self) -> None:
+        """
+        Cancels the selected job.
+        """
+        job = self.selected_job()
+        if job is not None:
+            self.scheduler.cancel(job)
+            self.refresh()
+
+
+# The bulk entry grid has a column per CSV column of a workout row.
+GRID_HEADERS = [
+    "Day",
+    "Type",
+    "Intensity",
+    "Cardio Mins",
+    "Exercise",
+    "Weight (lbs)",
+    "Reps",
+    "Sets",
+    "Stretch",
+    "Mobility Mins",
+    "Date",
+]
+GRID_CHOICES = {0: DAYS, 1: WORKOUT_TYPES, 2: INTENSITIES}
+GRID_CATALOG = {4: "Weight Training", 8: "Mobility"}
+GRID_NUMBERS = {3: "Duration", 5: "Weight", 6: "Reps", 7: "Sets", 9: "Duration"}
+GRID_TYPE_COLUMNS = {"Cardio": [2, 3], "Weight Training": [4, 5, 6, 7], "Mobility": [8, 9]}
+
+
+def grid_row_errors(row: list) -> dict:
+    """
+    Validates one row of the bulk entry grid.
+
+    Args:
+        row: the grid row, in the CSV column order.
+
+    Returns:
+        errors: column to the problem with its cell, empty for a valid or blank row.
+    """
+    from catalog import CATALOG
+
+    if not any(row):
+        return {}
+    errors = {}
+    for column in [0, 1] + GRID_TYPE_COLUMNS.get(row[1], []):
+        if column in GRID_CHOICES:
+            if row[column] not in GRID_CHOICES[column]:
+                errors[column] = f"Pick one of: {', '.join(GRID_CHOICES[column])}"
+        elif column in GRID_CATALOG:
+            if CATALOG.find(row[column], GRID_CATALOG[column]) is None:
+                errors[column] = "Type a name or alias from the exercise catalog"
+        else:
+            try:
+                validate_fields(**{GRID_NUMBERS[column]: row[column]})
+            except ValueError as e:
+                errors[column] = str(e)
+    if row[10]:
+        try:
+            date = datetime.date.fromisoformat(row[10])
+        except ValueError:
+            errors[10] = "Use a date like 2024-02-14, or leave it empty for today"
+        else:
+            try:
+                validate_date(date)
+            except ValueError as e:
+                errors[10] = str(e)
+    return errors
+
+
+class WorkoutTableModel(QAbstractTableModel):
+    """
+    Editable workout rows for the bulk entry grid, validated as they are typed.
+    There is always a blank row at the bottom to type the next workout into.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows = [[""] * len(GRID_HEADERS)]
+        self.errors = [{}]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(GRID_HEADERS)
+
+    def headerData(self, section: int, orientation, role=DISPLAY_ROLE):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return GRID_HEADERS[section]
+        return str(section + 1)
+
+    def applies(self, row: int, column: int) -> bool:
+        """
+        Whether a column is used by the workout type of a row.
+        """
+        return column in (0, 1, 10) or column in GRID_TYPE_COLUMNS.get(self.rows[row][1], [])
+
+    def flags(self, index: QModelIndex):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if self.applies(index.row(), index.column()):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index: QModelIndex, role=DISPLAY_ROLE):
+        row, column = index.row(), index.column()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.rows[row][column]
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if column in self.errors[row]:
+                return QColor(255, 205, 205)
+            if not self.applies(row, column):
+                return QColor(235, 235, 235)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.errors[row].get(column)
+        return None
+
+    def setData(self, index: QModelIndex, value, role=EDIT_ROLE) -> bool:
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        self.set_cells(index.row(), index.column(), [[str(value)]])
+        return True
+
+    def set_cells(self, row: int, column: int, block: list) -> None:
+        """
+        Writes a block of values, like a paste, adding rows as needed.
+        Args:
+            row: The top row of the block.
+            column: The left column of the block.
+            block: Rows of cell values, cells past the last column are dropped.
+        """
+        end = row + len(block)
+        if end > len(self.rows):
+            self.beginInsertRows(QModelIndex(), len(self.rows), end - 1)
+            for _ in range(end - len(self.rows)):
+                self.rows.append([""] * len(GRID_HEADERS))
+                self.errors.append({})
+            self.endInsertRows()
+        for r, values in enumerate(block, row):
+            for c, value in enumerate(values[: len(GRID_HEADERS) - column], column):
+                self.rows[r][c] = self.normalize(c, value)
+            self.errors[r] = grid_row_errors(self.rows[r])
+        # A change of type changes which cells apply, so whole rows are refreshed.
+        self.dataChanged.emit(self.index(row, 0), self.index(end - 1, len(GRID_HEADERS) - 1))
+        if any(self.rows[-1]):
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows))
+            self.rows.append([""] * len(GRID_HEADERS))
+            self.errors.append({})
+            self.endInsertRows()
+
+    @staticmethod
+    def normalize(column: int, value: str) -> str:
+        """
+        Trims a typed value and matches choices regardless of case,
+        catalog aliases become their names.
+        """
+        value = value.strip()
+        if column in GRID_CATALOG:
+            from catalog import CATALOG
+
+            entry = CATALOG.find(value, GRID_CATALOG[column])
+            return entry.name if entry is not None else value
+        for choice in GRID_CHOICES.get(column, []):
+            if choice.lower() == value.lower():
+                return choice
+        return value
+
+    def invalid_rows(self) -> list:
+        """
+        Gives the indexes of rows with errors.
+        """
+        return [row for row, errors in enumerate(self.errors) if errors]
+
+    def workout_rows(self) -> list:
+        """
+        Builds the data file rows of the non-blank rows, which must all be valid.
+        Cells the workout type does not use are left out.
+        """
+        rows = []
+        for row in self.rows:
+            if not any(row):
+                continue
+            fields = {ROW_FIELDS[column]: row[column] for column in GRID_TYPE_COLUMNS[row[1]]}
+            if row[10]:
+                fields["date"] = datetime.date.fromisoformat(row[10])
+            rows.append(workout_row(row[0], row[1], **fields))
+        return rows
+
+    def clear(self) -> None:
+        """
+        Leaves only the blank row.
+        """
+        self.beginResetModel()
+        self.rows = [[""] * len(GRID_HEADERS)]
+        self.errors = [{}]
+        self.endResetModel()
+
+
+class ChoiceDelegate(QStyledItemDelegate):
+    """
+    Edits the grid's choice columns with a combo box and its catalog
+    columns with catalog suggestions.
+    """
+    def createEditor(self, parent, option, index):
+        if index.column() in GRID_CATALOG:
+            return CatalogEdit(GRID_CATALOG[index.column()], parent)
+        if index.column() not in GRID_CHOICES:
+            return super().createEditor(parent, option, index)
+        editor = QComboBox(parent)
+        editor.addItems(GRID_CHOICES[index.column()])
+        return editor
+
+    def setEditorData(self, editor, index) -> None:
+        if isinstance(editor, QComboBox):
+            if index.data() in GRID_CHOICES[index.column()]:
+                editor.setCurrentText(index.data())
+        else:
+            super().setEditorData(editor, index)
+
+    def setModelData(self, editor, model, index) -> None:
+        if isinstance(editor, QComboBox):
+            model.setData(index, editor.currentText())
+        else:
+            super().setModelData(editor, model, index)
+
+
+class BulkEntryWindow(QWidget):
+    """
+    Spreadsheet-like window for entering or pasting many workouts at once.
+    Cells are checked as they are typed and all rows are saved in one write.
+    Unsaved rows are kept when the window is closed and opened again.
+    """
+    def __init__(self, repository: WorkoutRepository):
+        super().__init__()
+
+        self.repository = repository
+
+        self.setWindowTitle("Bulk Entry")
+        self.resize(1000, 500)
+
+        self.model = WorkoutTableModel()
+        self.model.dataChanged.connect(self.update_status)
+        self.model.modelReset.connect(self.update_status)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegate(ChoiceDelegate(self.table))
+        self.table.resizeColumnsToContents()
+
+        # Scoped to the table, so editors keep their own paste and delete.
+        paste = QShortcut(QKeySequence.StandardKey.Paste, self.table)
+        paste.setContext(Qt.ShortcutContext.WidgetShortcut)
+        paste.activated.connect(self.paste)
+        delete = QShortcut(QKeySequence.StandardKey.Delete, self.table)
+        delete.setContext(Qt.ShortcutContext.WidgetShortcut)
+        delete.activated.connect(self.clear_selected_cells)
+
+        self.status_label = QLabel()
+
+        self.save_button = QPushButton("Save All")
+        self.save_button.clicked.connect(self.save_all)
+
+        self.clear_button = QPushButton("Clear Grid")
+        self.clear_button.clicked.connect(self.model.clear)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.status_label)
+        buttons.addStretch()
+        buttons.addWidget(self.clear_button)
+        buttons.addWidget(self.save_button)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.update_status()
+
+    def reset(self) -> None:
+        """
+        Keeps the unsaved rows, only the status is refreshed.
+        """
+        self.update_status()
+
+    def update_status(self) -> None:
+        """
+        Counts the workouts and the rows with errors.
+        """
+        count = sum(1 for row in self.model.rows if any(row))
+        invalid = len(self.model.invalid_rows())
+        text = f"{count} workouts"
+        if invalid:
+            text += f", {invalid} with errors"
+        self.status_label.setStyleSheet("color: red;" if invalid else "")
+        self.status_label.setText(text)
+
+    def paste(self) -> None:
+        """
+        Pastes cells copied from a spreadsheet, tab separated, or CSV lines,
+        starting at the current cell.
+        """
+        text = QApplication.clipboard().text()
+        if not text:
+            return
+        delimiter = "\t" if "\t" in text else ","
+        block = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if row]
+        index = self.table.currentIndex()
+        row = index.row() if index.isValid() else 0
+        column = index.column() if index.isValid() else 0
+        self.model.set_cells(row, column, block)
+        self.table.resizeColumnsToContents()
+
+    def clear_selected_cells(self) -> None:
+        """
+        Empties the selected cells.
+        """
+        for index in self.table.selectionModel().selectedIndexes():
+            if index.row() < self.model.rowCount():
+                self.model.set_cells(index.row(), index.column(), [[""]])
+
+    def save_all(self) -> None:
+        """
+        Saves every row in one write, or points at the first invalid cell.
+        """
+        invalid = self.model.invalid_rows()
+        if invalid:
+            row = invalid[0]
+            column = min(self.model.errors[row])
+            self.table.setCurrentIndex(self.model.index(row, column))
+            self.status_label.setText(
+                f"Row {row + 1}: {self.model.errors[row][column]}"
+            )
+            return
+        rows = self.model.workout_rows()
+        if not rows:
+            return
+        try:
+            self.repository.save_rows(rows)
+        except OSError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        self.model.clear()
+        self.status_label.setText(f"Saved {len(rows)} workouts")
@@ -0,0 +1,355 @@
+"""
+Background maintenance: a small priority scheduler for work that should
+never get in the way of the user, and the maintenance jobs themselves.
+
+Jobs run on plain worker threads so the scheduler works headless as well as
+under the GUI. Interactive work wraps itself in JobScheduler.interactive();
+while any is running no maintenance job starts, and running ones pause at
+their next CancelToken.check().
+"""
+import contextlib
+import datetime
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from logic import DATA_DIR, LOCK_FILE
+
+HIGH = 0
+NORMAL = 10
+LOW = 20
+
+PENDING = "pending"
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+BACKUP_DIR = "data/backups"
+BACKUPS_KEPT = 5
+
+
+class Cancelled(Exception):
+    """
+    Raised inside a job when it has been asked to stop.
+    """
+
+
+class CancelToken:
+    """
+    Lets a job's owner ask it to stop. The job calls check() between steps.
+    """
+    def __init__(self, gate: threading.Event = None) -> None:
+        self._event = threading.Event()
+        self._gate = gate
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """
+        Waits while interactive work holds the gate, then stops the job if it was cancelled.
+
+        Raises:
+            Cancelled: If cancel() was called.
+        """
+        while self._gate is not None and not self._gate.wait(0.05):
+            if self._event.is_set():
+                break
+        if self._event.is_set():
+            raise Cancelled()
+
+
+class Job:
+    """
+    One scheduled call and its state, as shown in the status view.
+    """
+    def __init__(self, name: str, function, priority: int, idle: bool, token: CancelToken) -> None:
+        self.name = name
+        self.function = function
+        self.priority = priority
+        self.idle = idle
+        self.token = token
+        self.state = PENDING
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.sequence = 0
+
+
+class JobScheduler:
+    """
+    Runs maintenance jobs in priority order on background threads.
+    """
+    def __init__(self, workers: int = 1, idle_delay: int = 2000) -> None:
+        """
+        Args:
+            workers: number of worker threads.
+            idle_delay: ms without interactive work before idle jobs may start.
+        """
+        self.idle_delay = idle_delay
+        self._condition = threading.Condition()
+        self._pending = []
+        self._running = []
+        self._finished = []
+        self._sequence = itertools.count()
+        self._interactive = 0
+        self._last_activity = time.monotonic()
+        # Set while no interactive work is running; maintenance waits on it.
+        self._gate = threading.Event()
+        self._gate.set()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"maintenance-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, name: str, function, priority: int = NORMAL, idle: bool = False) -> Job:
+        """
+        Queues a job unless one with the same name is already waiting.
+
+        Args:
+            name: identifies the job, pending jobs with the same name are merged.
+            function: called with the job's CancelToken on a worker thread.
+            priority: HIGH, NORMAL or LOW, lower numbers run first.
+            idle: only start once the app has been idle for idle_delay ms.
+
+        Returns:
+            job: the queued job, or the pending one it was merged into.
+        """
+        with self._condition:
+            for job in self._pending:
+                if job.name == name:
+                    job.priority = min(job.priority, priority)
+                    job.idle = job.idle and idle
+                    self._condition.notify_all()
+                    return job
+            job = Job(name, function, priority, idle, CancelToken(self._gate))
+            job.sequence = next(self._sequence)
+            self._pending.append(job)
+            self._condition.notify_all()
+            return job
+
+    def cancel(self, job: Job) -> None:
+        """
+        Drops a pending job, or asks a running one to stop at its next check.
+        """
+        with self._condition:
+            if job in self._pending:
+                self._pending.remove(job)
+                self._retire(job, CANCELLED)
+            job.token.cancel()
+
+    @contextlib.contextmanager
+    def interactive(self):
+        """
+        Marks the with block as interactive work, holding maintenance back until it ends.
+        """
+        with self._condition:
+            self._interactive += 1
+            self._gate.clear()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._interactive -= 1
+                self._last_activity = time.monotonic()
+                if not self._interactive:
+                    self._gate.set()
+                self._condition.notify_all()
+
+    def touch(self) -> None:
+        """
+        Records user activity, which postpones idle jobs.
+        """
+        with self._condition:
+            self._last_activity = time.monotonic()
+
+    def status(self) -> list:
+        """
+        Describes the running, pending and recently finished jobs.
+
+        Returns:
+            jobs: dicts with the name, priority, state, seconds taken and error of each job.
+        """
+        now = time.monotonic()
+        with self._condition:
+            jobs = self._running + sorted(self._pending, key=self._rank) + self._finished[::-1]
+            status = []
+            for job in jobs:
+                state = job.state
+                if state == RUNNING and not self._gate.is_set():
+                    state = PAUSED
+                seconds = None
+                if job.started is not None:
+                    seconds = (job.finished or now) - job.started
+                status.append({
+                    "name": job.name,
+                    "priority": job.priority,
+                    "state": state,
+                    "seconds": seconds,
+                    "error": job.error,
+                    "job": job,
+                })
+            return status
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Cancels every job and stops the workers.
+        """
+        with self._condition:
+            self._closed = True
+            for job in self._pending + self._running:
+                job.token.cancel()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _rank(self, job: Job) -> tuple:
+        return job.priority, job.sequence
+
+    def _next_job(self) -> tuple:
+        """
+        Picks the job to start, the caller holds the condition.
+
+        Returns:
+            job: the job to run, or None.
+            wait: seconds until an idle job becomes ready, None to wait for a notify.
+        """
+        if self._interactive or not self._pending:
+            return None, None
+        idle_for = time.monotonic() - self._last_activity
+        wait = None
+        ready = []
+        for job in self._pending:
+            if job.idle and idle_for * 1000 < self.idle_delay:
+                remaining = self.idle_delay / 1000 - idle_for
+                wait = remaining if wait is None else min(wait, remaining)
+            else:
+                ready.append(job)
+        if not ready:
+            return None, wait
+        return min(ready, key=self._rank), None
+
+    def _retire(self, job: Job, state: str) -> None:
+        """
+        Moves a job to the finished list, the caller holds the condition.
+        """
+        job.state = state
+        job.finished = time.monotonic()
+        self._finished = self._finished[-19:] + [job]
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                job = None
+                while job is None:
+                    if self._closed:
+                        return
+                    job, wait = self._next_job()
+                    if job is None:
+                        self._condition.wait(wait)
+                self._pending.remove(job)
+                self._running.append(job)
+                job.state = RUNNING
+                job.started = time.monotonic()
+
+            try:
+                job.token.check()
+                job.function(job.token)
+                state = DONE
+            except Cancelled:
+                state = CANCELLED
+            except Exception as e:
+                job.error = str(e)
+                state = FAILED
+
+            with self._condition:
+                self._running.remove(job)
+                self._retire(job, state)
+
+
+def refresh_snapshot(token: CancelToken) -> None:
+    """
+    Brings the columnar snapshot used by the analytics up to date.
+    """
+    # Imported here, the GUI creates the scheduler at startup but runs jobs much later.
+    from snapshot import update_snapshot
+
+    update_snapshot(token=token)
+
+
+def backup_workouts(token: CancelToken) -> None:
+    """
+    Copies the day partitions into a new dated backup, keeping the last few.
+    A cancelled backup leaves nothing behind.
+    """
+    if not os.path.isdir(DATA_DIR):
+        return
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    # Dated so the backups sort oldest first, and made unique by mkdtemp so
+    # two backups in the same instant never share a directory.
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    temp_dir = tempfile.mkdtemp(suffix=".tmp", prefix=stamp + "-", dir=BACKUP_DIR)
+    try:
+        for file_name in sorted(os.listdir(DATA_DIR)):
+            token.check()
+            path = os.path.join(DATA_DIR, file_name)
+            if os.path.isfile(path) and path != LOCK_FILE and not file_name.endswith(".tmp"):
+                shutil.copy2(path, temp_dir)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    os.replace(temp_dir, temp_dir[: -len(".tmp")])
+
+    backups = sorted(entry for entry in os.listdir(BACKUP_DIR) if not entry.endswith(".tmp"))
+    for old in backups[:-BACKUPS_KEPT]:
+        shutil.rmtree(os.path.join(BACKUP_DIR, old), ignore_errors=True)
+
+
+def archive_job(store, archive_after: datetime.timedelta):
+    """
+    Builds a job that moves workouts older than archive_after into the archive.
+
+    Args:
+        store: the WorkoutStore whose writers are held off while each partition
+        is rewritten. Its file watcher picks the change up afterwards.
+        archive_after: how old a workout gets before it is archived.
+
+    Returns:
+        function: the job, to pass to JobScheduler.submit.
+    """
+    def archive_old_workouts(token: CancelToken) -> None:
+        from archive import archive_workouts
+
+        archive_workouts(datetime.date.today() - archive_after, token, store.exclusive)
+
+    return archive_old_workouts
+
+
+def schedule_maintenance(scheduler: JobScheduler, store=None, archive_after: datetime.timedelta = None) -> None:
+    """
+    Queues the routine maintenance jobs to run when the app is idle.
+    Calling it again before they ran does not queue them twice.
+
+    Args:
+        scheduler: the scheduler to queue the jobs on.
+        store: the local WorkoutStore to archive through. Archiving is skipped
+        without one, since only the owner of the files can hold its writers off.
+        archive_after: archive workouts older than this. Nothing is archived if None.
+    """
+    scheduler.submit("Refresh snapshot", refresh_snapshot, LOW, idle=True)
+    if archive_after is not None and store is not None and hasattr(store, "exclusive"):
+        scheduler.submit("Archive old workouts", archive_job(store, archive_after), NORMAL, idle=True)
+    scheduler.submit("Back up workouts", backup_workouts, LOW, idle=True)
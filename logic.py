@@ -1,20 +1,77 @@
+import contextlib
 import csv
+import datetime
+import io
+import json
 import os
+import tempfile
+import threading
 import typing
+import zlib
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
-def toggle_visibility(widgets, workout_type: str) -> None:
-    """
-    Toggles the visibiliity of UI widgets
+from catalog import CATALOG
 
-    Args:
-        widgets:  list of widgets
-        workout_type: Selected workout type.
+DATA_FILE = "data/workout_data.csv"
+DATA_DIR = "data/workouts"
+MANIFEST_FILE = "data/workouts/manifest.json"
+LOCK_FILE = "data/workouts/.lock"
+
+DAYS = [
+    "Sunday",
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+]
+WORKOUT_TYPES = ["Cardio", "Weight Training", "Mobility"]
+INTENSITIES = ["Low", "Moderate", "High"]
+# EXERCISES and STRETCHES are read from the exercise catalog when first used,
+# see __getattr__ and catalog.py.
+CATALOG_NAMES = {"EXERCISES": "Weight Training", "STRETCHES": "Mobility"}
+
+# The binary records and snapshot columns keep numbers in 16 bits, and dates
+# as 16-bit days since 1970-01-01 with 0 meaning unknown, see binstore and
+# snapshot. Rows are checked against these when they are built, not when they
+# are read back.
+MAX_NUMBER = 0xFFFF
+FIRST_DATE = datetime.date(1970, 1, 2)
+LAST_DATE = datetime.date(1970, 1, 1) + datetime.timedelta(days=0xFFFF)
+
+# Rows handled between progress reports and cancellation checks.
+CHUNK_ROWS = 5000
+
+# The CSV column order of a workout row.
+ROW_FIELDS = [
+    "day",
+    "workout_type",
+    "cardio_intensity",
+    "cardio_duration",
+    "weight_exercise",
+    "weight",
+    "weight_reps",
+    "weight_sets",
+    "mobility_stretch",
+    "mobility_duration",
+    "date",
+]
+
+
+def __getattr__(name: str) -> list:
     """
-    for key, group in widgets.items():
-        is_visible = key == workout_type
-        for widget in group:
-            widget.setVisible(is_visible)
+    Gives EXERCISES and STRETCHES, reading the catalog the first time either
+    is asked for instead of whenever this module is imported.
+    """
+    if name not in CATALOG_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    names = globals()[name] = CATALOG.names(CATALOG_NAMES[name])
+    return names
 
 
 def validate_fields(**fields: str) -> None:
@@ -25,7 +82,7 @@ def validate_fields(**fields: str) -> None:
         **fields: field names and their values.
 
     Raises:
-        ValueError: If a field is invalid or negative.
+        ValueError: If a field is invalid, negative or above MAX_NUMBER.
     """
     for field_name, value in fields.items():
         if value is not None:
@@ -36,9 +93,56 @@ def validate_fields(**fields: str) -> None:
                     raise ValueError(f"{field_name} must be a positive number")
             except ValueError:
                 raise ValueError(f"{field_name} must be a positive number.")
+            if num > MAX_NUMBER:
+                raise ValueError(f"{field_name} must be at most {MAX_NUMBER}.")
+
+
+def validate_date(date: datetime.date) -> None:
+    """
+    Validates that a date can be stored.
+
+    Args:
+        date: the planned date of a workout.
+
+    Raises:
+        ValueError: If the date is before FIRST_DATE or after LAST_DATE.
+    """
+    if not FIRST_DATE <= date <= LAST_DATE:
+        raise ValueError(f"Date must be between {FIRST_DATE} and {LAST_DATE}.")
+
+
+def day_name(date: datetime.date) -> str:
+    """
+    Gives the entry of DAYS a date falls on. DAYS starts on Sunday, while
+    date.weekday() counts from Monday.
+    """
+    return DAYS[(date.weekday() + 1) % 7]
+
+
+def lookup_catalog_name(name: str, workout_type: str) -> str:
+    """
+    Looks an exercise or stretch up in the catalog.
 
+    Args:
+        name: a catalog name or alias, in any case.
+        workout_type: Weight Training for an exercise, Mobility for a stretch.
+
+    Returns:
+        name: the catalog's name for it, empty if name was.
 
-def save_workout(
+    Raises:
+        ValueError: If the catalog has no such entry.
+    """
+    if not name:
+        return ""
+    entry = CATALOG.find(name, workout_type)
+    if entry is None:
+        kind = "exercise" if workout_type == "Weight Training" else "stretch"
+        raise ValueError(f"Unknown {kind} {name!r}")
+    return entry.name
+
+
+def workout_row(
     day: str,
     workout_type :str,
     cardio_intensity: str = None,
@@ -49,9 +153,10 @@ def save_workout(
     weight_reps: str = None,
     mobility_stretch: str = None,
     mobility_duration: str = None,
-) -> None:
+    date: datetime.date = None,
+) -> list:
     """
-    Saves a workout entry to the workout data file
+    Validates a workout entry and builds its data file row
 
     Args:
         day: Day of the workout
@@ -64,7 +169,24 @@ def save_workout(
         weight_reps: Number of reps.
         mobility_stretch: Strecth name (Mobilty)
         mobility_duration: Duration of workout (mins)
+        date: Date the workout was planned, today if None.
+
+    Returns:
+        data: the workout row in the CSV column order, with the catalog's
+        names for the exercise and stretch.
+
+    Raises:
+        ValueError: If a field or the date is invalid, or a name is not in
+        DAYS, WORKOUT_TYPES, INTENSITIES or the catalog.
     """
+    if day not in DAYS:
+        raise ValueError(f"Unknown day {day!r}")
+    if workout_type not in WORKOUT_TYPES:
+        raise ValueError(f"Unknown workout type {workout_type!r}")
+    if cardio_intensity and cardio_intensity not in INTENSITIES:
+        raise ValueError(f"Unknown intensity {cardio_intensity!r}")
+    weight_exercise = lookup_catalog_name(weight_exercise, "Weight Training")
+    mobility_stretch = lookup_catalog_name(mobility_stretch, "Mobility")
 
     validate_fields(
         Duration=cardio_duration if workout_type == "Cardio" else mobility_duration,
@@ -72,6 +194,8 @@ def save_workout(
         Sets=weight_sets if workout_type == "Weight Training" else None,
         Reps=weight_reps if workout_type == "Weight Training" else None,
     )
+    date = date or datetime.date.today()
+    validate_date(date)
     data = [
         day,
         workout_type,
@@ -83,98 +207,446 @@ def save_workout(
         weight_sets or "",
         mobility_stretch or "",
         mobility_duration or "",
+        date.isoformat(),
     ]
+    return data
 
-    with open("data/workout_data.csv", "a", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(data)
 
+def check_row(row: list) -> list:
+    """
+    Validates a row read from a file or sent by a client, and rebuilds it in
+    the current column order.
 
-def clear_workouts() -> None:
+    Args:
+        row: workout row in the CSV column order, the date may be missing.
+
+    Returns:
+        row: the validated row.
+
+    Raises:
+        ValueError: If the row is incomplete, or invalid as workout_row sees it:
+        a name outside the days, workout types, intensities or catalog, or a
+        number or date the data files cannot hold.
     """
-    Deletes all workouts
+    if len(row) < len(ROW_FIELDS) - 1:
+        raise ValueError(f"Expected {len(ROW_FIELDS) - 1} or {len(ROW_FIELDS)} fields, got {len(row)}")
+    fields = {name: value for name, value in zip(ROW_FIELDS[2:-1], row[2:]) if value}
+    if len(row) > 10 and row[10]:
+        fields["date"] = datetime.date.fromisoformat(row[10])
+    return workout_row(row[0], row[1], **fields)
+
+
+def save_workout(day: str, workout_type: str, **fields: str) -> None:
     """
-    if os.path.exists("data/workout_data.csv"):
-        os.remove("data/workout_data.csv")
+    Saves a workout entry to the workout data file
+
+    Args:
+        day: Day of the workout
+        workout_type: Type of workout (Cardio, Weight Training, Mobility).
+        **fields: the workout's fields, see workout_row.
+    """
+    append_rows([workout_row(day, workout_type, **fields)])
 
 
-def read_workouts() -> None:
+def describe_workout(row: list) -> str:
     """
-    Reads the workout entries from the CSV file.
+    Describes a workout row the way it is shown to the user.
+
+    Args:
+        row: workout row in the CSV column order.
 
     Returns:
-        workouts: a list of workout details.
+        details: the workout description, or None for an unknown workout type.
     """
-    workouts = {}
-    with open("data/workout_data.csv", "r") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if not row:
-                continue
-
-            (
-                day,
-                workout_type,
-                cardio_intensity,
-                cardio_duration,
-                weight_exercise,
-                weight,
-                weight_reps,
-                weight_sets,
-                mobility_stretch,
-                mobility_duration,
-            ) = row
-
-            if workout_type == "Cardio":
-                details = f"Cardio: Intensity {cardio_intensity}, Duration: {cardio_duration} mins"
-            elif workout_type == "Weight Training":
-                details = f"Weight Training: {weight_exercise}, Weight: {weight} lbs, Sets: {weight_sets}, Reps: {weight_reps}"
-            elif workout_type == "Mobility":
-                details = f"Mobility: Stretch: {mobility_stretch}, Duration: {mobility_duration} mins"
-            else:
-                continue
-
-            if day not in workouts:
-                workouts[day] = []
-            workouts.setdefault(day, []).append(details)
-    return workouts
+    workout_type = row[1]
+    if workout_type == "Cardio":
+        return f"Cardio: Intensity {row[2]}, Duration: {row[3]} mins"
+    elif workout_type == "Weight Training":
+        return f"Weight Training: {row[4]}, Weight: {row[5]} lbs, Sets: {row[7]}, Reps: {row[6]}"
+    elif workout_type == "Mobility":
+        return f"Mobility: Stretch: {row[8]}, Duration: {row[9]} mins"
+    return None
+
+
+def partition_path(day: str) -> str:
+    """
+    Gives the path of the partition file holding a day's workouts.
+
+    Args:
+        day: Day of the workouts.
+
+    Returns:
+        path: the partition file.
+    """
+    return os.path.join(DATA_DIR, f"{day}.csv")
+
+
+def new_version() -> str:
+    """
+    Makes a token for one version of a partition file. It changes whenever the
+    file is rewritten or created afresh, see read_appended_rows.
+    """
+    return os.urandom(8).hex()
+
+
+_lock = threading.RLock()
+_lock_file = None
+_lock_depth = 0
+
+
+@contextlib.contextmanager
+def manifest_lock():
+    """
+    Holds every other thread and process off the manifest and the partitions
+    it lists. The CLI, server, daemon and GUI all write them, so each read,
+    change and write of the manifest happens inside this. Nesting is fine.
+    """
+    global _lock_file, _lock_depth
+    with _lock:
+        if _lock_depth == 0:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            _lock_file = open(LOCK_FILE, "a")
+            if fcntl is not None:
+                # Without fcntl, on Windows, only this process's threads are held off.
+                fcntl.flock(_lock_file, fcntl.LOCK_EX)
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+            if _lock_depth == 0:
+                # Closing the file releases the lock.
+                _lock_file.close()
+                _lock_file = None
+
+
+def write_manifest(manifest: dict) -> None:
+    """
+    Replaces the manifest atomically. Call it inside manifest_lock, after
+    reading the manifest there.
+
+    Args:
+        manifest: the partitions and their row counts.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=DATA_DIR, prefix="manifest.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(manifest, file)
+        os.replace(temp_path, MANIFEST_FILE)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _migrate_legacy_file() -> dict:
+    """
+    Splits the old single workout CSV file into per-day partitions.
+
+    Returns:
+        manifest: the manifest of the new partitions.
+    """
+    rows = {}
+    with open(DATA_FILE, "r", newline="") as file:
+        for row in csv.reader(file):
+            if row:
+                rows.setdefault(row[0], []).append(row)
+
+    manifest = {"partitions": {}}
+    os.makedirs(DATA_DIR, exist_ok=True)
+    for day, day_rows in rows.items():
+        with open(partition_path(day), "w", newline="") as file:
+            csv.writer(file).writerows(day_rows)
+        manifest["partitions"][day] = {"rows": len(day_rows), "version": new_version()}
+    write_manifest(manifest)
+    os.replace(DATA_FILE, DATA_FILE + ".migrated")
+    return manifest
 
 
-def remove_workouts(entries: str) -> None:
+def read_manifest() -> dict:
     """
-    Removes the selected workout entries from the workout CSV file.
+    Reads the manifest listing which day partitions exist.
+
+    Returns:
+        manifest: the partitions and their row counts.
+    """
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, "r") as file:
+            return json.load(file)
+    if os.path.exists(DATA_FILE):
+        with manifest_lock():
+            # Another process may have migrated it while this one waited.
+            if os.path.exists(MANIFEST_FILE):
+                return read_manifest()
+            if os.path.exists(DATA_FILE):
+                return _migrate_legacy_file()
+    return {"partitions": {}}
+
+
+def partition_paths(day: str = None) -> dict:
+    """
+    Lists the partition files that exist.
 
     Args:
-        entries: List of workouts to be removed
+        day: only list this day's partition.
+
+    Returns:
+        paths: day to partition file, in day order.
     """
+    partitions = read_manifest()["partitions"]
+    days = [day] if day is not None else DAYS
+    return {day: partition_path(day) for day in days if day in partitions}
+
 
-    if not os.path.exists("data/workout_data.csv"):
-        return
+def append_rows(rows: list) -> None:
+    """
+    Appends workout rows to their day partitions.
 
-    to_remove = [(day, workout) for day, workout in entries]
-    new_lines = []
+    Args:
+        rows: workout rows in the CSV column order.
 
-    with open("data/workout_data.csv", "r") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if not row:
-                continue
+    Raises:
+        ValueError: If a row's day is not one of DAYS, nothing is written then.
+    """
+    with manifest_lock():
+        manifest = read_manifest()
+        by_day = {}
+        for row in rows:
+            # The day names the partition file, so it must never be a path.
+            if row[0] not in DAYS:
+                raise ValueError(f"Unknown day {row[0]!r}")
+            by_day.setdefault(row[0], []).append(row)
 
-            day = row[0]
-            workout_type = row[1]
+        os.makedirs(DATA_DIR, exist_ok=True)
+        for day, day_rows in by_day.items():
+            with open(partition_path(day), "a", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerows(day_rows)
+            partition = manifest["partitions"].setdefault(day, {"rows": 0, "version": new_version()})
+            partition["rows"] += len(day_rows)
+        write_manifest(manifest)
 
-            if workout_type == "Cardio":
-                details = f"Cardio: Intensity {row[2]}, Duration: {row[3]} mins"
-            elif workout_type == "Weight Training":
-                details = f"Weight Training: {row[4]}, Weight: {row[5]} lbs, Sets: {row[6]}, Reps: {row[7]}"
-            elif workout_type == "Mobility":
-                details = f"Mobility: Stretch: {row[8]}, Duration {row[9]} mins"
-            else:
-                details = None
 
-            if (day, details) not in to_remove:
-                new_lines.append(row)
+def rewrite_partition(day: str, rows: list, manifest: dict) -> None:
+    """
+    Replaces the rows of a day partition atomically.
+    The caller holds manifest_lock and writes the updated manifest afterwards.
 
-    with open("data/workout_data.csv", "w", newline="") as file:
+    Args:
+        day: Day of the partition.
+        rows: the rows the partition should hold.
+        manifest: the manifest to update.
+    """
+    path = partition_path(day)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", newline="") as file:
         writer = csv.writer(file)
-        writer.writerows(new_lines)
+        writer.writerows(rows)
+    os.replace(temp_path, path)
+    manifest["partitions"][day]["rows"] = len(rows)
+    manifest["partitions"][day]["version"] = new_version()
+
+
+def read_rows(day: str = None) -> typing.Iterator[list]:
+    """
+    Reads the raw workout rows from the partitions.
+
+    Args:
+        day: only read this day's partition.
+
+    Returns:
+        rows: workout rows in the CSV column order, the last column being
+        the date (missing on rows saved before dates were recorded).
+    """
+    for path in partition_paths(day).values():
+        with open(path, "r", newline="") as file:
+            for row in csv.reader(file):
+                if row:
+                    yield row
+
+
+def _tail_crc(file, offset: int) -> int:
+    """
+    Fingerprints the bytes just before offset, used to notice a rewritten partition.
+    """
+    start = max(0, offset - 64)
+    file.seek(start)
+    return zlib.crc32(file.read(offset - start))
+
+
+def read_appended_rows(day: str, position: dict = None) -> tuple:
+    """
+    Reads the rows appended to a day partition since an earlier read.
+    If the partition was rewritten in the meantime all of its rows are read.
+
+    A rewrite is noticed by the partition's version in the manifest, by the
+    file's inode, which os.replace changes, and by the bytes before the
+    earlier offset. A rewritten file can grow past the old offset and end in
+    the same row, so the bytes alone are not enough. The manifest is written
+    just after the file, so a reader caught in between still sees the new inode.
+
+    Args:
+        day: Day of the partition.
+        position: the position returned by the earlier read, if any.
+
+    Returns:
+        rows: the rows read.
+        position: where the next read should continue.
+        appended: False if the partition was rewritten and rows holds all of it.
+    """
+    version = read_manifest()["partitions"].get(day, {}).get("version")
+    with open(partition_path(day), "rb") as file:
+        status = os.fstat(file.fileno())
+        size = status.st_size
+        offset = 0
+        if (
+            position
+            and position.get("version") == version
+            and position.get("inode") == status.st_ino
+            and position["offset"] <= size
+            and _tail_crc(file, position["offset"]) == position["crc"]
+        ):
+            offset = position["offset"]
+
+        file.seek(offset)
+        data = file.read(size - offset)
+        # A row still being appended is left for the next read.
+        data = data[: data.rfind(b"\n") + 1]
+        text = io.StringIO(data.decode(), newline="")
+        rows = [row for row in csv.reader(text) if row]
+        appended = bool(position) and offset == position["offset"]
+        offset += len(data)
+        position = {
+            "offset": offset,
+            "crc": _tail_crc(file, offset),
+            "inode": status.st_ino,
+            "version": version,
+        }
+        return rows, position, appended
+
+
+def clear_workouts(days: list = None, token=None, progress=None) -> None:
+    """
+    Deletes all workouts, or only the workouts of some days.
+    Deleting cannot be undone halfway, so the token is only checked before
+    anything is removed.
+
+    Args:
+        days: Days to clear, every day if None.
+        token: cancels the clear if its check() raises.
+        progress: called with (rows, bytes, total bytes) cleared so far after each partition.
+    """
+    with manifest_lock():
+        manifest = read_manifest()
+        days = [day for day in manifest["partitions"] if days is None or day in days]
+        sizes = {
+            day: os.path.getsize(partition_path(day)) if os.path.exists(partition_path(day)) else 0
+            for day in days
+        }
+        if token is not None:
+            token.check()
+        done_rows = 0
+        done_bytes = 0
+        for day in days:
+            if os.path.exists(partition_path(day)):
+                os.remove(partition_path(day))
+            done_rows += manifest["partitions"].pop(day)["rows"]
+            done_bytes += sizes[day]
+            if progress is not None:
+                progress(done_rows, done_bytes, sum(sizes.values()))
+        if manifest["partitions"]:
+            write_manifest(manifest)
+        elif os.path.exists(MANIFEST_FILE):
+            os.remove(MANIFEST_FILE)
+
+
+def read_workouts(day: str = None) -> dict:
+    """
+    Reads the workout entries from the day partitions.
+
+    Args:
+        day: only read this day's workouts.
+
+    Returns:
+        workouts: a list of workout details per day.
+
+    Raises:
+        FileNotFoundError: If there are no workouts at all.
+    """
+    if not read_manifest()["partitions"]:
+        raise FileNotFoundError(MANIFEST_FILE)
+
+    workouts = {}
+    for row in read_rows(day):
+        details = describe_workout(row)
+        if details is None:
+            continue
+        workouts.setdefault(row[0], []).append(details)
+    return workouts
+
+
+def remove_workouts(entries: list, token=None, progress=None) -> None:
+    """
+    Removes the selected workout entries, rewriting only their day partitions.
+    The partitions are rewritten chunk by chunk into temporary files that only
+    replace the originals once all of them are done, so a cancelled removal
+    leaves the workouts untouched.
+
+    Args:
+        entries: List of (day, workout details) to be removed
+        token: checked between chunks, the removal is rolled back if its check() raises.
+        progress: called with (rows, bytes, total bytes) read so far after each chunk.
+    """
+    with manifest_lock():
+        manifest = read_manifest()
+        to_remove = {}
+        for day, workout in entries:
+            to_remove.setdefault(day, set()).add(workout)
+        days = [day for day in to_remove if day in manifest["partitions"]]
+        total_bytes = sum(os.path.getsize(partition_path(day)) for day in days)
+
+        done_rows = 0
+        done_bytes = 0
+        temp_paths = []
+        try:
+            for day in days:
+                temp_path = partition_path(day) + ".tmp"
+                temp_paths.append(temp_path)
+                kept = 0
+                with open(partition_path(day), "r", newline="") as source, open(
+                    temp_path, "w", newline=""
+                ) as target:
+                    writer = csv.writer(target)
+                    chunk = []
+                    for row in csv.reader(source):
+                        done_rows += 1
+                        if row and describe_workout(row) not in to_remove[day]:
+                            chunk.append(row)
+                        if done_rows % CHUNK_ROWS == 0:
+                            writer.writerows(chunk)
+                            kept += len(chunk)
+                            chunk = []
+                            if token is not None:
+                                token.check()
+                            if progress is not None:
+                                # The buffer position runs a little ahead of the parsed rows.
+                                read = min(source.buffer.tell(), os.fstat(source.fileno()).st_size)
+                                progress(done_rows, done_bytes + read, total_bytes)
+                    writer.writerows(chunk)
+                    kept += len(chunk)
+                    done_bytes += os.fstat(source.fileno()).st_size
+                manifest["partitions"][day]["rows"] = kept
+                manifest["partitions"][day]["version"] = new_version()
+                if token is not None:
+                    token.check()
+                if progress is not None:
+                    progress(done_rows, done_bytes, total_bytes)
+        except BaseException:
+            for temp_path in temp_paths:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            raise
+
+        for day, temp_path in zip(days, temp_paths):
+            os.replace(temp_path, partition_path(day))
+        write_manifest(manifest)
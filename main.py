@@ -1,11 +1,20 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from gui import MainWindow
 
 
 def main():
+    if sys.argv[1:2] == ["cli"]:
+        # The command line never needs Qt, so it is not imported at all.
+        from cli import main as cli_main
+
+        sys.exit(cli_main(sys.argv[2:]))
+
+    from PyQt6.QtWidgets import QApplication
+    from daemon import connect
+    from gui import MainWindow
+
     app = QApplication(sys.argv)
-    window = MainWindow()
+    # Share the daemon's in-memory store if one is running, else read the files directly.
+    window = MainWindow(connect())
     window.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,125 @@
+"""
+Summarizes the whole workout history, live partitions and archive segments,
+by fanning the files out to a pool of processes.
+
+    python mapreduce.py --workers 4
+
+Each worker parses one file and runs the same aggregates as analytics.summarize
+over it. Every aggregate is a sum or a count per group, so the partial results
+add up to exactly what a single pass over all rows would give.
+"""
+import argparse
+import concurrent.futures
+import os
+
+from analytics import AGGREGATES, summarize
+from archive import ARCHIVE_DIR, read_archived_rows, read_index
+from logic import partition_paths, read_rows
+from snapshot import rows_to_columns
+
+PARTITION = "partition"
+SEGMENT = "segment"
+
+
+def history_sources() -> list:
+    """
+    Lists the files holding workouts, biggest first so the slowest ones start early.
+
+    Returns:
+        sources: (kind, name) pairs, kind being PARTITION with a day or SEGMENT
+        with an archive segment file.
+    """
+    sized = [
+        (os.path.getsize(path), (PARTITION, day)) for day, path in partition_paths().items()
+    ]
+    sized += [
+        (os.path.getsize(os.path.join(ARCHIVE_DIR, name)), (SEGMENT, name))
+        for name in read_index()["segments"]
+    ]
+    sized.sort(key=lambda item: item[0], reverse=True)
+    return [source for _size, source in sized]
+
+
+def read_source(source: tuple):
+    """
+    Reads the workout rows of one file.
+
+    Args:
+        source: (kind, name) pair from history_sources.
+
+    Returns:
+        rows: workout rows in the CSV column order.
+    """
+    kind, name = source
+    if kind == PARTITION:
+        return read_rows(name)
+    return read_archived_rows(segment=name)
+
+
+def summarize_source(source: tuple) -> dict:
+    """
+    Runs every aggregate over one file, in a worker process.
+
+    Args:
+        source: (kind, name) pair from history_sources.
+
+    Returns:
+        summary: aggregate name to its partial result.
+    """
+    return summarize(rows_to_columns(read_source(source)))
+
+
+def merge_summaries(summaries) -> dict:
+    """
+    Adds up partial summaries group by group.
+
+    Args:
+        summaries: summaries as returned by analytics.summarize.
+
+    Returns:
+        summary: aggregate name to its combined result.
+    """
+    merged = {name: {} for name in AGGREGATES}
+    for summary in summaries:
+        for name, groups in summary.items():
+            totals = merged[name]
+            for group, total in groups.items():
+                totals[group] = totals.get(group, 0) + total
+    return merged
+
+
+def history_summary(workers: int = None) -> dict:
+    """
+    Summarizes every live and archived workout.
+
+    Args:
+        workers: number of worker processes, all cores if None. With 1 the
+        files are summarized in this process.
+
+    Returns:
+        summary: aggregate name to its result.
+    """
+    sources = history_sources()
+    if workers == 1 or len(sources) <= 1:
+        return merge_summaries(map(summarize_source, sources))
+    workers = min(workers or os.cpu_count() or 1, len(sources))
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(summarize_source, source) for source in sources]
+        return merge_summaries(
+            future.result() for future in concurrent.futures.as_completed(futures)
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize the whole workout history.")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    for name, groups in history_summary(args.workers).items():
+        print(name)
+        for group, total in sorted(groups.items()):
+            label = ", ".join(group) if isinstance(group, tuple) else group
+            print(f"    {label}: {total}")
+
+
+if __name__ == "__main__":
+    main()
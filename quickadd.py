@@ -0,0 +1,185 @@
+"""
+Parses workouts typed as short text, one per line:
+
+    mon deadlift 225x5x3          weight x reps x sets
+    tue cardio high 30            intensity is optional, minutes last
+    wed hamstring 10              a stretch and its minutes
+
+Days may be shortened to any unique prefix. Exercise and stretch names are
+matched loosely, so "bench" or "deadlfit" still find the right entry.
+"""
+import difflib
+import re
+
+from catalog import CATALOG
+from logic import DAYS, INTENSITIES, EXERCISES, STRETCHES, workout_row
+
+_MINUTES = r"(?P<minutes>\d+)\s*(?:m|mins?|minutes)?"
+CARDIO = re.compile(
+    r"^(?P<day>[a-z]+)\s+cardio(?:\s+(?P<intensity>[a-z]+))?\s+" + _MINUTES + r"$", re.IGNORECASE
+)
+WEIGHT = re.compile(
+    r"^(?P<day>[a-z]+)\s+(?P<name>.+?)\s+(?P<weight>\d+)\s*(?:lbs?)?\s*[x*]\s*(?P<reps>\d+)"
+    r"\s*[x*]\s*(?P<sets>\d+)$",
+    re.IGNORECASE,
+)
+MOBILITY = re.compile(
+    r"^(?P<day>[a-z]+)\s+(?:(?:mobility|stretch)\s+)?(?P<name>.+?)\s+" + _MINUTES + r"$",
+    re.IGNORECASE,
+)
+LINE_FORMS = "day cardio [intensity] minutes, day exercise WEIGHTxREPSxSETS, or day stretch minutes"
+
+
+def _prefixes(words: list, shortest: int) -> dict:
+    """
+    Maps every unambiguous prefix of the words to its word.
+    """
+    prefixes = {}
+    for word in words:
+        for length in range(shortest, len(word) + 1):
+            prefixes.setdefault(word[:length].lower(), []).append(word)
+    return {prefix: found[0] for prefix, found in prefixes.items() if len(found) == 1}
+
+
+DAY_PREFIXES = _prefixes(DAYS, 2)
+INTENSITY_PREFIXES = _prefixes(INTENSITIES, 1)
+
+
+class Vocabulary:
+    """
+    Matches loosely typed names against a list of known names and their aliases.
+    Results are cached, since a plan repeats the same few names many times.
+    """
+    def __init__(self, names: list, kind: str, aliases: dict = None) -> None:
+        self.names = list(names)
+        self.kind = kind
+        self._lower = {alias.lower(): name for alias, name in (aliases or {}).items()}
+        self._lower.update((name.lower(), name) for name in self.names)
+        self._cache = {}
+
+    def match(self, text: str) -> str:
+        """
+        Finds the name meant by the text: an exact name or alias, then the only
+        name with a name or alias containing it, then the closest spelling.
+
+        Args:
+            text: the typed name.
+
+        Returns:
+            name: the known name.
+
+        Raises:
+            ValueError: If no name, or more than one, fits.
+        """
+        key = " ".join(text.lower().split())
+        if key not in self._cache:
+            self._cache[key] = self._match(key)
+        name = self._cache[key]
+        if isinstance(name, ValueError):
+            raise name
+        return name
+
+    def _match(self, key: str):
+        if key in self._lower:
+            return self._lower[key]
+        containing = list(dict.fromkeys(name for lower, name in self._lower.items() if key in lower))
+        if len(containing) == 1:
+            return containing[0]
+        if len(containing) > 1:
+            return ValueError(f"{self.kind} {key!r} could be {', '.join(containing)}")
+        close = difflib.get_close_matches(key, list(self._lower), n=1, cutoff=0.6)
+        if close:
+            return self._lower[close[0]]
+        return ValueError(f"Unknown {self.kind.lower()} {key!r}")
+
+
+EXERCISE_NAMES = Vocabulary(EXERCISES, "Exercise", CATALOG.aliases("Weight Training"))
+STRETCH_NAMES = Vocabulary(STRETCHES, "Stretch", CATALOG.aliases("Mobility"))
+
+
+def _day(text: str) -> str:
+    day = DAY_PREFIXES.get(text.lower())
+    if day is None:
+        raise ValueError(f"Unknown day {text!r}")
+    return day
+
+
+def parse_line(line: str, exercises: Vocabulary = None, stretches: Vocabulary = None) -> list:
+    """
+    Parses one workout line.
+
+    Args:
+        line: the text of the workout.
+        exercises: the exercise names to match against.
+        stretches: the stretch names to match against.
+
+    Returns:
+        row: the validated workout row in the CSV column order.
+
+    Raises:
+        ValueError: If the line does not describe a valid workout.
+    """
+    exercises = exercises or EXERCISE_NAMES
+    stretches = stretches or STRETCH_NAMES
+    line = line.strip()
+
+    match = CARDIO.match(line)
+    if match:
+        intensity = INTENSITIES[0]
+        if match["intensity"]:
+            intensity = INTENSITY_PREFIXES.get(match["intensity"].lower())
+            if intensity is None:
+                raise ValueError(f"Unknown intensity {match['intensity']!r}")
+        return workout_row(
+            _day(match["day"]),
+            "Cardio",
+            cardio_intensity=intensity,
+            cardio_duration=match["minutes"],
+        )
+
+    match = WEIGHT.match(line)
+    if match:
+        return workout_row(
+            _day(match["day"]),
+            "Weight Training",
+            weight_exercise=exercises.match(match["name"]),
+            weight=match["weight"],
+            weight_reps=match["reps"],
+            weight_sets=match["sets"],
+        )
+
+    match = MOBILITY.match(line)
+    if match:
+        return workout_row(
+            _day(match["day"]),
+            "Mobility",
+            mobility_stretch=stretches.match(match["name"]),
+            mobility_duration=match["minutes"],
+        )
+
+    raise ValueError(f"Expected {LINE_FORMS}")
+
+
+def parse_text(text: str, exercises: Vocabulary = None, stretches: Vocabulary = None) -> tuple:
+    """
+    Parses several workout lines, skipping blank ones.
+
+    Args:
+        text: one workout per line.
+        exercises: the exercise names to match against.
+        stretches: the stretch names to match against.
+
+    Returns:
+        rows: the rows of the valid lines.
+        errors: (line number, line, message) for each invalid line.
+    """
+    rows = []
+    errors = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(parse_line(line, exercises, stretches))
+        except ValueError as e:
+            errors.append((number, line.strip(), str(e)))
+    return rows, errors
@@ -0,0 +1,389 @@
+import contextlib
+import datetime
+import os
+import queue
+import threading
+from PyQt6.QtCore import QCoreApplication, QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from daemon import DaemonDisconnected
+from jobs import Cancelled, CancelToken, JobScheduler, schedule_maintenance
+from logic import DATA_DIR, partition_paths, workout_row
+from store import WorkoutStore
+
+
+class Operation(QObject):
+    """
+    A long write running on a background thread.
+    Progress and the outcome arrive as signals on the GUI thread.
+    """
+    progress = pyqtSignal(int, int, int)
+    finished = pyqtSignal()
+    cancelled = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, function, parent: QObject = None) -> None:
+        """
+        Args:
+            function: called with a CancelToken and a progress callback taking
+            (rows, bytes, total bytes).
+        """
+        super().__init__(parent)
+        self.token = CancelToken()
+        self._thread = threading.Thread(target=self._run, args=(function,), daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """
+        Asks the operation to stop and roll back at its next chunk.
+        """
+        self.token.cancel()
+
+    def _run(self, function) -> None:
+        try:
+            function(self.token, self.progress.emit)
+        except Cancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit()
+
+
+class WorkoutRepository(QObject):
+    """
+    Holds the parsed workouts for every open window.
+    Reads are served from memory; the data files are only touched to write.
+    Its own reads and writes count as interactive work for the maintenance scheduler.
+    """
+    workouts_added = pyqtSignal(list)
+    workouts_removed = pyqtSignal(list)
+    workouts_cleared = pyqtSignal()
+    # Queued saves that reached the data files, or the error that stopped them.
+    queued_saved = pyqtSignal(list)
+    queued_failed = pyqtSignal(str)
+    # The daemon went away, emitted from any thread.
+    daemon_lost = pyqtSignal()
+
+    def __init__(
+        self, store: WorkoutStore = None, scheduler: JobScheduler = None, archive_after: datetime.timedelta = None
+    ) -> None:
+        super().__init__()
+        self.store = store or WorkoutStore()
+        self.scheduler = scheduler or JobScheduler()
+        # Idle-time archiving is opt-in, see jobs.schedule_maintenance.
+        self.archive_after = archive_after
+        self._watcher = None
+        self._reload_timer = None
+        self._operations = 0
+        self._write_queue = None
+        self.queued_saved.connect(self._queued_saved)
+        self.daemon_lost.connect(self._use_files)
+
+    def watch(self, delay: int = 250) -> None:
+        """
+        Watches the data files so changes made outside the app reach the open windows.
+        Args:
+            delay: ms to wait for a burst of changes to settle before reloading.
+        """
+        self._watcher = QFileSystemWatcher(self)
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(delay)
+        self._reload_timer.timeout.connect(self.reload_changed)
+        self._watcher.fileChanged.connect(self._reload_timer.start)
+        self._watcher.directoryChanged.connect(self._reload_timer.start)
+        self._watch_paths()
+
+    def _watch_paths(self) -> None:
+        """
+        Adds the data directories and partitions to the watcher.
+        Files replaced by a rewrite drop out of the watcher and are added back here.
+        """
+        paths = [os.path.dirname(DATA_DIR), DATA_DIR] + list(partition_paths().values())
+        missing = [
+            path
+            for path in paths
+            if os.path.exists(path)
+            and path not in self._watcher.files()
+            and path not in self._watcher.directories()
+        ]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def reload_changed(self) -> None:
+        """
+        Applies changes made to the data files by someone else.
+        The open windows get the differences as ordinary added and removed notifications.
+        """
+        if self._operations:
+            # The files are ours until the operation is done, look again afterwards.
+            if self._reload_timer is not None:
+                self._reload_timer.start()
+            return
+        try:
+            with self.scheduler.interactive():
+                removed, added, cleared = self.store.reload_changed()
+        except DaemonDisconnected:
+            self._use_files()
+            return
+        except OSError:
+            # Caught mid-write by someone else, the next change looks again.
+            return
+        if self._watcher is not None:
+            self._watch_paths()
+        if cleared:
+            self.workouts_cleared.emit()
+            return
+        if removed:
+            self.workouts_removed.emit(removed)
+        if added:
+            self.workouts_added.emit(added)
+
+    def workouts(self, day: str = None) -> dict:
+        """
+        Gives the workout entries, like read_workouts but without reading the files.
+
+        Args:
+            day: only give this day's workouts.
+
+        Returns:
+            workouts: a list of workout details per day, in day order.
+        """
+        with self.scheduler.interactive():
+            try:
+                return self.store.workouts(day)
+            except DaemonDisconnected:
+                self._use_files()
+                return self.store.workouts(day)
+
+    def rows(self, day: str = None) -> list:
+        """
+        Gives the workout rows without reading the files.
+
+        Args:
+            day: only give this day's rows.
+
+        Returns:
+            rows: workout rows in the CSV column order, in day order.
+        """
+        with self.scheduler.interactive():
+            try:
+                return self.store.rows(day)
+            except DaemonDisconnected:
+                self._use_files()
+                return self.store.rows(day)
+
+    def save_workout(self, day: str, workout_type: str, **fields: str) -> None:
+        """
+        Saves a workout entry and notifies the open windows.
+
+        Args:
+            day: Day of the workout
+            workout_type: Type of workout (Cardio, Weight Training, Mobility).
+            **fields: the workout's fields, see logic.workout_row.
+
+        Raises:
+            ValueError: If a numeric field is invalid.
+            OSError: If the row could not be written. If the daemon went away,
+            later saves go to the data files.
+        """
+        with self.scheduler.interactive(), self._daemon_watch():
+            row = self.store.save_workout(day, workout_type, **fields)
+        self.workouts_added.emit([row])
+        self.schedule_maintenance()
+
+    def save_rows(self, rows: list) -> list:
+        """
+        Saves validated workout rows in one write and notifies the open windows.
+
+        Args:
+            rows: workout rows in the CSV column order, see logic.workout_row.
+
+        Returns:
+            rows: the saved rows as tuples.
+
+        Raises:
+            OSError: If the rows could not be written, see save_workout.
+        """
+        with self.scheduler.interactive(), self._daemon_watch():
+            rows = self.store.save_rows(rows)
+        if rows:
+            self.workouts_added.emit(rows)
+            self.schedule_maintenance()
+        return rows
+
+    def queue_workout(self, day: str, workout_type: str, **fields: str) -> tuple:
+        """
+        Validates a workout entry now and saves it on a background writer, so the
+        next entry can be typed straight away. Entries queued while a write is
+        running go out together in the next one. The open windows are notified
+        once the rows are written.
+
+        Args:
+            day: Day of the workout
+            workout_type: Type of workout (Cardio, Weight Training, Mobility).
+            **fields: the workout's fields, see logic.workout_row.
+
+        Returns:
+            row: the queued row.
+
+        Raises:
+            ValueError: If a numeric field is invalid.
+        """
+        row = tuple(workout_row(day, workout_type, **fields))
+        if self._write_queue is None:
+            self._write_queue = queue.Queue()
+            threading.Thread(target=self._write_queued, daemon=True).start()
+            app = QCoreApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(self.flush)
+        self._write_queue.put(row)
+        return row
+
+    def flush(self) -> None:
+        """
+        Waits until every queued workout is written.
+        """
+        if self._write_queue is not None:
+            self._write_queue.join()
+
+    def _write_queued(self) -> None:
+        """
+        Writes queued rows in batches, on the writer thread.
+        """
+        while True:
+            rows = [self._write_queue.get()]
+            while True:
+                try:
+                    rows.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.scheduler.interactive(), self._daemon_watch():
+                    self.store.save_rows(rows)
+            except Exception as e:
+                self.queued_failed.emit(str(e))
+            else:
+                self.queued_saved.emit(rows)
+            finally:
+                for _row in rows:
+                    self._write_queue.task_done()
+
+    def _queued_saved(self, rows: list) -> None:
+        self.workouts_added.emit(rows)
+        self.schedule_maintenance()
+
+    def remove_workouts(self, entries: list) -> None:
+        """
+        Removes workout entries and notifies the open windows.
+
+        Args:
+            entries: List of (day, workout details) to be removed
+        """
+        if not entries:
+            return
+        with self.scheduler.interactive(), self._daemon_watch():
+            self.store.remove_workouts(entries)
+        self.workouts_removed.emit(list(entries))
+        self.schedule_maintenance()
+
+    def clear_workouts(self) -> None:
+        """
+        Deletes all workouts and notifies the open windows.
+        """
+        with self.scheduler.interactive(), self._daemon_watch():
+            self.store.clear_workouts()
+        self.workouts_cleared.emit()
+        self.schedule_maintenance()
+
+    def start_remove_workouts(self, entries: list) -> Operation:
+        """
+        Removes workout entries on a background thread, see remove_workouts.
+
+        Args:
+            entries: List of (day, workout details) to be removed
+
+        Returns:
+            operation: the started operation, the open windows are notified once it finishes.
+        """
+        entries = list(entries)
+        return self._start_operation(
+            lambda token, progress: self.store.remove_workouts(entries, token, progress),
+            lambda: self.workouts_removed.emit(entries),
+        )
+
+    def start_clear_workouts(self) -> Operation:
+        """
+        Deletes all workouts on a background thread, see clear_workouts.
+
+        Returns:
+            operation: the started operation, the open windows are notified once it finishes.
+        """
+        return self._start_operation(
+            lambda token, progress: self.store.clear_workouts(token, progress),
+            self.workouts_cleared.emit,
+        )
+
+    def _start_operation(self, function, notify) -> Operation:
+        """
+        Runs a store write as interactive work on a background thread.
+        Reloads wait until it is done, so the half-written files are never read.
+
+        Args:
+            function: the store call, given a CancelToken and a progress callback.
+            notify: emits the change to the open windows once the write succeeded.
+        """
+        def run(token: CancelToken, progress) -> None:
+            with self.scheduler.interactive(), self._daemon_watch():
+                function(token, progress)
+
+        def done() -> None:
+            self._operations -= 1
+
+        def succeeded() -> None:
+            notify()
+            self.schedule_maintenance()
+
+        operation = Operation(run, self)
+        operation.finished.connect(done)
+        operation.finished.connect(succeeded)
+        operation.cancelled.connect(done)
+        operation.failed.connect(done)
+        self._operations += 1
+        operation.start()
+        return operation
+
+    @contextlib.contextmanager
+    def _daemon_watch(self):
+        """
+        Switches to the data files if the daemon goes away during a write.
+        The write itself still fails: it may or may not have reached the daemon,
+        and trying it again could save it twice.
+        """
+        try:
+            yield
+        except DaemonDisconnected:
+            self.daemon_lost.emit()
+            raise
+
+    def _use_files(self) -> None:
+        """
+        Carries on without the daemon, reading and writing the data files directly.
+        The open windows are refilled, the files may have changed since the
+        daemon last answered.
+        """
+        if isinstance(self.store, WorkoutStore):
+            return
+        self.store = WorkoutStore()
+        self.workouts_cleared.emit()
+        rows = self.store.rows()
+        if rows:
+            self.workouts_added.emit(rows)
+
+    def schedule_maintenance(self) -> None:
+        """
+        Queues the routine maintenance for the next idle moment.
+        Jobs already waiting are not queued again, so this is cheap to call after every change.
+        """
+        schedule_maintenance(self.scheduler, self.store, self.archive_after)
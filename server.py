@@ -0,0 +1,257 @@
+"""
+Local HTTP JSON API over the workout store.
+
+    python server.py --port 8765
+
+GET    /workouts?day=&type=&offset=&limit=   page of workouts, ETag from the server start and store generation
+POST   /workouts                             JSON list of workouts, saved in one batch
+DELETE /workouts                             JSON list of {"day", "details"} to remove
+DELETE /workouts?all=true                    clear every workout
+
+Request bodies must be sent as application/json, anything else gets a 415.
+Posted workouts are checked like every other save, see logic.workout_row.
+"""
+import argparse
+import datetime
+import http.server
+import json
+import os
+import threading
+import urllib.parse
+
+from logic import ROW_FIELDS, describe_workout, workout_row
+from store import WorkoutStore
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class UnsupportedMediaType(ValueError):
+    """
+    Raised for a request body that is not sent as application/json.
+    """
+
+
+def row_to_json(row: tuple) -> dict:
+    """
+    Turns a workout row into its JSON object.
+
+    Args:
+        row: workout row in the CSV column order.
+
+    Returns:
+        workout: field name to value, plus the displayed details.
+    """
+    workout = dict(zip(ROW_FIELDS, row))
+    workout["details"] = describe_workout(row)
+    return workout
+
+
+def row_from_json(workout: dict) -> list:
+    """
+    Validates a posted workout and builds its row.
+
+    Args:
+        workout: field name to value, "day" and "workout_type" being required.
+
+    Returns:
+        row: workout row in the CSV column order.
+
+    Raises:
+        ValueError: If the workout is incomplete or invalid, see logic.workout_row.
+    """
+    if not isinstance(workout, dict):
+        raise ValueError("Invalid workout: expected a JSON object")
+    try:
+        fields = {
+            name: str(workout[name])
+            for name in ROW_FIELDS[2:-1]
+            if workout.get(name) not in (None, "")
+        }
+        date = workout.get("date")
+        if date:
+            fields["date"] = datetime.date.fromisoformat(date)
+        return workout_row(workout["day"], workout["workout_type"], **fields)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid workout: {e}")
+
+
+class WorkoutRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves the workout API, keeping connections alive between requests.
+    """
+    protocol_version = "HTTP/1.1"
+    server_version = "FitnessApp/1.0"
+    # Headers and body go out as separate writes; Nagle would hold the body back.
+    disable_nagle_algorithm = True
+
+    @property
+    def store(self) -> WorkoutStore:
+        return self.server.store
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status: int, body, etag: str = None) -> None:
+        """
+        Sends a JSON response with a content length so the connection can be reused.
+        """
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        """
+        Reads the JSON request body.
+
+        Raises:
+            UnsupportedMediaType: If the body is not application/json. It is
+            still read, so the connection can carry on with the next request.
+            ValueError: If the body is not valid JSON.
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        data = self.rfile.read(length)
+        if self.headers.get_content_type() != "application/json":
+            raise UnsupportedMediaType("Send the body as application/json")
+        return json.loads(data or b"null")
+
+    def route(self) -> tuple:
+        """
+        Splits the request path into the resource and its query.
+        """
+        url = urllib.parse.urlsplit(self.path)
+        query = {name: values[-1] for name, values in urllib.parse.parse_qs(url.query).items()}
+        return url.path.rstrip("/"), query
+
+    def do_GET(self) -> None:
+        path, query = self.route()
+        if path != "/workouts":
+            self.send_json(404, {"error": "Not found"})
+            return
+
+        # The generation is read before the rows, so a stale tag can only cause a resend.
+        generation = self.store.generation
+        etag = f'"{self.server.instance}-{generation}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        try:
+            offset = max(0, int(query.get("offset", 0)))
+            limit = min(MAX_LIMIT, max(1, int(query.get("limit", DEFAULT_LIMIT))))
+        except ValueError:
+            self.send_json(400, {"error": "offset and limit must be numbers"})
+            return
+        rows = self.store.rows(query.get("day"))
+        if "type" in query:
+            rows = [row for row in rows if row[1] == query["type"]]
+        self.send_json(
+            200,
+            {
+                "generation": generation,
+                "total": len(rows),
+                "offset": offset,
+                "limit": limit,
+                "workouts": [row_to_json(row) for row in rows[offset : offset + limit]],
+            },
+            etag,
+        )
+
+    def do_POST(self) -> None:
+        path, _query = self.route()
+        if path != "/workouts":
+            self.send_json(404, {"error": "Not found"})
+            return
+        try:
+            workouts = self.read_json()
+            if isinstance(workouts, dict):
+                workouts = [workouts]
+            if not isinstance(workouts, list):
+                raise ValueError("Expected a workout or a list of workouts")
+            rows = [row_from_json(workout) for workout in workouts]
+        except UnsupportedMediaType as e:
+            self.send_json(415, {"error": str(e)})
+            return
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        self.store.save_rows(rows)
+        self.send_json(201, {"saved": len(rows), "generation": self.store.generation})
+
+    def do_DELETE(self) -> None:
+        path, query = self.route()
+        if path != "/workouts":
+            self.send_json(404, {"error": "Not found"})
+            return
+        if query.get("all") == "true":
+            self.store.clear_workouts()
+            self.send_json(200, {"generation": self.store.generation})
+            return
+        try:
+            entries = [(entry["day"], entry["details"]) for entry in self.read_json()]
+        except UnsupportedMediaType as e:
+            self.send_json(415, {"error": str(e)})
+            return
+        except (ValueError, KeyError, TypeError):
+            self.send_json(400, {"error": 'Expected a list of {"day", "details"}'})
+            return
+        self.store.remove_workouts(entries)
+        self.send_json(200, {"removed": len(entries), "generation": self.store.generation})
+
+
+class WorkoutServer(http.server.ThreadingHTTPServer):
+    """
+    Threaded HTTP server sharing one WorkoutStore between its connections.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: tuple, store: WorkoutStore = None, verbose: bool = False) -> None:
+        super().__init__(address, WorkoutRequestHandler)
+        self.store = store or WorkoutStore()
+        self.verbose = verbose
+        # The generation counts from 0 again in every process, so the ETags
+        # also name this start. A tag from before a restart never matches.
+        self.instance = os.urandom(8).hex()
+
+
+def watch_files(store: WorkoutStore, interval: float, stop: threading.Event) -> None:
+    """
+    Picks up changes made to the data files by other programs.
+    """
+    while not stop.wait(interval):
+        store.reload_changed()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the workouts over HTTP on localhost.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reload-interval", type=float, default=1.0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = WorkoutServer(("127.0.0.1", args.port), verbose=args.verbose)
+    stop = threading.Event()
+    threading.Thread(
+        target=watch_files, args=(server.store, args.reload_interval, stop), daemon=True
+    ).start()
+    print(f"Serving workouts on http://127.0.0.1:{args.port}/workouts")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Publishes the columnar workout snapshot into shared memory so local processes
+can read it without parsing anything or holding their own copy.
+
+    python shared.py            # keep the shared copy up to date
+
+A small control segment holds the current generation and the name of the
+data segment. Each publish writes a new data segment and then points the
+control segment at it; readers notice the new generation and re-attach.
+The control record is a seqlock: its sequence number is odd while the
+publisher rewrites it, and readers retry until they saw the same even number
+before and after reading.
+"""
+import argparse
+import json
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+from snapshot import COLUMNS, SNAPSHOT_FILE, load_columns, read_header, update_snapshot
+
+CONTROL_NAME = "fitness_workouts"
+CONTROL = struct.Struct("<8sQQ64s")
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+MAGIC = b"FWSHM002"
+LAYOUT_SIZE = struct.Struct("<I")
+RETRY_DELAY = 0.0001
+MAX_RETRY_DELAY = 0.01
+
+_fence_lock = threading.Lock()
+
+
+def _fence() -> None:
+    """
+    Keeps shared memory accesses on either side in order. Python has no
+    barrier of its own, but taking and releasing a lock is a full fence.
+    """
+    with _fence_lock:
+        pass
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to an existing segment without letting this process's resource
+    tracker unlink it on exit, which would pull it away from every other reader.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching always registers the segment, so skip that.
+        from multiprocessing import resource_tracker
+
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _read_control(control: shared_memory.SharedMemory) -> tuple:
+    """
+    Reads the generation and data segment name, retrying while a publish is
+    mid-write. Waits between tries, backing off, rather than spinning.
+    """
+    delay = RETRY_DELAY
+    while True:
+        (before,) = SEQUENCE.unpack_from(control.buf, SEQUENCE_OFFSET)
+        _fence()
+        magic, _sequence, generation, name = CONTROL.unpack_from(control.buf)
+        _fence()
+        (after,) = SEQUENCE.unpack_from(control.buf, SEQUENCE_OFFSET)
+        if before == after and before % 2 == 0:
+            if magic != MAGIC:
+                return 0, None
+            return generation, name.rstrip(b"\0").decode()
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_RETRY_DELAY)
+
+
+def _write_control(control: shared_memory.SharedMemory, generation: int, name: str) -> None:
+    """
+    Points the control record at a data segment. Only the publisher writes it.
+    """
+    (sequence,) = SEQUENCE.unpack_from(control.buf, SEQUENCE_OFFSET)
+    # Still odd if a publisher died mid-write.
+    sequence += 1 - sequence % 2
+    SEQUENCE.pack_into(control.buf, SEQUENCE_OFFSET, sequence)
+    _fence()
+    CONTROL.pack_into(control.buf, 0, MAGIC, sequence, generation, name.encode())
+    _fence()
+    SEQUENCE.pack_into(control.buf, SEQUENCE_OFFSET, sequence + 1)
+
+
+class SharedPublisher:
+    """
+    Owns the shared segments and writes new generations of the columns into them.
+    """
+    def __init__(self, name: str = CONTROL_NAME) -> None:
+        self.name = name
+        self.generation = 0
+        self._data = None
+        try:
+            self._control = shared_memory.SharedMemory(name=name, create=True, size=CONTROL.size)
+        except FileExistsError:
+            self._control = _attach(name)
+            # Read without the seqlock: a publisher that died mid-write never
+            # finishes, and this one is the only writer now.
+            magic, _sequence, generation, _data_name = CONTROL.unpack_from(self._control.buf)
+            if magic == MAGIC:
+                self.generation = generation
+
+    def publish(self, columns: dict) -> int:
+        """
+        Writes the columns to a new data segment and makes it current.
+
+        Args:
+            columns: column name to array of values.
+
+        Returns:
+            generation: the generation readers will see.
+        """
+        layout = {}
+        offset = 0
+        for name in COLUMNS:
+            column = columns[name]
+            length = len(column) * column.itemsize
+            layout[name] = {"typecode": column.typecode, "offset": offset, "length": length}
+            # Keep every column aligned for its item size.
+            offset += length + (-length % 8)
+        encoded = json.dumps({"rows": len(columns["day"]), "columns": layout}).encode()
+        start = LAYOUT_SIZE.size + len(encoded)
+        start += -start % 8
+
+        generation = self.generation + 1
+        data_name = f"{self.name}_{generation}"
+        size = max(1, start + offset)
+        try:
+            data = shared_memory.SharedMemory(name=data_name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a publisher that did not shut down cleanly.
+            stale = _attach(data_name)
+            stale.close()
+            stale.unlink()
+            data = shared_memory.SharedMemory(name=data_name, create=True, size=size)
+        LAYOUT_SIZE.pack_into(data.buf, 0, len(encoded))
+        data.buf[LAYOUT_SIZE.size : LAYOUT_SIZE.size + len(encoded)] = encoded
+        for name, info in layout.items():
+            begin = start + info["offset"]
+            data.buf[begin : begin + info["length"]] = columns[name].tobytes()
+
+        # The data is all written before the control record points at it.
+        _fence()
+        _write_control(self._control, generation, data.name)
+
+        # Readers still attached to the old segment keep their mapping after the unlink.
+        if self._data is not None:
+            self._data.close()
+            self._data.unlink()
+        self._data = data
+        self.generation = generation
+        return generation
+
+    def close(self) -> None:
+        """
+        Removes the shared segments.
+        """
+        if self._data is not None:
+            self._data.close()
+            self._data.unlink()
+        self._control.close()
+        self._control.unlink()
+
+
+class SharedWorkouts:
+    """
+    Read-only view of the published columns. Columns are memoryviews straight
+    into shared memory, so every reader process shares the same pages.
+    """
+    def __init__(self, name: str = CONTROL_NAME) -> None:
+        self._control = _attach(name)
+        self._data = None
+        self.generation = 0
+        self.rows = 0
+        self.columns = {}
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """
+        Re-attaches if a newer generation was published.
+
+        Returns:
+            changed: True if the columns now show a newer generation.
+        """
+        missing = None
+        while True:
+            generation, data_name = _read_control(self._control)
+            if generation == self.generation or data_name is None:
+                return False
+            try:
+                data = _attach(data_name)
+                break
+            except FileNotFoundError:
+                # A newer publish unlinked it after the control record was read,
+                # so the record names a newer segment now. If it still names
+                # this one, the publisher has shut down.
+                if data_name == missing:
+                    raise
+                missing = data_name
+        (size,) = LAYOUT_SIZE.unpack_from(data.buf)
+        layout = json.loads(bytes(data.buf[LAYOUT_SIZE.size : LAYOUT_SIZE.size + size]))
+        start = LAYOUT_SIZE.size + size
+        start += -start % 8
+
+        self._release()
+        self._data = data
+        self.generation = generation
+        self.rows = layout["rows"]
+        self.columns = {}
+        for name, info in layout["columns"].items():
+            begin = start + info["offset"]
+            self.columns[name] = data.buf[begin : begin + info["length"]].cast(info["typecode"])
+        return True
+
+    def _release(self) -> None:
+        """
+        Lets go of the current data segment.
+        """
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    def close(self) -> None:
+        self._release()
+        self._control.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Keep a shared memory copy of the workouts.")
+    parser.add_argument("--name", default=CONTROL_NAME)
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    publisher = SharedPublisher(args.name)
+    published = None
+    try:
+        while True:
+            update_snapshot()
+            sources = read_header(SNAPSHOT_FILE)["sources"]
+            if sources != published:
+                generation = publisher.publish(load_columns())
+                print(f"Published generation {generation}")
+                published = sources
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import array
+import datetime
+import itertools
+import json
+import os
+import struct
+import typing
+import zlib
+
+from binstore import EPOCH, decode_record, row_codes
+from catalog import CATALOG
+from logic import DAYS, partition_paths, read_appended_rows
+
+SNAPSHOT_FILE = "data/workout_data.snap"
+MAGIC = b"FWSNAP01"
+HEADER_SIZE = struct.Struct("<I")
+
+# Same order as binstore.row_codes.
+CODE_COLUMNS = [
+    "day",
+    "type",
+    "intensity",
+    "stretch",
+    "exercise",
+    "duration",
+    "weight",
+    "sets",
+    "reps",
+]
+# Then the date as days since EPOCH, 0 if unknown, and the muscles the
+# workout works as a catalog.muscle_mask.
+COLUMNS = CODE_COLUMNS + ["date", "muscles"]
+
+# EXERCISE_MASKS and STRETCH_MASKS give the muscle mask by exercise and by
+# stretch code, 0 for no exercise or stretch. MUSCLE_STAMP is stored in the
+# header, so the muscles column is redone when the catalog changes. All three
+# come from the catalog when first used, see __getattr__.
+MUSCLE_NAMES = ("EXERCISE_MASKS", "STRETCH_MASKS", "MUSCLE_STAMP")
+
+# Narrowest first, (typecode, minimum, maximum).
+_UNSIGNED = [("B", 0, 0xFF), ("H", 0, 0xFFFF)]
+_SIGNED = [("b", -0x80, 0x7F), ("h", -0x8000, 0x7FFF), ("l", -0x80000000, 0x7FFFFFFF)]
+
+
+def __getattr__(name: str):
+    """
+    Gives the muscle masks and their stamp, working them out from the catalog
+    the first time any is asked for instead of whenever this module is imported.
+    """
+    if name not in MUSCLE_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    exercise_masks = [0] + CATALOG.muscle_masks("Weight Training")
+    stretch_masks = [0] + CATALOG.muscle_masks("Mobility")
+    globals().update(
+        EXERCISE_MASKS=exercise_masks,
+        STRETCH_MASKS=stretch_masks,
+        MUSCLE_STAMP=zlib.crc32(array.array("H", exercise_masks + stretch_masks).tobytes()),
+    )
+    return globals()[name]
+
+
+def _muscles(name: str):
+    """
+    Looks up one of MUSCLE_NAMES from inside the module, where __getattr__ is
+    not consulted.
+    """
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+def _narrowest(values, typecodes: list) -> str:
+    """
+    Picks the narrowest array typecode that holds all the values.
+    """
+    low = min(values, default=0)
+    high = max(values, default=0)
+    for typecode, minimum, maximum in typecodes:
+        if minimum <= low and high <= maximum:
+            return typecode
+    return typecodes[-1][0]
+
+
+def _encode_column(column: array.array) -> tuple:
+    """
+    Encodes a column plainly or as deltas, whichever is narrower.
+
+    Args:
+        column: the column values.
+
+    Returns:
+        encoding: the encoding name, the stored array and the decoded typecode.
+    """
+    plain = _narrowest(column, _UNSIGNED)
+    deltas = [b - a for a, b in zip(itertools.chain([0], column), column)]
+    delta = _narrowest(deltas, _SIGNED)
+    if array.array(delta).itemsize < array.array(plain).itemsize:
+        return "delta", array.array(delta, deltas), plain
+    return "plain", array.array(plain, column), plain
+
+
+def _decode_column(info: dict, data: bytes) -> array.array:
+    """
+    Turns the stored bytes of a column back into an array of values.
+    """
+    stored = array.array(info["stored"])
+    stored.frombytes(data)
+    if info["encoding"] == "delta":
+        return array.array(info["typecode"], itertools.accumulate(stored))
+    if stored.typecode == info["typecode"]:
+        return stored
+    return array.array(info["typecode"], stored)
+
+
+def read_header(path: str = SNAPSHOT_FILE) -> dict:
+    """
+    Reads the snapshot header.
+
+    Args:
+        path: the snapshot file.
+
+    Returns:
+        header: row count, partition positions and column layout, or None if there is no snapshot.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            return None
+        (size,) = HEADER_SIZE.unpack(file.read(HEADER_SIZE.size))
+        header = json.loads(file.read(size))
+    header["data_start"] = len(MAGIC) + HEADER_SIZE.size + size
+    return header
+
+
+def load_column(name: str, path: str = SNAPSHOT_FILE, header: dict = None) -> array.array:
+    """
+    Loads a single column without reading the others.
+
+    Args:
+        name: the column name.
+        path: the snapshot file.
+        header: the already read header, if any.
+
+    Returns:
+        column: the column values.
+    """
+    header = header or read_header(path)
+    info = header["columns"][name]
+    with open(path, "rb") as file:
+        file.seek(header["data_start"] + info["offset"])
+        return _decode_column(info, file.read(info["length"]))
+
+
+def load_columns(names: list = None, path: str = SNAPSHOT_FILE) -> dict:
+    """
+    Loads columns from the snapshot.
+
+    Args:
+        names: the columns to load, all of them by default.
+        path: the snapshot file.
+
+    Returns:
+        columns: column name to values, empty arrays if there is no snapshot.
+    """
+    header = read_header(path)
+    if header is None:
+        return {name: array.array("B") for name in names or COLUMNS}
+    return {name: load_column(name, path, header) for name in names or COLUMNS}
+
+
+def write_snapshot(columns: dict, sources: dict, path: str = SNAPSHOT_FILE) -> None:
+    """
+    Writes the columns to a new snapshot, replacing the old one atomically.
+
+    Args:
+        columns: column name to values.
+        sources: day to the position up to which its partition was read.
+        path: the snapshot file.
+    """
+    layout = {}
+    blobs = []
+    for name in COLUMNS:
+        encoding, stored, typecode = _encode_column(columns[name])
+        blob = stored.tobytes()
+        layout[name] = {
+            "encoding": encoding,
+            "stored": stored.typecode,
+            "typecode": typecode,
+            "length": len(blob),
+        }
+        blobs.append(blob)
+
+    offset = 0
+    for info in layout.values():
+        info["offset"] = offset
+        offset += info["length"]
+    header = {
+        "rows": len(columns["day"]),
+        "sources": sources,
+        "columns": layout,
+        "muscles": _muscles("MUSCLE_STAMP"),
+    }
+    encoded = json.dumps(header).encode()
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(HEADER_SIZE.pack(len(encoded)))
+        file.write(encoded)
+        for blob in blobs:
+            file.write(blob)
+    os.replace(temp_path, path)
+
+
+def _drop_days(columns: dict, days: set) -> dict:
+    """
+    Removes the rows of some days from the columns.
+    """
+    codes = {DAYS.index(day) for day in days}
+    keep = [i for i, code in enumerate(columns["day"]) if code not in codes]
+    return {name: array.array("H", [column[i] for i in keep]) for name, column in columns.items()}
+
+
+def rows_to_columns(rows: typing.Iterable[list]) -> dict:
+    """
+    Encodes workout rows into columns.
+
+    Args:
+        rows: workout rows in the CSV column order.
+
+    Returns:
+        columns: column name to array of codes and numbers.
+    """
+    columns = {name: array.array("H") for name in COLUMNS}
+    appends = [columns[name].append for name in CODE_COLUMNS]
+    append_date = columns["date"].append
+    append_muscles = columns["muscles"].append
+    exercise_masks = _muscles("EXERCISE_MASKS")
+    stretch_masks = _muscles("STRETCH_MASKS")
+    # Plans repeat the same few dates, each is parsed once.
+    dates = {"": 0}
+    for row in rows:
+        codes = row_codes(row)
+        for append, value in zip(appends, codes):
+            append(value)
+        date = row[10] if len(row) > 10 else ""
+        if date not in dates:
+            dates[date] = (datetime.date.fromisoformat(date) - EPOCH).days
+        append_date(dates[date])
+        append_muscles(exercise_masks[codes[4]] | stretch_masks[codes[3]])
+    return columns
+
+
+def muscle_column(exercises: array.array, stretches: array.array) -> array.array:
+    """
+    Works out the muscles column again from the exercise and stretch columns.
+    """
+    exercise_masks = _muscles("EXERCISE_MASKS")
+    stretch_masks = _muscles("STRETCH_MASKS")
+    return array.array(
+        "H",
+        (exercise_masks[exercise] | stretch_masks[stretch] for exercise, stretch in zip(exercises, stretches)),
+    )
+
+
+def column_rows(columns: dict, indexes: typing.Iterable[int]) -> list:
+    """
+    Turns some rows of the columns back into workout rows.
+
+    Args:
+        columns: column name to values.
+        indexes: the rows to decode.
+
+    Returns:
+        rows: workout rows in the CSV column order.
+    """
+    # Laid out like a binstore.RECORD, the flags aside.
+    record_columns = [columns[name] for name in CODE_COLUMNS + ["date"]]
+    return [
+        decode_record((0,) + tuple(column[index] for column in record_columns))
+        for index in indexes
+    ]
+
+
+def update_snapshot(path: str = SNAPSHOT_FILE, token=None) -> int:
+    """
+    Brings the snapshot up to date with the day partitions.
+    Only rows appended since the last update are parsed. A partition that
+    was rewritten is reparsed on its own; the other days are kept.
+
+    Args:
+        path: the snapshot file.
+        token: checked between partitions. The snapshot is only written at
+        the end, so a cancelled update leaves it as it was.
+
+    Returns:
+        count: number of rows in the snapshot.
+    """
+    header = read_header(path)
+    columns = {name: array.array("H") for name in COLUMNS}
+    sources = {}
+    remasked = False
+    # A snapshot written before a column was added is rebuilt from the partitions.
+    if header is not None and "sources" in header and set(COLUMNS) <= set(header["columns"]):
+        columns = {name: array.array("H", load_column(name, path, header)) for name in COLUMNS}
+        sources = header["sources"]
+        if header.get("muscles") != _muscles("MUSCLE_STAMP"):
+            columns["muscles"] = muscle_column(columns["exercise"], columns["stretch"])
+            remasked = True
+
+    paths = partition_paths()
+    stale = {day for day in sources if day not in paths}
+    appended = []
+    new_sources = {}
+    for day in paths:
+        if token is not None:
+            token.check()
+        rows, new_sources[day], tail_only = read_appended_rows(day, sources.get(day))
+        if day in sources and not tail_only:
+            stale.add(day)
+        appended.extend(rows)
+
+    if header is not None and not stale and not appended and not remasked and new_sources == sources:
+        return header["rows"]
+
+    if stale:
+        columns = _drop_days(columns, stale)
+    for name, values in rows_to_columns(appended).items():
+        columns[name].extend(values)
+    write_snapshot(columns, new_sources, path)
+    return len(columns["day"])
+
+
+def column_total(name: str, path: str = SNAPSHOT_FILE) -> int:
+    """
+    Sums a single column, reading nothing else from the snapshot.
+
+    Args:
+        name: the column name.
+        path: the snapshot file.
+
+    Returns:
+        total: the sum of the column.
+    """
+    header = read_header(path)
+    if header is None:
+        return 0
+    return sum(load_column(name, path, header))
@@ -0,0 +1,291 @@
+import collections
+import contextlib
+import threading
+import types
+
+from logic import (
+    DAYS,
+    workout_row,
+    append_rows,
+    partition_paths,
+    read_appended_rows,
+    describe_workout,
+    clear_workouts,
+    remove_workouts,
+)
+
+
+def diff_rows(old_rows: dict, new_rows: dict) -> tuple:
+    """
+    Compares two states of the workouts as multisets of rows.
+
+    Args:
+        old_rows: day to its rows before.
+        new_rows: day to its rows after.
+
+    Returns:
+        removed: (day, workout details) entries that are gone.
+        added: rows that are new, or that share a description with a removed entry.
+    """
+    removed = []
+    added = []
+    for day in DAYS:
+        old = collections.Counter(old_rows.get(day, ()))
+        new = collections.Counter(new_rows.get(day, ()))
+        gone = old - new
+        kept = old - gone
+        entries = {(day, describe_workout(row)) for row in gone}
+        # Removal goes by description, so kept rows sharing one are added back.
+        survivors = [row for row in kept.elements() if (day, describe_workout(row)) in entries]
+        removed.extend(entries)
+        added.extend(survivors + list((new - old).elements()))
+    return removed, added
+
+
+class ReadWriteLock:
+    """
+    Lets many readers in at once, or a single writer.
+    Waiting writers hold back new readers so a steady stream of reads cannot starve them.
+    """
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextlib.contextmanager
+    def read(self):
+        """
+        Holds the lock shared for the duration of the with block.
+        """
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        """
+        Holds the lock exclusively for the duration of the with block.
+        """
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class WorkoutStore:
+    """
+    Thread-safe owner of the parsed workouts and the data files behind them.
+    Readers get immutable snapshots; writers replace the snapshot instead of
+    changing it, so a snapshot stays valid after the lock is released.
+    """
+    def __init__(self) -> None:
+        self._lock = ReadWriteLock()
+        self._rows = None
+        self._positions = {}
+        self._counts = {}
+        self.generation = 0
+
+    def _load(self) -> None:
+        """
+        Parses the day partitions, the caller holds the write lock.
+        """
+        rows = {}
+        for day in partition_paths():
+            day_rows, self._positions[day], _appended = read_appended_rows(day)
+            rows[day] = tuple(map(tuple, day_rows))
+            self._counts[day] = len(day_rows)
+        self._rows = rows
+
+    def snapshot(self) -> types.MappingProxyType:
+        """
+        Gives the current workouts, parsing the partitions the first time.
+
+        Returns:
+            rows: day to a tuple of workout rows, which never changes afterwards.
+        """
+        with self._lock.read():
+            if self._rows is not None:
+                return types.MappingProxyType(self._rows)
+        with self._lock.write():
+            if self._rows is None:
+                self._load()
+            return types.MappingProxyType(self._rows)
+
+    @contextlib.contextmanager
+    def exclusive(self):
+        """
+        Holds every reader and writer off for the with block, for maintenance
+        that rewrites the data files directly. Call reload_changed afterwards.
+        """
+        with self._lock.write():
+            yield
+
+    def rows(self, day: str = None) -> list:
+        """
+        Gives the workout rows.
+
+        Args:
+            day: only give this day's rows.
+
+        Returns:
+            rows: workout rows, in day order.
+        """
+        snapshot = self.snapshot()
+        days = [day] if day is not None else DAYS
+        return [row for name in days for row in snapshot.get(name, ())]
+
+    def workouts(self, day: str = None) -> dict:
+        """
+        Gives the workout entries, like read_workouts but without reading the files.
+
+        Args:
+            day: only give this day's workouts.
+
+        Returns:
+            workouts: a list of workout details per day, in day order.
+        """
+        snapshot = self.snapshot()
+        workouts = {}
+        for name in [day] if day is not None else DAYS:
+            details = [describe_workout(row) for row in snapshot.get(name, ())]
+            details = [detail for detail in details if detail is not None]
+            if details:
+                workouts[name] = details
+        return workouts
+
+    def save_rows(self, rows: list) -> list:
+        """
+        Appends workout rows in one write.
+
+        Args:
+            rows: workout rows in the CSV column order.
+
+        Returns:
+            rows: the saved rows as tuples.
+        """
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return rows
+        self.snapshot()
+        with self._lock.write():
+            append_rows(rows)
+            new_rows = dict(self._rows)
+            for row in rows:
+                new_rows[row[0]] = new_rows.get(row[0], ()) + (row,)
+            self._rows = new_rows
+            self.generation += 1
+        return rows
+
+    def save_workout(self, day: str, workout_type: str, **fields: str) -> tuple:
+        """
+        Validates and saves a workout entry.
+
+        Args:
+            day: Day of the workout
+            workout_type: Type of workout (Cardio, Weight Training, Mobility).
+            **fields: the workout's fields, see logic.workout_row.
+
+        Returns:
+            row: the saved row.
+
+        Raises:
+            ValueError: If a numeric field is invalid.
+        """
+        return self.save_rows([workout_row(day, workout_type, **fields)])[0]
+
+    def remove_workouts(self, entries: list, token=None, progress=None) -> None:
+        """
+        Removes workout entries.
+
+        Args:
+            entries: List of (day, workout details) to be removed
+            token: cancels the removal, see logic.remove_workouts.
+            progress: called as the partitions are rewritten, see logic.remove_workouts.
+        """
+        if not entries:
+            return
+        self.snapshot()
+        with self._lock.write():
+            remove_workouts(entries, token, progress)
+            new_rows = dict(self._rows)
+            for day in {day for day, _details in entries}:
+                details = {workout for entry_day, workout in entries if entry_day == day}
+                new_rows[day] = tuple(
+                    row for row in new_rows.get(day, ()) if describe_workout(row) not in details
+                )
+                # The partition was rewritten, the next reload reads it whole.
+                self._positions.pop(day, None)
+            self._rows = new_rows
+            self.generation += 1
+
+    def clear_workouts(self, token=None, progress=None) -> None:
+        """
+        Deletes all workouts.
+
+        Args:
+            token: cancels the clear before it starts, see logic.clear_workouts.
+            progress: called as the partitions are deleted, see logic.clear_workouts.
+        """
+        with self._lock.write():
+            clear_workouts(token=token, progress=progress)
+            self._rows = {}
+            self._positions = {}
+            self._counts = {}
+            self.generation += 1
+
+    def reload_changed(self) -> tuple:
+        """
+        Picks up changes made to the data files by someone else.
+        Appended rows are parsed from the end of each partition only; a rewritten
+        partition is reparsed and diffed against memory.
+
+        Returns:
+            removed: (day, workout details) entries that are gone.
+            added: rows that are new, or that share a description with a removed entry.
+            cleared: True if no partitions are left at all.
+        """
+        added = []
+        removed = []
+        with self._lock.write():
+            if self._rows is None:
+                return removed, added, False
+            paths = partition_paths()
+            new_rows_by_day = {}
+            for day in DAYS:
+                old_rows = self._rows.get(day, ())
+                if day not in paths:
+                    self._positions.pop(day, None)
+                    continue
+                position = self._positions.get(day)
+                rows, self._positions[day], appended = read_appended_rows(day, position)
+                rows = tuple(map(tuple, rows))
+                if appended:
+                    # The rows before position are the ones loaded or reloaded earlier.
+                    new_rows = old_rows[: self._counts.get(day, 0)] + rows
+                else:
+                    new_rows = rows
+                self._counts[day] = len(new_rows)
+                new_rows_by_day[day] = new_rows
+
+            removed, added = diff_rows(self._rows, new_rows_by_day)
+            if removed or added:
+                self._rows = new_rows_by_day
+                self.generation += 1
+        return removed, added, not paths and bool(removed)
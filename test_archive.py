@@ -0,0 +1,64 @@
+import contextlib
+import datetime
+
+import pytest
+
+from archive import archive_workouts, read_archived_rows
+from jobs import Cancelled, JobScheduler, schedule_maintenance
+from conftest import cardio_row
+from logic import append_rows, read_rows
+from store import WorkoutStore
+
+
+pytestmark = pytest.mark.usefixtures("data_dir")
+
+
+OLD = datetime.date(2024, 2, 14)
+NEW = datetime.date(2024, 6, 3)
+CUTOFF = datetime.date(2024, 3, 1)
+
+
+def test_archive_locks_one_partition_at_a_time():
+    append_rows([cardio_row("Monday", date=OLD), cardio_row("Monday", date=NEW), cardio_row("Tuesday", date=OLD)])
+    events = []
+
+    @contextlib.contextmanager
+    def lock():
+        events.append("lock")
+        yield
+        events.append("unlock")
+
+    assert archive_workouts(CUTOFF, lock=lock) == 2
+    assert events == ["lock", "unlock"] * 7
+    assert list(read_rows()) == [cardio_row("Monday", date=NEW)]
+    assert sorted(read_archived_rows()) == sorted([cardio_row("Monday", date=OLD), cardio_row("Tuesday", date=OLD)])
+
+
+def test_cancelled_archive_keeps_what_it_finished():
+    append_rows([cardio_row("Sunday", date=OLD), cardio_row("Monday", date=OLD)])
+
+    class Token:
+        checks = 0
+
+        def check(self):
+            # Stop before the second partition, Monday.
+            self.checks += 1
+            if self.checks == 2:
+                raise Cancelled()
+
+    with pytest.raises(Cancelled):
+        archive_workouts(CUTOFF, Token())
+    assert list(read_archived_rows()) == [cardio_row("Sunday", date=OLD)]
+    assert list(read_rows()) == [cardio_row("Monday", date=OLD)]
+
+
+def test_maintenance_archives_only_when_asked():
+    scheduler = JobScheduler(idle_delay=60_000)
+    store = WorkoutStore()
+    try:
+        schedule_maintenance(scheduler, store)
+        assert "Archive old workouts" not in [job["name"] for job in scheduler.status()]
+        schedule_maintenance(scheduler, store, datetime.timedelta(weeks=26))
+        assert "Archive old workouts" in [job["name"] for job in scheduler.status()]
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+from async_store import AsyncWorkoutStore
+from conftest import cardio_row
+from logic import read_rows
+from store import WorkoutStore
+
+
+pytestmark = pytest.mark.usefixtures("data_dir")
+
+
+class RecordingStore(WorkoutStore):
+    """
+    Records each commit, and holds the first one until released.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches = []
+        self.release = threading.Event()
+
+    def save_rows(self, rows: list) -> list:
+        if not self.batches:
+            self.release.wait(5)
+        self.batches.append([row[3] for row in rows])
+        return super().save_rows(rows)
+
+
+async def save_while_committing(store: RecordingStore, async_store: AsyncWorkoutStore, saves: list) -> list:
+    """
+    Starts the first save, queues the rest while it is being written, then lets it finish.
+    """
+    first = asyncio.ensure_future(async_store.save_rows(saves[0]))
+    await asyncio.sleep(0.05)
+    rest = [asyncio.ensure_future(async_store.save_rows(rows)) for rows in saves[1:]]
+    await asyncio.sleep(0.05)
+    store.release.set()
+    return await asyncio.gather(first, *rest, return_exceptions=True)
+
+
+def test_saves_queued_during_a_commit_go_out_together_in_order():
+    store = RecordingStore()
+
+    async def run() -> list:
+        async with AsyncWorkoutStore(store) as async_store:
+            return await save_while_committing(
+                store,
+                async_store,
+                [[cardio_row("Monday", "10")], [cardio_row("Monday", "20")], [cardio_row("Monday", "30")]],
+            )
+
+    results = asyncio.run(run())
+    assert [[row[3] for row in rows] for rows in results] == [["10"], ["20"], ["30"]]
+    assert store.batches == [["10"], ["20", "30"]]
+    assert [row[3] for row in read_rows("Monday")] == ["10", "20", "30"]
+
+
+def test_an_invalid_save_fails_alone():
+    store = RecordingStore()
+    invalid = cardio_row("Monday", "40")
+    invalid[0] = "Funday"
+
+    async def run() -> list:
+        async with AsyncWorkoutStore(store) as async_store:
+            return await save_while_committing(
+                store, async_store, [[cardio_row("Monday", "10")], [invalid], [cardio_row("Monday", "30")]]
+            )
+
+    first, refused, last = asyncio.run(run())
+    assert isinstance(refused, ValueError)
+    assert [first[0][3], last[0][3]] == ["10", "30"]
+    assert [row[3] for row in read_rows("Monday")] == ["10", "30"]
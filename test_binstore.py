@@ -0,0 +1,64 @@
+import pytest
+
+from binstore import DELETED, RECORD, decode_record, encode_row, read_records, record_at, row_codes
+from logic import FIRST_DATE, LAST_DATE, MAX_NUMBER, workout_row
+from snapshot import column_rows, rows_to_columns
+
+
+def largest_rows() -> list:
+    """
+    Rows at the limits workout_row allows.
+    """
+    biggest = str(MAX_NUMBER)
+    return [
+        workout_row("Saturday", "Cardio", cardio_intensity="High", cardio_duration=biggest, date=LAST_DATE),
+        workout_row(
+            "Sunday",
+            "Weight Training",
+            weight_exercise="Deadlift",
+            weight=biggest,
+            weight_sets=biggest,
+            weight_reps=biggest,
+            date=FIRST_DATE,
+        ),
+        workout_row("Monday", "Mobility", mobility_stretch="Hamstring Stretch", mobility_duration=biggest),
+    ]
+
+
+def test_records_round_trip():
+    for row in largest_rows():
+        assert decode_record(RECORD.unpack(encode_row(row))) == row
+
+
+def test_records_are_read_by_position(tmp_path):
+    path = tmp_path / "workouts.bin"
+    path.write_bytes(b"")
+    with pytest.raises(IndexError):
+        record_at(path, 0)
+
+    rows = largest_rows()
+    records = bytearray(b"".join(encode_row(row) for row in rows))
+    records[RECORD.size] |= DELETED
+    path.write_bytes(records)
+    assert record_at(path, 2) == rows[2]
+    assert record_at(path, 1) is None
+    assert read_records(path) == [(0, rows[0]), (2, rows[2])]
+    with pytest.raises(IndexError):
+        record_at(path, 3)
+
+
+def test_snapshot_columns_round_trip():
+    rows = largest_rows()
+    assert column_rows(rows_to_columns(rows), range(len(rows))) == rows
+
+
+def test_row_codes_refuses_numbers_past_the_limit():
+    row = ["Monday", "Cardio", "Low", str(MAX_NUMBER + 1), "", "", "", "", "", "", "2024-02-14"]
+    with pytest.raises(ValueError, match="too large"):
+        row_codes(row)
+
+
+def test_row_codes_refuses_names_outside_the_vocabulary():
+    row = ["Monday", "Weight Training", "", "", "Foo Lift", "100", "5", "3", "", "", "2024-02-14"]
+    with pytest.raises(ValueError, match="Foo Lift"):
+        row_codes(row)
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+from catalog import Catalog, MUSCLES, load_catalog
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HEADER = "name,workout_type,aliases,equipment,muscles\n"
+
+
+def write_catalog(path, lines: list) -> str:
+    path.write_text(HEADER + "".join(line + "\n" for line in lines))
+    return str(path)
+
+
+def test_catalog_is_read_on_first_use(tmp_path):
+    path = write_catalog(tmp_path / "catalog.csv", ["Deadlift,Weight Training,dl,barbell,hamstrings"])
+    cache_file = str(tmp_path / "cache" / "catalog.cache")
+    catalog = Catalog(path, cache_file)
+    assert not os.path.exists(cache_file)
+
+    assert catalog.find("DL", "Weight Training").name == "Deadlift"
+    assert os.path.exists(cache_file)
+
+
+def test_cache_is_rebuilt_when_the_catalog_changes(tmp_path):
+    path = write_catalog(tmp_path / "catalog.csv", ["Deadlift,Weight Training,,barbell,hamstrings"])
+    cache_file = str(tmp_path / "catalog.cache")
+    assert load_catalog(path, cache_file).names("Weight Training") == ["Deadlift"]
+
+    write_catalog(
+        tmp_path / "catalog.csv",
+        ["Deadlift,Weight Training,,barbell,hamstrings", "Front Squat,Weight Training,,barbell,quadriceps"],
+    )
+    assert load_catalog(path, cache_file).names("Weight Training") == ["Deadlift", "Front Squat"]
+
+
+def test_shipped_catalog_is_valid():
+    catalog = load_catalog()
+    for entry in catalog.entries:
+        assert set(entry.muscles) <= set(MUSCLES)
+
+
+def test_importing_the_data_modules_reads_no_catalog(tmp_path):
+    # Run from an empty directory: nothing may be read or written there either.
+    code = "import catalog, logic, store, binstore, snapshot, analytics; print(catalog.CATALOG._entries is None)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "True"
+    assert os.listdir(tmp_path) == []
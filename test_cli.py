@@ -0,0 +1,64 @@
+import datetime
+import json
+
+import pytest
+
+from cli import main
+
+
+pytestmark = pytest.mark.usefixtures("data_dir")
+
+
+def test_import_names_the_bad_line(tmp_path, capsys):
+    path = tmp_path / "import.csv"
+    path.write_text(
+        "Monday,Cardio,Low,30,,,,,,,2024-02-12\n"
+        "Monday,Weight Training,,,Foo Lift,100,5,3,,,2024-02-12\n"
+    )
+    assert main(["import", str(path)]) == 1
+    assert "import.csv:2: Unknown exercise 'Foo Lift'" in capsys.readouterr().err
+
+    # Nothing was imported, and the summaries still work.
+    assert main(["stats"]) == 0
+    assert main(["list", "--muscle", "chest"]) == 0
+    assert "No workouts found" in capsys.readouterr().out
+
+
+def test_imported_workouts_show_up_by_muscle(tmp_path, capsys):
+    path = tmp_path / "import.json"
+    path.write_text(json.dumps([
+        {"day": "Monday", "workout_type": "Weight Training", "weight_exercise": "bench",
+         "weight": "100", "weight_sets": "3", "weight_reps": "5"},
+        {"day": "Tuesday", "workout_type": "Mobility", "mobility_stretch": "Hamstring Stretch",
+         "mobility_duration": "10"},
+    ]))
+    assert main(["import", str(path)]) == 0
+    capsys.readouterr()
+    assert main(["list", "--muscle", "chest"]) == 0
+    output = capsys.readouterr().out
+    assert "Barbell Bench Press" in output
+    assert "Hamstring Stretch" not in output
+
+
+def test_add_refuses_values_it_cannot_store(capsys):
+    assert main(["add", "Monday", "Weight Training", "--weight", "70000", "--sets", "1", "--reps", "1"]) == 1
+    assert "Weight must be at most 65535" in capsys.readouterr().err
+    assert main(["stats"]) == 0
+
+
+def test_history_reads_archived_weeks(capsys):
+    from archive import archive_workouts
+
+    path = "workouts.csv"
+    with open(path, "w") as file:
+        file.write("Wednesday,Cardio,Low,30,,,,,,,2024-02-14\nMonday,Cardio,High,20,,,,,,,2024-06-03\n")
+    assert main(["import", path]) == 0
+    assert archive_workouts(datetime.date(2024, 3, 1)) == 1
+    capsys.readouterr()
+
+    assert main(["history"]) == 0
+    assert capsys.readouterr().out == "2024-W07\n"
+    assert main(["history", "2024-W07"]) == 0
+    assert capsys.readouterr().out == "Wednesday\n    Cardio: Intensity Low, Duration: 30 mins\n"
+    assert main(["history", "2024-W08"]) == 0
+    assert capsys.readouterr().out == "No workouts found\n"
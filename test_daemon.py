@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import threading
+import time
+
+import pytest
+
+from cli import main
+from daemon import DaemonClient, DaemonDisconnected, DaemonError, connect, serve
+
+
+class Daemon:
+    """
+    A daemon serving the working directory on a thread of its own.
+    """
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.task = self.loop.create_task(serve())
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.clients = []
+
+    def _run(self) -> None:
+        with contextlib.suppress(asyncio.CancelledError):
+            self.loop.run_until_complete(self.task)
+
+    def client(self) -> DaemonClient:
+        deadline = time.monotonic() + 5
+        while (connected := connect()) is None:
+            assert time.monotonic() < deadline, "daemon did not start"
+            time.sleep(0.01)
+        # Answered once the daemon serves the connection, so stop() closes it.
+        connected.generation
+        self.clients.append(connected)
+        return connected
+
+    def stop(self) -> None:
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(5)
+        # Let the closed connections finish closing.
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.close()
+
+
+@pytest.fixture
+def daemon(data_dir):
+    daemon = Daemon()
+    yield daemon
+    for connected in daemon.clients:
+        connected.close()
+    daemon.stop()
+
+
+def test_reload_changed_after_rows(daemon):
+    client, other = daemon.client(), daemon.client()
+    assert client.rows() == []
+    row = other.save_workout("Monday", "Cardio", cardio_intensity="Low", cardio_duration="30")
+    assert client.reload_changed() == ([], [row], False)
+    assert client.reload_changed() == ([], [], False)
+
+
+def test_reload_changed_sees_removals(daemon):
+    client, other = daemon.client(), daemon.client()
+    row = other.save_workout("Monday", "Cardio", cardio_intensity="Low", cardio_duration="30")
+    client.rows()
+    other.clear_workouts()
+    assert client.reload_changed() == ([("Monday", "Cardio: Intensity Low, Duration: 30 mins")], [], True)
+    assert row not in client.rows()
+
+
+def test_reload_changed_needs_a_full_fetch_first(daemon):
+    client, other = daemon.client(), daemon.client()
+    client.rows("Monday")
+    other.save_workout("Monday", "Cardio", cardio_intensity="Low", cardio_duration="30")
+    assert client.reload_changed() == ([], [], False)
+
+
+def test_daemon_refuses_rows_workout_row_would(daemon):
+    client = daemon.client()
+    row = ("Monday", "Weight Training", "", "", "Foo Lift", "70000", "5", "3", "", "", "2024-02-14")
+    with pytest.raises(DaemonError, match="Unknown exercise"):
+        client.save_rows([row])
+    assert client.rows() == []
+    assert main(["stats"]) == 0
+
+
+def test_stopped_daemon_raises_an_os_error(daemon):
+    client = daemon.client()
+    daemon.stop()
+    with pytest.raises(DaemonDisconnected):
+        client.rows()
+    with pytest.raises(OSError):
+        client.rows()
+
+
+def test_repository_falls_back_to_the_files(daemon):
+    from repository import WorkoutRepository
+    from store import WorkoutStore
+
+    client = daemon.client()
+    client.save_workout("Monday", "Cardio", cardio_intensity="Low", cardio_duration="30")
+    repository = WorkoutRepository(client)
+    cleared = []
+    added = []
+    repository.workouts_cleared.connect(lambda: cleared.append(True))
+    repository.workouts_added.connect(added.extend)
+    try:
+        repository.rows()
+        daemon.stop()
+        repository.reload_changed()
+        assert isinstance(repository.store, WorkoutStore)
+        assert cleared and [row[:2] for row in added] == [("Monday", "Cardio")]
+        repository.save_workout("Tuesday", "Cardio", cardio_intensity="Low", cardio_duration="30")
+        assert len(repository.rows()) == 2
+    finally:
+        repository.scheduler.shutdown()
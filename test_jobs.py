@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from conftest import cardio_row
+from jobs import BACKUP_DIR, CancelToken, Cancelled, backup_workouts
+from logic import append_rows, partition_path
+
+pytestmark = pytest.mark.usefixtures("data_dir")
+
+
+def backups() -> list:
+    return sorted(os.listdir(BACKUP_DIR))
+
+
+def test_backups_started_together_get_their_own_directories():
+    append_rows([cardio_row("Monday")])
+    backup_workouts(CancelToken())
+    backup_workouts(CancelToken())
+    assert len(backups()) == 2
+    for backup in backups():
+        assert os.path.basename(partition_path("Monday")) in os.listdir(os.path.join(BACKUP_DIR, backup))
+
+
+def test_cancelled_backup_leaves_nothing_behind():
+    append_rows([cardio_row("Monday")])
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(Cancelled):
+        backup_workouts(token)
+    assert backups() == []
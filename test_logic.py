@@ -0,0 +1,136 @@
+import datetime
+import multiprocessing
+import os
+
+import pytest
+
+from conftest import weight_row
+from logic import (
+    DAYS,
+    LAST_DATE,
+    MAX_NUMBER,
+    ROW_FIELDS,
+    append_rows,
+    check_row,
+    clear_workouts,
+    day_name,
+    read_appended_rows,
+    read_manifest,
+    read_rows,
+    rewrite_partition,
+    workout_row,
+    write_manifest,
+)
+
+
+def test_workout_row_builds_the_csv_row():
+    row = workout_row(
+        "Monday",
+        "Weight Training",
+        weight_exercise="Deadlift",
+        weight="225",
+        weight_sets="3",
+        weight_reps="5",
+        date=datetime.date(2024, 2, 14),
+    )
+    assert len(row) == len(ROW_FIELDS)
+    assert row == ["Monday", "Weight Training", "", "", "Deadlift", "225", "5", "3", "", "", "2024-02-14"]
+
+
+@pytest.mark.parametrize("value", ["0", "-5", "ten", "2.5"])
+def test_workout_row_rejects_bad_numbers(value):
+    with pytest.raises(ValueError, match="Duration"):
+        workout_row("Monday", "Cardio", cardio_intensity="Low", cardio_duration=value)
+
+
+def test_workout_row_keeps_numbers_storable():
+    fields = {"weight_exercise": "Deadlift", "weight_sets": "1", "weight_reps": "1"}
+    workout_row("Monday", "Weight Training", weight=str(MAX_NUMBER), **fields)
+    with pytest.raises(ValueError, match="at most"):
+        workout_row("Monday", "Weight Training", weight=str(MAX_NUMBER + 1), **fields)
+
+
+@pytest.mark.parametrize("date", [datetime.date(1969, 12, 31), LAST_DATE + datetime.timedelta(days=1)])
+def test_workout_row_keeps_dates_storable(date):
+    with pytest.raises(ValueError, match="Date"):
+        workout_row("Monday", "Cardio", cardio_intensity="Low", cardio_duration="30", date=date)
+
+
+def test_day_name_counts_weeks_from_sunday():
+    # 2024-02-11 was a Sunday.
+    sunday = datetime.date(2024, 2, 11)
+    assert [day_name(sunday + datetime.timedelta(days=n)) for n in range(7)] == DAYS
+
+
+def test_check_row_rebuilds_the_row():
+    row = check_row(["Monday", "Weight Training", "", "", "rdl", "100", "5", "3", "", ""])
+    assert row[:10] == ["Monday", "Weight Training", "", "", "Romanian Deadlift", "100", "5", "3", "", ""]
+
+
+@pytest.mark.parametrize(
+    "row, message",
+    [
+        (["Monday", "Cardio", "Low"], "Expected"),
+        (["Funday", "Cardio", "Low", "30", "", "", "", "", "", ""], "Unknown day"),
+        (["Monday", "Running", "Low", "30", "", "", "", "", "", ""], "Unknown workout type"),
+        (["Monday", "Weight Training", "", "", "Foo Lift", "100", "5", "3", "", ""], "Unknown exercise"),
+        (["Monday", "Mobility", "", "", "", "", "", "", "Foo Stretch", "5"], "Unknown stretch"),
+        (["Monday", "Weight Training", "", "", "Deadlift", "70000", "5", "3", "", ""], "at most"),
+    ],
+)
+def test_check_row_rejects_invalid_rows(row, message):
+    with pytest.raises(ValueError, match=message):
+        check_row(row)
+
+
+def test_read_appended_rows_reads_only_new_rows(data_dir):
+    append_rows([weight_row("Monday", "100")])
+    rows, position, appended = read_appended_rows("Monday")
+    append_rows([weight_row("Monday", "110")])
+    rows, position, appended = read_appended_rows("Monday", position)
+    assert appended
+    assert rows == [weight_row("Monday", "110")]
+
+
+def test_read_appended_rows_notices_a_same_sized_rewrite(data_dir):
+    # The last row, all the tail fingerprint sees, survives the rewrite, and
+    # the file ends up just as long.
+    last = weight_row("Monday", "100", "Single-Leg Romanian Deadlift")
+    append_rows([weight_row("Monday", "100"), last])
+    _rows, position, _appended = read_appended_rows("Monday")
+
+    manifest = read_manifest()
+    rewrite_partition("Monday", [weight_row("Monday", "200"), last], manifest)
+    write_manifest(manifest)
+    rows, position, appended = read_appended_rows("Monday", position)
+    assert not appended
+    assert rows == [weight_row("Monday", "200"), last]
+
+
+def test_read_appended_rows_notices_a_cleared_partition(data_dir):
+    append_rows([weight_row("Monday", "100"), weight_row("Monday", "110")])
+    _rows, position, _appended = read_appended_rows("Monday")
+
+    clear_workouts()
+    append_rows([weight_row("Monday", "200"), weight_row("Monday", "110"), weight_row("Monday", "120")])
+    rows, position, appended = read_appended_rows("Monday", position)
+    assert not appended
+    assert len(rows) == 3
+
+
+def append_many(count: int) -> None:
+    for weight in range(count):
+        append_rows([weight_row("Monday", str(weight + 1))])
+
+
+def test_concurrent_appends_keep_the_manifest_right(data_dir):
+    # Spawned, a fork could copy a lock held by another test's thread.
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=append_many, args=(40,)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0, 0, 0]
+    assert read_manifest()["partitions"]["Monday"]["rows"] == len(list(read_rows("Monday"))) == 120
+    assert not [name for name in os.listdir("data/workouts") if name.endswith(".tmp")]
@@ -0,0 +1,38 @@
+import pytest
+
+from quickadd import parse_line, parse_text
+
+
+@pytest.mark.parametrize(
+    "line, fields",
+    [
+        ("mon deadlift 225x5x3", ["Monday", "Weight Training", "", "", "Deadlift", "225", "5", "3", "", ""]),
+        ("Tu deadlfit 225 lbs * 5 * 3", ["Tuesday", "Weight Training", "", "", "Deadlift", "225", "5", "3", "", ""]),
+        ("wed cardio high 30", ["Wednesday", "Cardio", "High", "30", "", "", "", "", "", ""]),
+        ("thu cardio 45 mins", ["Thursday", "Cardio", "Low", "45", "", "", "", "", "", ""]),
+        ("fri stretch hamstring stretch 10", ["Friday", "Mobility", "", "", "", "", "", "", "Hamstring Stretch", "10"]),
+    ],
+)
+def test_parse_line_builds_rows(line, fields):
+    assert parse_line(line)[:10] == fields
+
+
+@pytest.mark.parametrize(
+    "line, message",
+    [
+        ("s cardio 30", "Unknown day"),
+        ("mon cardio extreme 30", "Unknown intensity"),
+        ("mon qwertyuiop 100x5x3", "Unknown exercise"),
+        ("mon deadlift 70000x5x3", "at most"),
+        ("mon deadlift heavy", "Expected"),
+    ],
+)
+def test_parse_line_rejects_bad_lines(line, message):
+    with pytest.raises(ValueError, match=message):
+        parse_line(line)
+
+
+def test_parse_text_keeps_the_good_lines():
+    rows, errors = parse_text("mon cardio 30\n\nmon deadlift heavy\ntue deadlift 225x5x3\n")
+    assert [row[:2] for row in rows] == [["Monday", "Cardio"], ["Tuesday", "Weight Training"]]
+    assert [(number, line) for number, line, _message in errors] == [(3, "mon deadlift heavy")]
@@ -0,0 +1,130 @@
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+from server import WorkoutServer, row_from_json
+
+
+@pytest.fixture
+def server(data_dir):
+    server = WorkoutServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method: str, path: str, body=None, content_type: str = "application/json"):
+    connection = http.client.HTTPConnection(*server.server_address)
+    headers = {"Content-Type": content_type} if body is not None else {}
+    data = json.dumps(body).encode() if body is not None else None
+    connection.request(method, path, data, headers)
+    response = connection.getresponse()
+    payload = response.read()
+    connection.close()
+    return response.status, json.loads(payload) if payload else None
+
+
+def test_row_from_json_uses_catalog_names():
+    row = row_from_json(
+        {"day": "Monday", "workout_type": "Weight Training", "weight_exercise": "rdl", "weight": 100,
+         "weight_sets": 3, "weight_reps": 5, "date": "2024-02-14"}
+    )
+    assert row == ["Monday", "Weight Training", "", "", "Romanian Deadlift", "100", "5", "3", "", "", "2024-02-14"]
+
+
+@pytest.mark.parametrize(
+    "workout",
+    [
+        {"day": "../../escaped", "workout_type": "Cardio", "cardio_duration": "5"},
+        {"day": "Monday", "workout_type": "Running", "cardio_duration": "5"},
+        {"day": "Monday", "workout_type": "Cardio", "cardio_intensity": "Extreme", "cardio_duration": "5"},
+        {"day": "Monday", "workout_type": "Weight Training", "weight_exercise": "Foo Lift", "weight": "5",
+         "weight_sets": "1", "weight_reps": "1"},
+        {"day": "Monday", "workout_type": "Mobility", "mobility_stretch": "Foo Stretch", "mobility_duration": "5"},
+        {"day": "Monday", "workout_type": "Cardio", "cardio_duration": "5", "date": 20240214},
+        {"workout_type": "Cardio", "cardio_duration": "5"},
+        ["Monday", "Cardio"],
+    ],
+)
+def test_row_from_json_rejects_invalid_workouts(workout):
+    with pytest.raises(ValueError):
+        row_from_json(workout)
+
+
+def test_post_then_get(server):
+    workout = {"day": "Monday", "workout_type": "Cardio", "cardio_intensity": "Low", "cardio_duration": "30"}
+    assert request(server, "POST", "/workouts", [workout])[0] == 201
+    status, page = request(server, "GET", "/workouts")
+    assert status == 200
+    assert [entry["details"] for entry in page["workouts"]] == ["Cardio: Intensity Low, Duration: 30 mins"]
+
+
+def test_post_outside_the_vocabulary_is_refused(server):
+    status, body = request(
+        server, "POST", "/workouts", {"day": "../../escaped", "workout_type": "Cardio", "cardio_duration": "5"}
+    )
+    assert status == 400
+    assert "Unknown day" in body["error"]
+    assert not os.path.exists(os.path.join("..", "escaped.csv"))
+    assert not os.path.exists("data/workouts")
+
+
+@pytest.mark.parametrize("body", [None, 5, "Monday"])
+def test_post_of_no_workouts_is_refused(server, body):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request("POST", "/workouts", json.dumps(body), {"Content-Type": "application/json"})
+    assert connection.getresponse().status == 400
+    connection.close()
+
+
+def test_post_needs_json_content_type(server):
+    workout = json.dumps({"day": "Monday", "workout_type": "Cardio", "cardio_duration": "5"})
+    connection = http.client.HTTPConnection(*server.server_address)
+    for method in ["POST", "DELETE"]:
+        connection.request(method, "/workouts", workout, {"Content-Type": "text/plain"})
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 415
+    # The refused body was read, so the same connection still works.
+    connection.request("GET", "/workouts")
+    assert json.loads(connection.getresponse().read())["total"] == 0
+    connection.close()
+
+
+def get_etag(server, etag: str = None) -> tuple:
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request("GET", "/workouts", headers={"If-None-Match": etag} if etag else {})
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response.status, response.getheader("ETag")
+
+
+def test_etag_changes_with_the_workouts(server):
+    status, etag = get_etag(server)
+    assert status == 200
+    assert get_etag(server, etag)[0] == 304
+    workout = {"day": "Monday", "workout_type": "Cardio", "cardio_intensity": "Low", "cardio_duration": "30"}
+    request(server, "POST", "/workouts", workout)
+    assert get_etag(server, etag)[0] == 200
+
+
+def test_etag_does_not_survive_a_restart(server):
+    _status, etag = get_etag(server)
+    # A new process over the same files starts counting generations from 0 again.
+    restarted = WorkoutServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=restarted.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert restarted.store.generation == server.store.generation
+        status, new_etag = get_etag(restarted, etag)
+        assert status == 200
+        assert new_etag != etag
+    finally:
+        restarted.shutdown()
+        restarted.server_close()
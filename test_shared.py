@@ -0,0 +1,67 @@
+import os
+import threading
+
+import pytest
+
+import shared
+from conftest import cardio_row
+from shared import SEQUENCE, SEQUENCE_OFFSET, SharedPublisher, SharedWorkouts
+from snapshot import column_rows, rows_to_columns
+
+
+def columns(*durations: str) -> dict:
+    return rows_to_columns([cardio_row("Monday", duration) for duration in durations])
+
+
+@pytest.fixture
+def publisher(request):
+    publisher = SharedPublisher(f"fwtest_{os.getpid()}_{request.node.name[-12:]}")
+    yield publisher
+    publisher.close()
+
+
+def test_readers_see_each_generation(publisher):
+    publisher.publish(columns("30"))
+    reader = SharedWorkouts(publisher.name)
+    assert reader.generation == 1
+    assert column_rows(reader.columns, range(reader.rows)) == [cardio_row("Monday", "30")]
+    assert not reader.refresh()
+
+    publisher.publish(columns("30", "45"))
+    assert reader.refresh()
+    assert reader.generation == 2
+    assert column_rows(reader.columns, range(reader.rows)) == [cardio_row("Monday", "30"), cardio_row("Monday", "45")]
+    reader.close()
+
+
+def test_readers_wait_out_a_publish_in_progress(publisher):
+    publisher.publish(columns("30"))
+    reader = SharedWorkouts(publisher.name)
+    # An odd sequence marks the record as being written, as if a publish
+    # stopped halfway; readers wait until it is even again.
+    (sequence,) = SEQUENCE.unpack_from(publisher._control.buf, SEQUENCE_OFFSET)
+    SEQUENCE.pack_into(publisher._control.buf, SEQUENCE_OFFSET, sequence + 1)
+    timer = threading.Timer(0.05, publisher.publish, [columns("45")])
+    timer.start()
+    assert reader.refresh()
+    timer.join()
+    assert reader.generation == 2
+    assert reader.rows == 1
+    reader.close()
+
+
+def test_refresh_retries_when_the_segment_was_unlinked(publisher, monkeypatch):
+    publisher.publish(columns("30"))
+    reader = SharedWorkouts(publisher.name)
+    publisher.publish(columns("30", "45"))
+    stale = shared._read_control(publisher._control)
+    publisher.publish(columns("30", "45", "60"))
+
+    # The first read still names generation 2, unlinked by the third publish.
+    reads = [stale]
+    read_control = shared._read_control
+    monkeypatch.setattr(shared, "_read_control", lambda control: reads.pop() if reads else read_control(control))
+    assert reader.refresh()
+    assert reader.generation == 3
+    assert reader.rows == 3
+    reader.close()
@@ -0,0 +1,53 @@
+import pytest
+
+from conftest import weight_row
+from jobs import CancelToken, Cancelled
+from logic import append_rows, read_manifest, rewrite_partition, write_manifest
+from snapshot import column_rows, load_columns, update_snapshot
+
+
+pytestmark = pytest.mark.usefixtures("data_dir")
+
+
+def snapshot_rows() -> list:
+    columns = load_columns()
+    return column_rows(columns, range(len(columns["day"])))
+
+
+def test_snapshot_picks_up_appended_rows():
+    append_rows([weight_row("Monday", "100")])
+    assert update_snapshot() == 1
+    append_rows([weight_row("Monday", "110"), weight_row("Tuesday", "120")])
+    assert update_snapshot() == 3
+    assert snapshot_rows() == [weight_row("Monday", "100"), weight_row("Monday", "110"), weight_row("Tuesday", "120")]
+
+
+def test_snapshot_rebuilds_a_rewritten_partition_that_regrew():
+    last = weight_row("Monday", "100", "Single-Leg Romanian Deadlift")
+    append_rows([weight_row("Monday", "100"), last, weight_row("Tuesday", "120")])
+    update_snapshot()
+
+    # Edit the first row in place, then add one: the partition grows past
+    # where the snapshot stopped reading, and the row ending there is the one
+    # the snapshot saw last.
+    manifest = read_manifest()
+    rewrite_partition("Monday", [weight_row("Monday", "200"), last], manifest)
+    write_manifest(manifest)
+    append_rows([weight_row("Monday", "300")])
+
+    update_snapshot()
+    assert sorted(snapshot_rows()) == sorted(
+        [weight_row("Monday", "200"), last, weight_row("Monday", "300"), weight_row("Tuesday", "120")]
+    )
+
+
+def test_cancelled_update_keeps_the_snapshot():
+    append_rows([weight_row("Monday", "100")])
+    update_snapshot()
+    append_rows([weight_row("Tuesday", "120")])
+
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(Cancelled):
+        update_snapshot(token=token)
+    assert snapshot_rows() == [weight_row("Monday", "100")]